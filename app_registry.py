@@ -0,0 +1,315 @@
+"""
+JARVIS v1.0 — Installed Application Registry
+Discovers installed applications once (then in the background) so
+"open X" resolves to a launch command with a single dict lookup instead
+of probing PATH and hard-coded install paths on every request.
+
+Sources, highest priority first:
+  - Windows: Start Menu shortcuts (.lnk), App Paths registry keys,
+    executables under Program Files / LocalAppData\\Programs
+  - Linux: .desktop entries (system, user, flatpak, snap)
+  - macOS: /Applications bundles
+  - Executables on PATH (launchable only through explicit aliases, never
+    by an arbitrary "open X" or a fuzzy match)
+
+The registry is cached as JSON in DATA_DIR, so it's usable immediately on
+the next start while a refresh runs in the background.
+
+Usage:
+  python app_registry.py            (rescan and list discovered apps)
+"""
+
+import json
+import os
+import platform
+import shlex
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import APP_MATCH_MIN_SCORE, APP_REGISTRY_PATH, APP_REGISTRY_REFRESH
+from fuzzy_match import TrigramIndex, normalize_name
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+_SYSTEM = platform.system()
+_INSTALL_DEPTH = 3
+_SKIP_WORDS = ('uninstall', 'unins0', 'update', 'crash', 'helper', 'setup', 'installer', 'report')
+_CACHE_VERSION = 2   # Bumped when entry kinds change, so stale caches are rescanned
+_DESKTOP_FIELD_CODES = ('%f', '%F', '%u', '%U', '%d', '%D', '%n', '%N', '%i', '%c', '%k', '%v', '%m')
+
+
+def _exe_stem(exe: str) -> str:
+    """'chrome.exe' -> 'chrome', but 'python3.11-config' stays whole."""
+    stem, ext = os.path.splitext(exe)
+    return stem if ext.lower() in ('.exe', '.bat', '.cmd', '.com') else exe
+
+
+def _is_tool_name(name: str) -> bool:
+    lower = name.lower()
+    return any(word in lower for word in _SKIP_WORDS)
+
+
+class AppRegistry:
+    """name -> launch entry for every discovered application."""
+
+    def __init__(self, cache_path: Path = APP_REGISTRY_PATH, refresh_interval: float = APP_REGISTRY_REFRESH):
+        self.cache_path = Path(cache_path)
+        self.refresh_interval = refresh_interval
+        self.running = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._apps: Dict[str, dict] = {}
+        self._names: List[str] = []
+        self._index = None
+        self._load_cache()
+
+    # ─── Discovery ───────────────────────────────────────
+
+    def _add(self, found: Dict[str, dict], name: str, command: str, kind: str,
+             exe: str = None, aliases: tuple = ()):
+        """Register an app under its display name, executable name and aliases (first source wins)."""
+        entry = {'name': name, 'command': command, 'kind': kind}
+        if exe:
+            entry['exe'] = exe
+        for key in {normalize_name(n) for n in (name, _exe_stem(exe) if exe else '', *aliases)}:
+            if key:
+                found.setdefault(key, entry)
+
+    def _scan_start_menu(self, found: Dict[str, dict]):
+        roots = [
+            Path(os.environ.get('APPDATA', '')) / 'Microsoft' / 'Windows' / 'Start Menu' / 'Programs',
+            Path(os.environ.get('PROGRAMDATA', 'C:\\ProgramData')) / 'Microsoft' / 'Windows' / 'Start Menu' / 'Programs',
+        ]
+        for root in roots:
+            if not root.is_dir():
+                continue
+            for shortcut in root.rglob('*.lnk'):
+                if not _is_tool_name(shortcut.stem):
+                    self._add(found, shortcut.stem, str(shortcut), 'shortcut')
+
+    def _scan_app_paths(self, found: Dict[str, dict]):
+        """HKLM/HKCU ...\\CurrentVersion\\App Paths (chrome.exe, msedge.exe, winword.exe, ...)."""
+        if winreg is None:
+            return
+        subkey = r'SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths'
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, subkey) as key:
+                    for i in range(winreg.QueryInfoKey(key)[0]):
+                        exe = winreg.EnumKey(key, i)
+                        try:
+                            with winreg.OpenKey(key, exe) as app_key:
+                                target = winreg.QueryValue(app_key, None).strip('"')
+                        except OSError:
+                            continue
+                        if target and os.path.isfile(target):
+                            self._add(found, _exe_stem(exe), target, 'exe', exe=exe)
+            except OSError:
+                continue
+
+    def _scan_install_dirs(self, found: Dict[str, dict]):
+        roots = [
+            os.environ.get('PROGRAMFILES', 'C:\\Program Files'),
+            os.environ.get('PROGRAMFILES(X86)', 'C:\\Program Files (x86)'),
+            os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Programs'),
+        ]
+        stack = [(root, 0) for root in roots if root and os.path.isdir(root)]
+        while stack:
+            path, depth = stack.pop()
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if depth < _INSTALL_DEPTH:
+                                stack.append((entry.path, depth + 1))
+                        elif entry.name.lower().endswith('.exe') and not _is_tool_name(entry.name):
+                            self._add(found, _exe_stem(entry.name), entry.path, 'exe', exe=entry.name)
+            except OSError:
+                continue
+
+    def _scan_desktop_entries(self, found: Dict[str, dict]):
+        data_home = os.environ.get('XDG_DATA_HOME', str(Path.home() / '.local' / 'share'))
+        data_dirs = os.environ.get('XDG_DATA_DIRS', '/usr/local/share:/usr/share').split(':')
+        roots = [data_home, *data_dirs, '/var/lib/flatpak/exports/share', '/var/lib/snapd/desktop']
+        for root in roots:
+            apps_dir = Path(root) / 'applications'
+            if not apps_dir.is_dir():
+                continue
+            for desktop in apps_dir.glob('*.desktop'):
+                entry = self._parse_desktop(desktop)
+                if entry:
+                    name, command = entry
+                    try:
+                        exe = os.path.basename(shlex.split(command)[0])
+                    except (ValueError, IndexError):
+                        continue
+                    # The desktop file id ("gimp" for gimp.desktop) is usually the short name
+                    self._add(found, name, command, 'desktop', exe=exe, aliases=(desktop.stem,))
+
+    @staticmethod
+    def _parse_desktop(path: Path):
+        """(Name, Exec) from the [Desktop Entry] group, or None for hidden/non-app entries."""
+        fields, in_group = {}, False
+        try:
+            for line in path.read_text(encoding='utf-8', errors='replace').splitlines():
+                line = line.strip()
+                if line.startswith('['):
+                    in_group = line == '[Desktop Entry]'
+                elif in_group and '=' in line:
+                    key, value = line.split('=', 1)
+                    fields.setdefault(key.strip(), value.strip())
+        except OSError:
+            return None
+        if fields.get('Type', 'Application') != 'Application' or fields.get('NoDisplay') == 'true' \
+                or fields.get('Hidden') == 'true' or not fields.get('Name') or not fields.get('Exec'):
+            return None
+        command = ' '.join(part for part in fields['Exec'].split() if part not in _DESKTOP_FIELD_CODES)
+        return fields['Name'], command
+
+    def _scan_bundles(self, found: Dict[str, dict]):
+        for root in ('/Applications', str(Path.home() / 'Applications')):
+            if os.path.isdir(root):
+                for bundle in Path(root).glob('*.app'):
+                    self._add(found, bundle.stem, str(bundle), 'bundle')
+
+    def _scan_path(self, found: Dict[str, dict]):
+        exts = {e.lower() for e in os.environ.get('PATHEXT', '.EXE;.BAT;.CMD').split(';')} if _SYSTEM == 'Windows' else None
+        for directory in os.environ.get('PATH', '').split(os.pathsep):
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if exts is not None:
+                            stem, ext = os.path.splitext(entry.name)
+                            if ext.lower() in exts:
+                                self._add(found, stem, entry.path, 'path', exe=entry.name)
+                        elif entry.is_file() and os.access(entry.path, os.X_OK):
+                            self._add(found, entry.name, entry.path, 'path', exe=entry.name)
+            except OSError:
+                continue
+
+    def scan(self) -> int:
+        """Rediscover installed applications and persist the result. Returns the number of names."""
+        started = time.perf_counter()
+        found: Dict[str, dict] = {}
+        if _SYSTEM == 'Windows':
+            scanners = [self._scan_start_menu, self._scan_app_paths, self._scan_install_dirs]
+        elif _SYSTEM == 'Darwin':
+            scanners = [self._scan_bundles]
+        else:
+            scanners = [self._scan_desktop_entries]
+        for scanner in scanners + [self._scan_path]:
+            try:
+                scanner(found)
+            except Exception as e:
+                print(f"[APPS] {scanner.__name__} failed: {e}")
+
+        self._set_apps(found)
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_suffix('.tmp')
+            tmp.write_text(json.dumps({'version': _CACHE_VERSION, 'scanned_at': time.time(), 'apps': found}), encoding='utf-8')
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"[APPS] Could not save app cache: {e}")
+        print(f"[APPS] Discovered {len(found)} app names ({time.perf_counter() - started:.1f}s)")
+        return len(found)
+
+    def _set_apps(self, apps: Dict[str, dict]):
+        try:
+            # PATH executables never take part in fuzzy matching ("open reboot", "rebot")
+            names = [key for key, entry in apps.items() if entry['kind'] != 'path']
+            index = TrigramIndex(names) if names else None   # Nothing found: exact lookups only
+            with self._lock:
+                self._apps, self._names, self._index = apps, names, index
+        finally:
+            self._ready.set()
+
+    def _load_cache(self):
+        try:
+            data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+            if not isinstance(data, dict) or data.get('version') != _CACHE_VERSION:
+                return
+            apps = data.get('apps')
+            if apps:
+                self._set_apps(apps)
+        except (OSError, ValueError):
+            pass
+
+    # ─── Lookups ─────────────────────────────────────────
+
+    def resolve(self, name: str, fuzzy: bool = True, path: bool = False) -> Optional[dict]:
+        """
+        Launch entry for an app name ('Google Chrome', 'chrome.exe', 'gimp'), or None.
+        Bare PATH executables only resolve with path=True (curated aliases), and never fuzzily.
+        """
+        if not self._ready.is_set():
+            self._ready.wait(timeout=10)
+        key = normalize_name(name[:-4] if name.lower().endswith('.exe') else name)
+        with self._lock:
+            apps, names, index = self._apps, self._names, self._index
+        entry = apps.get(key)
+        if entry and entry['kind'] == 'path' and not path:
+            entry = None
+        if entry or not fuzzy or index is None:
+            return entry
+        _, hits = index.search(key, limit=1)
+        if hits and hits[0][1] >= APP_MATCH_MIN_SCORE:
+            return apps[names[hits[0][0]]]
+        return None
+
+    def launch(self, entry: dict):
+        """Start an app from its registry entry (raises on failure)."""
+        command, kind = entry['command'], entry['kind']
+        if _SYSTEM == 'Windows':
+            os.startfile(command)
+        elif kind == 'bundle':
+            subprocess.Popen(['open', command])
+        else:
+            args = shlex.split(command) if kind == 'desktop' else [command]
+            subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+    def __len__(self) -> int:
+        return len(self._apps)
+
+    # ─── Background Refresh ──────────────────────────────
+
+    def _loop(self):
+        while self.running:
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"[APPS] Scan error: {e}")
+                self._ready.set()
+            for _ in range(int(max(1, self.refresh_interval))):
+                if not self.running:
+                    return
+                time.sleep(1)
+
+    def start(self):
+        """Scan in the background (the cached registry is served meanwhile), then keep refreshing."""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+
+
+def main():
+    registry = AppRegistry()
+    registry.scan()
+    for key, entry in sorted(registry._apps.items()):
+        print(f"  {key:30s} {entry['kind']:9s} {entry['command']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+"""
+JARVIS v1.0 — Backup & Restore
+Online backups of each profile's SQLite database and vector store while
+JARVIS keeps running:
+  - SQLite files are copied with the online backup API in small page
+    batches, so writers are never blocked for long
+  - The vector store is copied under its write lock, so its segment
+    files and chroma.sqlite3 match; segments that haven't changed since
+    the previous snapshot are hard-linked instead of copied
+  - Every snapshot has a manifest of SHA-256 checksums; restore verifies
+    it and runs PRAGMA integrity_check before touching live data
+
+Usage:
+  python backup.py backup [--profile NAME]
+  python backup.py list [--profile NAME]
+  python backup.py restore [SNAPSHOT] [--profile NAME]   (stop JARVIS first)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from config import (
+    BACKUP_DIR,
+    BACKUP_INTERVAL_HOURS,
+    BACKUP_KEEP,
+    BACKUP_PAGES_PER_STEP,
+    BACKUP_STEP_SLEEP,
+    DEFAULT_PROFILE,
+)
+from memory import known_profiles, normalize_profile_id, profile_paths
+from memory_backends import chroma_write_lock
+
+MANIFEST = "manifest.json"
+_NAME_FORMAT = '%Y%m%d_%H%M%S'
+_RETRY_BASE = 300         # Seconds before retrying a failed scheduled backup; doubles per failure
+
+
+def _snapshot_time(name: str) -> Optional[float]:
+    """Creation time encoded in a snapshot directory name, or None if it isn't one."""
+    try:
+        return datetime.strptime(name, _NAME_FORMAT).timestamp()
+    except ValueError:
+        return None
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _is_sqlite(path: Path) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(16) == b'SQLite format 3\x00'
+    except OSError:
+        return False
+
+
+def _online_copy(src: Path, dst: Path):
+    """Copy a live SQLite database page-batch by page-batch."""
+    source = sqlite3.connect(f'file:{src}?mode=ro', uri=True)
+    target = sqlite3.connect(str(dst))
+    try:
+        source.backup(target, pages=BACKUP_PAGES_PER_STEP, sleep=BACKUP_STEP_SLEEP)
+    finally:
+        target.close()
+        source.close()
+
+
+def _integrity_ok(db_path: Path) -> bool:
+    try:
+        conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)
+        try:
+            return conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return False
+
+
+class BackupManager:
+    """Creates, prunes, verifies and restores per-profile snapshots."""
+
+    def __init__(self, backup_dir: Path = BACKUP_DIR, keep: int = BACKUP_KEEP,
+                 interval_hours: float = BACKUP_INTERVAL_HOURS):
+        self.backup_dir = Path(backup_dir)
+        self.keep = max(1, keep)
+        self.interval = interval_hours * 3600
+        self.running = False
+        self._thread = None
+        self._lock = threading.Lock()   # One backup at a time
+        self._failures = {}             # profile -> (failures in a row, next attempt time)
+
+    # ─── Snapshots ───────────────────────────────────────
+
+    def _profile_dir(self, profile_id: str) -> Path:
+        return self.backup_dir / normalize_profile_id(profile_id)
+
+    def list_backups(self, profile_id: str = DEFAULT_PROFILE) -> List[str]:
+        """Completed snapshots for a profile, newest first."""
+        root = self._profile_dir(profile_id)
+        if not root.exists():
+            return []
+        return sorted(
+            (p.name for p in root.iterdir()
+             if _snapshot_time(p.name) is not None and (p / MANIFEST).exists()),
+            reverse=True,
+        )
+
+    def _load_manifest(self, snapshot: Path) -> dict:
+        return json.loads((snapshot / MANIFEST).read_text(encoding='utf-8'))
+
+    def create_backup(self, profile_id: str = DEFAULT_PROFILE) -> Path:
+        """Snapshot one profile without stopping JARVIS."""
+        profile_id = normalize_profile_id(profile_id)
+        db_path, chroma_dir = (Path(p) for p in profile_paths(profile_id))
+        root = self._profile_dir(profile_id)
+        root.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            started = time.perf_counter()
+            previous = self.list_backups(profile_id)
+            prev_dir = root / previous[0] if previous else None
+            prev_files = self._load_manifest(prev_dir)['files'] if prev_dir else {}
+
+            name = datetime.now().strftime(_NAME_FORMAT)
+            final = root / name
+            if final.exists():
+                return final  # Already snapshotted this second
+            partial = root / f'{name}.partial'
+            shutil.rmtree(partial, ignore_errors=True)
+            partial.mkdir()
+
+            files = {}
+            copied = linked = 0
+
+            if db_path.exists():
+                _online_copy(db_path, partial / 'jarvis.db')
+                files['jarvis.db'] = {'sha256': _sha256(partial / 'jarvis.db'), 'sqlite': True}
+                copied += 1
+
+            if chroma_dir.exists():
+                # Hold off writers so segment files and chroma.sqlite3 are copied as one state
+                with chroma_write_lock(str(chroma_dir)):
+                    for src in sorted(chroma_dir.rglob('*')):
+                        if not src.is_file() or src.name.endswith(('-wal', '-shm', '-journal')):
+                            continue
+                        rel = Path('chroma_store') / src.relative_to(chroma_dir)
+                        dst = partial / rel
+                        dst.parent.mkdir(parents=True, exist_ok=True)
+                        key = rel.as_posix()
+
+                        if _is_sqlite(src):
+                            _online_copy(src, dst)
+                            files[key] = {'sha256': _sha256(dst), 'sqlite': True}
+                            copied += 1
+                            continue
+
+                        stat = src.stat()
+                        prev = prev_files.get(key)
+                        if (prev and prev.get('size') == stat.st_size
+                                and prev.get('mtime_ns') == stat.st_mtime_ns):
+                            # Unchanged segment — share it with the previous snapshot
+                            try:
+                                os.link(prev_dir / rel, dst)
+                            except OSError:
+                                shutil.copy2(prev_dir / rel, dst)
+                            files[key] = dict(prev)
+                            linked += 1
+                        else:
+                            shutil.copy2(src, dst)
+                            files[key] = {'sha256': _sha256(dst), 'size': stat.st_size,
+                                          'mtime_ns': stat.st_mtime_ns}
+                            copied += 1
+
+            manifest = {
+                'profile': profile_id,
+                'created_at': datetime.now().isoformat(),
+                'files': files,
+            }
+            (partial / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+            partial.rename(final)
+
+        print(f"[BACKUP] {profile_id}: snapshot {name} — {copied} copied, {linked} unchanged "
+              f"({time.perf_counter() - started:.1f}s)")
+        self.prune(profile_id)
+        return final
+
+    def prune(self, profile_id: str = DEFAULT_PROFILE) -> int:
+        """Apply the retention policy: keep the newest `keep` snapshots."""
+        root = self._profile_dir(profile_id)
+        removed = 0
+        for name in self.list_backups(profile_id)[self.keep:]:
+            shutil.rmtree(root / name, ignore_errors=True)
+            removed += 1
+        # Leftovers from interrupted runs
+        if root.exists():
+            for stale in root.glob('*.partial'):
+                shutil.rmtree(stale, ignore_errors=True)
+        return removed
+
+    # ─── Verify & Restore ────────────────────────────────
+
+    def verify(self, snapshot: Path) -> List[str]:
+        """Return a list of problems with a snapshot (empty means it's good)."""
+        problems = []
+        try:
+            manifest = self._load_manifest(snapshot)
+        except (OSError, ValueError) as e:
+            return [f"manifest unreadable: {e}"]
+
+        for rel, meta in manifest['files'].items():
+            path = snapshot / rel
+            if not path.exists():
+                problems.append(f"missing: {rel}")
+            elif _sha256(path) != meta['sha256']:
+                problems.append(f"checksum mismatch: {rel}")
+            elif meta.get('sqlite') and not _integrity_ok(path):
+                problems.append(f"integrity check failed: {rel}")
+        return problems
+
+    def restore(self, profile_id: str = DEFAULT_PROFILE, snapshot_name: Optional[str] = None) -> str:
+        """Restore a verified snapshot over the live data. JARVIS should be stopped."""
+        profile_id = normalize_profile_id(profile_id)
+        available = self.list_backups(profile_id)
+        if not available:
+            return f"No backups found for profile '{profile_id}'."
+        snapshot_name = snapshot_name or available[0]
+        if snapshot_name not in available:
+            return f"Backup '{snapshot_name}' not found. Available: {', '.join(available[:5])}"
+
+        snapshot = self._profile_dir(profile_id) / snapshot_name
+        problems = self.verify(snapshot)
+        if problems:
+            return f"Backup {snapshot_name} failed verification: " + "; ".join(problems[:5])
+
+        db_path, chroma_dir = (Path(p) for p in profile_paths(profile_id))
+
+        # The database is restored through the backup API, which takes the
+        # proper locks on the live file instead of overwriting it underneath
+        if (snapshot / 'jarvis.db').exists():
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            _online_copy(snapshot / 'jarvis.db', db_path)
+
+        if (snapshot / 'chroma_store').exists():
+            aside = chroma_dir.with_name(chroma_dir.name + '.pre-restore')
+            shutil.rmtree(aside, ignore_errors=True)
+            if chroma_dir.exists():
+                chroma_dir.rename(aside)
+            shutil.copytree(snapshot / 'chroma_store', chroma_dir)
+            shutil.rmtree(aside, ignore_errors=True)
+
+        return f"Restored profile '{profile_id}' from backup {snapshot_name}."
+
+    # ─── Schedule ────────────────────────────────────────
+
+    def backup_all(self, due_only: bool = False):
+        """Snapshot every profile (or just those due). Failed profiles are retried with backoff."""
+        for profile_id in known_profiles():
+            if due_only and not self._due(profile_id):
+                continue
+            try:
+                self.create_backup(profile_id)
+                self._failures.pop(profile_id, None)
+            except Exception as e:
+                failures = self._failures.get(profile_id, (0, 0))[0] + 1
+                delay = min(max(self.interval, _RETRY_BASE), _RETRY_BASE * 2 ** (failures - 1))
+                self._failures[profile_id] = (failures, time.time() + delay)
+                print(f"[BACKUP] {profile_id}: failed ({failures} in a row, retrying in {delay / 60:.0f} min): {e}")
+
+    def _due(self, profile_id: str) -> bool:
+        """True if a profile's newest snapshot is older than the interval and it isn't backing off."""
+        if time.time() < self._failures.get(profile_id, (0, 0))[1]:
+            return False
+        latest = self.list_backups(profile_id)
+        if not latest:
+            return True
+        return time.time() - _snapshot_time(latest[0]) >= self.interval
+
+    def _loop(self):
+        while self.running:
+            try:
+                self.backup_all(due_only=True)
+            except Exception as e:
+                print(f"[BACKUP] Error: {e}")
+            # Sleep in short slices so stop() returns promptly
+            for _ in range(60):
+                if not self.running:
+                    return
+                time.sleep(1)
+
+    def start(self):
+        """Run scheduled backups in a background thread."""
+        if self.running or self.interval <= 0:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        print(f"[BACKUP] Scheduled every {self.interval / 3600:g}h, keeping {self.keep} snapshots.")
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS memory backup & restore')
+    parser.add_argument('command', choices=['backup', 'list', 'restore'])
+    parser.add_argument('snapshot', nargs='?', help='Snapshot name to restore (default: newest)')
+    parser.add_argument('--profile', default=DEFAULT_PROFILE)
+    args = parser.parse_args()
+
+    manager = BackupManager()
+    if args.command == 'backup':
+        print(f"Created {manager.create_backup(args.profile)}")
+    elif args.command == 'list':
+        backups = manager.list_backups(args.profile)
+        print("\n".join(backups) if backups else "No backups yet.")
+    else:
+        print(manager.restore(args.profile, args.snapshot))
+
+
+if __name__ == '__main__':
+    main()
@@ -47,19 +47,26 @@ INTENT_PATTERNS = {
     ],
     Intent.NOTES: [
         'take a note', 'save a note', 'note that', 'my notes',
-        'show notes', 'search notes', 'delete note',
+        'show notes', 'search notes', 'delete note', 'export notes',
+        'summarize my notes', 'summarize notes', 'summarise my notes', 'summarise notes',
     ],
     Intent.MEMORY: [
         'remember that', 'do you remember', 'what did i say',
         'what do you know about me', 'forget', 'my name is',
         'i prefer', 'i like', 'i hate', 'i work at', 'i live in',
         'privacy mode', 'go private', 'export memory', 'wipe memory',
+        'switch profile', 'switch user', 'current profile', 'list profiles',
+        'create profile', 'new profile',
     ],
     Intent.SYSTEM: [
         'open ', 'close ', 'launch ', 'start ', 'kill ',
         'volume', 'mute', 'unmute', 'screenshot', 'battery',
         'cpu usage', 'disk space', 'system info', 'ip address',
         'wifi', 'process', 'coding setup',
+        'read file', 'list files', 'show files', 'read lines', 'show lines',
+        'read page', 'next page', 'previous page',
+        'safety log', 'blocked actions', 'what did you block',
+        'summarize file', 'summarise file', 'summarize the file', 'summarize this file',
     ],
     Intent.SEARCH: [
         'search for', 'look up', 'google', 'find information',
@@ -105,8 +112,21 @@ class Brain:
         except Exception as e:
             print(f"[BRAIN] ⚠️ Ollama check failed: {e}")
 
-    def _call_ollama(self, model: str, prompt: str, system: str = '') -> str:
-        """Make a request to Ollama's generate API."""
+    # _call_ollama's failure messages, matched exactly so a real answer that
+    # happens to start with "Error handling in Rust..." is not mistaken for one
+    ERROR_STATUS = "Error: Ollama returned status "
+    ERROR_REQUEST = "Error communicating with Ollama: "
+    ERROR_TIMEOUT = "I'm taking too long to respond. Let me try with a simpler approach."
+    ERROR_UNREACHABLE = "I can't reach my language model. Make sure Ollama is running."
+    ERROR_PREFIXES = (ERROR_STATUS, ERROR_REQUEST, ERROR_TIMEOUT, ERROR_UNREACHABLE)
+
+    @classmethod
+    def is_error(cls, response: str) -> bool:
+        """Is this one of _call_ollama's failure messages (not worth caching)?"""
+        return not response or response.startswith(cls.ERROR_PREFIXES)
+
+    def _call_ollama(self, model: str, prompt: str, system: str = '', options: dict = None) -> str:
+        """Make a request to Ollama's generate API (options: e.g. {'num_predict': 200})."""
         try:
             payload = {
                 'model': model,
@@ -115,6 +135,8 @@ class Brain:
             }
             if system:
                 payload['system'] = system
+            if options:
+                payload['options'] = options
 
             resp = requests.post(
                 f'{self.ollama}/api/generate',
@@ -124,13 +146,13 @@ class Brain:
             if resp.status_code == 200:
                 return resp.json().get('response', '').strip()
             else:
-                return f"Error: Ollama returned status {resp.status_code}"
+                return f"{self.ERROR_STATUS}{resp.status_code}"
         except requests.Timeout:
-            return "I'm taking too long to respond. Let me try with a simpler approach."
+            return self.ERROR_TIMEOUT
         except requests.ConnectionError:
-            return "I can't reach my language model. Make sure Ollama is running."
+            return self.ERROR_UNREACHABLE
         except Exception as e:
-            return f"Error communicating with Ollama: {e}"
+            return f"{self.ERROR_REQUEST}{e}"
 
     def _pattern_match_intent(self, user_input: str) -> Intent | None:
         """Try to match intent using keyword patterns (no LLM call needed)."""
@@ -0,0 +1,583 @@
+"""
+JARVIS v1.0 — Code Index
+Symbol index of the user's projects (CODE_ROOTS), so a request like
+"fix the bug in my parser" reaches the code model together with the
+code it is about.
+
+  - Python is parsed with ast: classes, functions, methods and module
+    variables with their line spans and character offsets, plus every
+    name and attribute used (references)
+  - Other languages (JS/TS, Java, C/C++, C#, Go, Rust, Ruby, PHP, ...)
+    go through a lightweight line tokenizer: definition patterns, brace
+    or indentation matching for the span, identifiers as references
+  - Files are re-parsed only when their mtime or size changed, on a
+    background thread so indexing a large repo never blocks a request;
+    `build` (and CODE_INDEX_WORKERS > 1) parses big batches in a process pool
+  - context_for(request) returns the best definitions that fit in
+    CODE_CONTEXT_TOKENS, but only when the request names an indexed
+    symbol or file ("fix parse_file", "the bug in parser.py")
+
+Usage:
+  python code_index.py build [--workers 4]
+  python code_index.py search "parser bug" [-n 10]
+  python code_index.py context "fix the bug in my parser"
+  python code_index.py refs NAME
+"""
+
+import argparse
+import ast
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    CODE_CONTEXT_TOKENS,
+    CODE_EXTENSIONS,
+    CODE_INDEX_PATH,
+    CODE_INDEX_REFRESH,
+    CODE_INDEX_WORKERS,
+    CODE_MAX_FILE_BYTES,
+    CODE_ROOTS,
+    CODE_SKIP_DIRS,
+    CODE_SNIPPET_LINES,
+    FILE_INDEX_MAX_DEPTH,
+)
+from safety import is_path_protected
+
+_POOL_MIN = 32            # Fewer changed files than this are parsed on the indexing thread
+_BATCH = 200              # Parsed files written per transaction
+_REF_LINES = 20           # Line numbers kept per (file, name) reference entry
+_CANDIDATES = 400         # Symbols scored per query
+_MIN_RELATIVE_SCORE = 0.4 # Context only includes named symbols scoring at least this fraction of the best
+
+_LANGUAGES = {
+    '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.ts': 'typescript', '.tsx': 'typescript',
+    '.java': 'java', '.kt': 'kotlin', '.c': 'c', '.h': 'c', '.cpp': 'cpp', '.hpp': 'cpp', '.cc': 'cpp',
+    '.cs': 'csharp', '.go': 'go', '.rs': 'rust', '.rb': 'ruby', '.php': 'php', '.swift': 'swift',
+    '.scala': 'scala',
+}
+_KEYWORDS = frozenset('''
+    if else elif for while do switch case break continue return try catch except finally throw raise
+    new delete class struct interface enum def function func fn fun var let const static public private
+    protected internal final abstract virtual override async await yield import from export package
+    using namespace include define this self super null nil none true false void int long float double
+    char bool boolean string auto sizeof typeof instanceof and not lambda pass with end then begin module
+    impl trait type match where pub mut ref val object extends implements
+'''.split())
+_QUERY_STOPWORDS = _KEYWORDS | frozenset('''
+    the fix bug bugs error errors issue in my our code why does doesn work working broken crash crashes
+    please help can you how what when where which explain write add make change update refactor
+    function method file files there that this with into should would could about test tests failing
+    python javascript typescript java script program using
+'''.split())
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*')
+_STRINGS = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|//.*$|#.*$')
+
+# (pattern, kind, group holding the name) — tried in order on each line
+_DEFINITIONS = [
+    (re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:(?:abstract|final|public|private|protected|internal|'
+                r'static|sealed|partial|data|open|pub(?:\([^)]*\))?)\s+)*'
+                r'(class|interface|struct|enum|trait|module|object|record|protocol|impl)\s+([A-Za-z_]\w*)'), 'class', 2),
+    (re.compile(r'^\s*type\s+([A-Za-z_]\w*)\s+(?:struct|interface)\b'), 'class', 1),   # Go
+    (re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)'), 'function', 1),
+    (re.compile(r'^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s+)?'
+                r'(?:function\b|\([^)]*\)\s*=>|[A-Za-z_$][\w$]*\s*=>)'), 'function', 1),
+    (re.compile(r'^\s*(?:(?:public|private|protected|internal|open|override|static)\s+)*'
+                r'(?:func|fun)\s+(?:\([^)]*\)\s*)?(?:<[^>]*>\s*)?([A-Za-z_]\w*)'), 'function', 1),   # Go, Kotlin, Swift
+    (re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+([A-Za-z_]\w*)'), 'function', 1),
+    (re.compile(r'^\s*def\s+(?:self\.)?([A-Za-z_]\w*[?!=]?)'), 'function', 1),   # Ruby
+    (re.compile(r'^\s*(?:(?:public|private|protected|static|abstract|final)\s+)*function\s+&?([A-Za-z_]\w*)'), 'function', 1),
+    # C-family definitions: "type name(args) {" with the brace here or on the next line
+    (re.compile(r'^\s*(?:[\w:<>\[\],\*&~]+\s+)+[\*&]*([A-Za-z_~][\w:~]*)\s*\([^;]*\)\s*(?:const\s*)?'
+                r'(?:noexcept\s*)?(?:throws\s+[\w., ]+)?\{?\s*$'), 'function', 1),
+    # Class-body methods: "name(args) {" / "async name(args): T {"
+    (re.compile(r'^\s+(?:(?:static|async|public|private|protected|get|set|override)\s+)*'
+                r'([A-Za-z_$][\w$]*)\s*\([^;]*\)\s*(?::\s*[^{=]+)?\{\s*$'), 'method', 1),
+]
+
+
+# ─── Parsing (runs in worker processes) ──────────────────
+
+def _line_starts(text: str) -> List[int]:
+    starts = [0]
+    for match in re.finditer('\n', text):
+        starts.append(match.end())
+    return starts
+
+
+def _parse_python(text: str, starts: List[int]):
+    """(symbols, references) of Python source via ast."""
+    tree = ast.parse(text)
+    lines = text.split('\n')
+    symbols = []
+
+    def offset(line: int, col: int = 0) -> int:
+        # ast columns count UTF-8 bytes; offsets here count characters
+        text_line = lines[line - 1] if line <= len(lines) else ''
+        return starts[min(line, len(starts)) - 1] + len(text_line.encode('utf-8')[:col].decode('utf-8', 'ignore'))
+
+    def visit(node, container: str, in_class: bool):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                is_class = isinstance(child, ast.ClassDef)
+                kind = 'class' if is_class else ('method' if in_class else 'function')
+                first = min([d.lineno for d in child.decorator_list] + [child.lineno])
+                end = getattr(child, 'end_lineno', None) or child.lineno
+                end_col = getattr(child, 'end_col_offset', None) or 0
+                symbols.append((child.name, kind, container, first, end, offset(first),
+                                offset(end, end_col), lines[child.lineno - 1].strip()[:200]))
+                visit(child, f"{container}.{child.name}" if container else child.name, is_class)
+            elif isinstance(child, (ast.Assign, ast.AnnAssign)) and not container:
+                targets = child.targets if isinstance(child, ast.Assign) else [child.target]
+                for target in targets:
+                    if isinstance(target, ast.Name):
+                        end = getattr(child, 'end_lineno', None) or child.lineno
+                        symbols.append((target.id, 'variable', '', child.lineno, end,
+                                        offset(child.lineno), offset(end) + len(lines[end - 1]),
+                                        lines[child.lineno - 1].strip()[:200]))
+            elif not isinstance(child, (ast.expr, ast.Lambda)):
+                visit(child, container, in_class)
+
+    visit(tree, '', False)
+
+    refs = defaultdict(list)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            refs[node.id].append(node.lineno)
+        elif isinstance(node, ast.Attribute):
+            refs[node.attr].append(node.lineno)
+    return symbols, refs
+
+
+def _block_end(lines: List[str], index: int, ruby: bool) -> int:
+    """0-based last line of the definition starting at lines[index]."""
+    if ruby:
+        indent = len(lines[index]) - len(lines[index].lstrip())
+        for j in range(index + 1, min(len(lines), index + 2000)):
+            stripped = lines[j].strip()
+            if stripped == 'end' and len(lines[j]) - len(lines[j].lstrip()) <= indent:
+                return j
+        return index
+    if '{' not in _STRINGS.sub('', lines[index]) and not (
+            index + 1 < len(lines) and lines[index + 1].lstrip().startswith('{')):
+        return index            # Declaration or expression body: one line
+    depth, opened = 0, False
+    for j in range(index, min(len(lines), index + 2000)):
+        code = _STRINGS.sub('', lines[j])
+        depth += code.count('{') - code.count('}')
+        opened = opened or '{' in code
+        if opened and depth <= 0:
+            return j
+    return index
+
+
+def _parse_generic(text: str, starts: List[int], lang: str):
+    """(symbols, references) from definition patterns and identifier tokens."""
+    lines = text.split('\n')
+    symbols = []
+    classes = []             # (name, first, last) spans, for attributing methods
+    for i, line in enumerate(lines):
+        if len(line) > 400 or not line.strip():
+            continue
+        for pattern, kind, group in _DEFINITIONS:
+            m = pattern.match(line)
+            if not m:
+                continue
+            name = m.group(group)
+            if name.lower() in _KEYWORDS:
+                break
+            end = _block_end(lines, i, lang == 'ruby')
+            container = next((c for c, first, last in reversed(classes) if first < i <= last), '')
+            if kind == 'function' and container:
+                kind = 'method'
+            if kind == 'method' and not container:
+                kind = 'function'
+            symbols.append((name, kind, container, i + 1, end + 1, starts[i],
+                            starts[end] + len(lines[end]), line.strip()[:200]))
+            if kind == 'class':
+                classes.append((name, i, end))
+            break
+
+    refs = defaultdict(list)
+    for i, line in enumerate(lines):
+        for name in _IDENTIFIER.findall(line):
+            if len(name) > 2 and name.lower() not in _KEYWORDS:
+                refs[name].append(i + 1)
+    return symbols, refs
+
+
+def parse_file(job: Tuple[str, int, int]):
+    """
+    Parse one file: (path, mtime_ns, size) -> (path, mtime_ns, size, lang,
+    symbols, refs). Symbols are (name, kind, container, line, end_line,
+    start_offset, end_offset, signature); offsets are character offsets.
+    Refs are (name, count, "l1,l2,...").
+    """
+    path, mtime_ns, size = job
+    lang = _LANGUAGES.get(os.path.splitext(path)[1].lower(), 'text')
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read(CODE_MAX_FILE_BYTES + 1)
+    except OSError:
+        return path, mtime_ns, size, lang, [], []
+    if len(raw) > CODE_MAX_FILE_BYTES or b'\x00' in raw[:4096]:
+        return path, mtime_ns, size, lang, [], []
+    text = raw.decode('utf-8', errors='replace').replace('\r\n', '\n')
+    starts = _line_starts(text)
+    try:
+        symbols, refs = _parse_python(text, starts) if lang == 'python' else _parse_generic(text, starts, lang)
+    except (SyntaxError, ValueError, RecursionError):
+        symbols, refs = _parse_generic(text, starts, lang)
+    ref_rows = [(name, len(found), ','.join(map(str, sorted(set(found))[:_REF_LINES])))
+                for name, found in refs.items()]
+    return path, mtime_ns, size, lang, symbols, ref_rows
+
+
+# ─── Index ───────────────────────────────────────────────
+
+def _query_words(text: str) -> List[str]:
+    """Identifier-like words of a request, split at snake_case and camelCase too."""
+    words = []
+    for token in _IDENTIFIER.findall(text):
+        parts = [token] + re.split(r'_+|(?<=[a-z0-9])(?=[A-Z])', token)
+        for part in parts:
+            part = part.lower().strip('_$')
+            if len(part) > 2 and part not in _QUERY_STOPWORDS and part not in words:
+                words.append(part)
+    return words
+
+
+class CodeIndex:
+    """Incrementally updated symbol/reference index over project roots."""
+
+    def __init__(self, roots: List[str] = None, db_path: Path = CODE_INDEX_PATH,
+                 refresh_interval: float = CODE_INDEX_REFRESH, workers: int = CODE_INDEX_WORKERS):
+        self.roots = [os.path.abspath(r) for r in (roots or CODE_ROOTS)]
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.refresh_interval = refresh_interval
+        self.workers = workers
+        self.extensions = {e.lower() for e in CODE_EXTENSIONS}
+        self.skip_dirs = {d.lower() for d in CODE_SKIP_DIRS}
+        self.running = False
+        self._thread = None
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS files (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path TEXT NOT NULL UNIQUE,
+                    stem TEXT NOT NULL,          -- Lowercase file name without extension
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    lang TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS symbols (
+                    file_id INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    container TEXT NOT NULL,
+                    line INTEGER NOT NULL,
+                    end_line INTEGER NOT NULL,
+                    start_offset INTEGER NOT NULL,
+                    end_offset INTEGER NOT NULL,
+                    signature TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS refs (
+                    file_id INTEGER NOT NULL,
+                    name TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    lines TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name COLLATE NOCASE);
+                CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_id);
+                CREATE INDEX IF NOT EXISTS idx_refs_name ON refs(name);
+                CREATE INDEX IF NOT EXISTS idx_refs_file ON refs(file_id);
+            ''')
+
+    # ─── Crawling ────────────────────────────────────────
+
+    def _skip_dir(self, name: str, path: str) -> bool:
+        return name.startswith('.') or name.lower() in self.skip_dirs or is_path_protected(path)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """{path: (mtime_ns, size)} of every source file under the roots."""
+        found = {}
+        stack = [(root, 0) for root in self.roots if os.path.isdir(root) and not is_path_protected(root)]
+        while stack:
+            current, depth = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if depth < FILE_INDEX_MAX_DEPTH and not self._skip_dir(entry.name, entry.path):
+                                    stack.append((entry.path, depth + 1))
+                            elif (entry.is_file(follow_symlinks=False)
+                                  and os.path.splitext(entry.name)[1].lower() in self.extensions):
+                                st = entry.stat(follow_symlinks=False)
+                                found[entry.path] = (st.st_mtime_ns, st.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+
+    def _store(self, parsed: Iterable[tuple]) -> int:
+        """Write parsed files, _BATCH per transaction. Returns how many were written."""
+        written = 0
+        conn = self._connect()
+        try:
+            for path, mtime_ns, size, lang, symbols, refs in parsed:
+                row = conn.execute('SELECT id FROM files WHERE path = ?', (path,)).fetchone()
+                if row:
+                    file_id = row[0]
+                    conn.execute('UPDATE files SET mtime_ns = ?, size = ?, lang = ? WHERE id = ?',
+                                 (mtime_ns, size, lang, file_id))
+                    conn.execute('DELETE FROM symbols WHERE file_id = ?', (file_id,))
+                    conn.execute('DELETE FROM refs WHERE file_id = ?', (file_id,))
+                else:
+                    stem = os.path.splitext(os.path.basename(path))[0].lower()
+                    file_id = conn.execute('INSERT INTO files (path, stem, mtime_ns, size, lang) VALUES (?, ?, ?, ?, ?)',
+                                           (path, stem, mtime_ns, size, lang)).lastrowid
+                conn.executemany('INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                                 [(file_id,) + tuple(s) for s in symbols])
+                conn.executemany('INSERT INTO refs VALUES (?, ?, ?, ?)', [(file_id,) + tuple(r) for r in refs])
+                written += 1
+                if written % _BATCH == 0:
+                    conn.commit()
+            conn.commit()
+        finally:
+            conn.close()
+        return written
+
+    def refresh(self) -> Tuple[int, int]:
+        """
+        Re-parse new and changed files and drop deleted ones.
+        Returns (files parsed, files removed).
+        """
+        with self._refresh_lock:
+            on_disk = self._scan()
+            with self._connect() as conn:
+                known = {path: (file_id, mtime_ns, size) for file_id, path, mtime_ns, size
+                         in conn.execute('SELECT id, path, mtime_ns, size FROM files')}
+            jobs = [(path, *stat) for path, stat in on_disk.items() if path not in known or known[path][1:] != stat]
+            gone = [(known[path][0],) for path in known.keys() - on_disk.keys()]
+
+            if len(jobs) >= _POOL_MIN and self.workers > 1:
+                try:
+                    with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                        parsed = self._store(pool.map(parse_file, jobs, chunksize=16))
+                except (BrokenProcessPool, OSError) as e:
+                    print(f"[CODE] Parser processes failed ({e}); indexing in-process")
+                    parsed = self._store(map(parse_file, jobs))
+            else:
+                parsed = self._store(map(parse_file, jobs))
+            if gone:
+                with self._connect() as conn:
+                    for table, column in (('symbols', 'file_id'), ('refs', 'file_id'), ('files', 'id')):
+                        conn.executemany(f'DELETE FROM {table} WHERE {column} = ?', gone)
+            return parsed, len(gone)
+
+    # ─── Lookups ─────────────────────────────────────────
+
+    def _root_relative(self, path: str) -> str:
+        for root in self.roots:
+            if path.startswith(root + os.sep):
+                return os.path.relpath(path, os.path.dirname(root))
+        return path
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """Symbols best matching the words of a request, best first."""
+        words = _query_words(query)
+        if not words:
+            return []
+        clauses = ' OR '.join(['s.name LIKE ?', 'f.stem LIKE ?'] * len(words))
+        params = [f'%{w}%' for w in words for _ in range(2)]
+        marks = ','.join('?' * len(words))
+        with self._connect() as conn:
+            rows = conn.execute(f'''
+                SELECT s.name, s.kind, s.container, s.line, s.end_line, s.start_offset, s.end_offset,
+                       s.signature, f.path, f.stem, f.mtime_ns
+                FROM symbols s JOIN files f ON f.id = s.file_id
+                WHERE {clauses}
+                ORDER BY lower(s.name) IN ({marks}) OR f.stem IN ({marks}) DESC
+                LIMIT ?
+            ''', params + words + words + [_CANDIDATES * 4]).fetchall()
+            names = list({row[0] for row in rows})
+            usage = {}
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                usage.update(conn.execute(
+                    f"SELECT name, SUM(count) FROM refs WHERE name IN ({','.join('?' * len(chunk))}) GROUP BY name",
+                    chunk).fetchall())
+
+        now = time.time()
+        scored = []
+        for name, kind, container, line, end_line, start_offset, end_offset, signature, path, stem, mtime_ns in rows:
+            lower, owner = name.lower(), container.lower()
+            score = 0.0
+            # Named by the request: the file's name, or the symbol's own name
+            # (single-word variables like "url" or "data" don't count)
+            named = stem in words or (lower in words and (kind != 'variable' or len(_query_words(name)) > 1))
+            for w in words:
+                if lower == w:
+                    score += 3
+                elif lower.startswith(w) or lower.endswith(w):
+                    score += 2
+                elif w in lower:
+                    score += 1
+                if w in owner:
+                    score += 0.5
+                if w in stem:
+                    score += 1
+            if not score:
+                continue
+            score *= 0.5 if kind == 'variable' else 1.0
+            score += min(1.0, math.log1p(usage.get(name, 0)) / 5)               # Widely used
+            score += 0.5 * math.exp(-(now - mtime_ns / 1e9) / (7 * 86400))     # Recently edited
+            scored.append((score, {'name': name, 'kind': kind, 'container': container, 'path': path,
+                                   'line': line, 'end_line': end_line, 'start_offset': start_offset,
+                                   'end_offset': end_offset, 'signature': signature, 'score': round(score, 3),
+                                   'named': named}))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [symbol for _, symbol in scored[:limit]]
+
+    def references(self, name: str, limit: int = 20) -> List[Tuple[str, int, List[int]]]:
+        """(path, count, first lines) of files that use a name, most uses first."""
+        with self._connect() as conn:
+            rows = conn.execute('''
+                SELECT f.path, r.count, r.lines FROM refs r JOIN files f ON f.id = r.file_id
+                WHERE r.name = ? ORDER BY r.count DESC LIMIT ?
+            ''', (name, limit)).fetchall()
+        return [(path, count, [int(n) for n in lines.split(',') if n]) for path, count, lines in rows]
+
+    def context_for(self, query: str, budget: int = CODE_CONTEXT_TOKENS) -> str:
+        """
+        Source of the definitions a request refers to, as labelled snippets
+        totalling at most about `budget` tokens. Only symbols the request
+        names (by symbol or file name) qualify, so a general question like
+        "how do I reverse a linked list" gets '' rather than loose matches.
+        """
+        snippets, used, taken = [], 0, defaultdict(list)
+        files: Dict[str, Optional[List[str]]] = {}
+        found = [symbol for symbol in self.search(query, limit=100) if symbol['named']]
+        for symbol in found:
+            if symbol['score'] < _MIN_RELATIVE_SCORE * found[0]['score']:
+                break
+            path, first, last = symbol['path'], symbol['line'], symbol['end_line']
+            if any(first <= b and a <= last for a, b in taken[path]):
+                continue        # Overlaps a chosen snippet (e.g. the class of a chosen method)
+            if path not in files:
+                try:
+                    files[path] = Path(path).read_text(encoding='utf-8', errors='replace').split('\n')
+                except OSError:
+                    files[path] = None
+            lines = files[path]
+            if not lines:
+                continue
+            cut = last - first + 1 > CODE_SNIPPET_LINES
+            body = lines[first - 1:min(last, first + CODE_SNIPPET_LINES - 1)]
+            label = f"{symbol['container']}.{symbol['name']}" if symbol['container'] else symbol['name']
+            header = f"# {self._root_relative(path)}:{first}-{last} ({symbol['kind']} {label})"
+            users = [self._root_relative(p) for p, _, _ in self.references(symbol['name'], 4) if p != path][:3]
+            if users:
+                header += f"\n# used in: {', '.join(users)}"
+            text = header + '\n' + '\n'.join(body) + ('\n    ...' if cut else '')
+            cost = (len(text) + 3) // 4
+            if used + cost > budget:
+                continue
+            snippets.append(text)
+            used += cost
+            taken[path].append((first, last))
+        return '\n\n'.join(snippets)
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            files = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+            symbols = conn.execute('SELECT COUNT(*) FROM symbols').fetchone()[0]
+            refs = conn.execute('SELECT COUNT(*) FROM refs').fetchone()[0]
+        return {'files': files, 'symbols': symbols, 'references': refs}
+
+    # ─── Background Refresh ──────────────────────────────
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def _loop(self):
+        while self.running:
+            try:
+                started = time.perf_counter()
+                parsed, removed = self.refresh()
+                if parsed or removed:
+                    print(f"[CODE] Indexed {parsed} files, removed {removed} "
+                          f"({time.perf_counter() - started:.1f}s)")
+            except Exception as e:
+                print(f"[CODE] Index error: {e}")
+            self._ready.set()
+            for _ in range(int(max(1, self.refresh_interval))):
+                if not self.running:
+                    return
+                time.sleep(1)
+
+    def start(self):
+        """Index in the background, then keep refreshing."""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS workspace code index.')
+    parser.add_argument('command', choices=['build', 'search', 'context', 'refs', 'stats'])
+    parser.add_argument('query', nargs='?', default='')
+    parser.add_argument('-n', type=int, default=10, help='results to show')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help='parser processes for build')
+    args = parser.parse_args()
+
+    index = CodeIndex(workers=args.workers)
+    started = time.perf_counter()
+    if args.command == 'build':
+        parsed, removed = index.refresh()
+        stats = index.stats()
+        print(f"Parsed {parsed}, removed {removed} in {time.perf_counter() - started:.1f}s "
+              f"({stats['files']} files, {stats['symbols']} symbols)")
+    elif args.command == 'search':
+        for s in index.search(args.query, args.n):
+            print(f"{s['score']:6.2f}  {s['kind']:<8} {s['name']:<30} {s['path']}:{s['line']}")
+    elif args.command == 'context':
+        print(index.context_for(args.query) or "Nothing relevant indexed.")
+    elif args.command == 'refs':
+        for path, count, lines in index.references(args.query, args.n):
+            print(f"{count:5}  {path}  lines {', '.join(map(str, lines))}")
+    else:
+        print(index.stats())
+    if args.command != 'build':
+        print(f"({(time.perf_counter() - started) * 1000:.1f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -11,15 +11,19 @@ load_dotenv()
 
 # ─── Paths ───────────────────────────────────────────────
 BASE_DIR = Path(__file__).parent
-DATA_DIR = BASE_DIR / "data"
+DATA_DIR = Path(os.getenv("JARVIS_DATA_DIR", BASE_DIR / "data"))   # Point elsewhere for tests/benchmarks
 NOTES_DIR = DATA_DIR / "notes"
 MODELS_DIR = BASE_DIR / "models"
 DB_PATH = DATA_DIR / "jarvis.db"
 CHROMA_DIR = str(DATA_DIR / "chroma_store")
+PROFILES_DIR = DATA_DIR / "profiles"     # Per-user memory (non-default profiles)
+
+
+def ensure_data_dirs():
+    """Create the data directories. Called at startup, not on import."""
+    for directory in (DATA_DIR, NOTES_DIR, MODELS_DIR):
+        directory.mkdir(parents=True, exist_ok=True)
 
-DATA_DIR.mkdir(exist_ok=True)
-NOTES_DIR.mkdir(exist_ok=True)
-MODELS_DIR.mkdir(exist_ok=True)
 
 # ─── Ollama ──────────────────────────────────────────────
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
@@ -48,6 +52,165 @@ TTS_BACKEND = os.getenv("TTS_BACKEND", "kokoro")
 MAX_SHORT_TERM      = 10
 MAX_SEMANTIC_RESULTS = 3
 PRIVACY_MODE        = False
+SHORT_TERM_TOKEN_BUDGET = int(os.getenv("SHORT_TERM_TOKEN_BUDGET", "600"))   # Recent turns in prompt
+SHORT_TERM_ENTRY_TOKENS = 150   # Per-turn cap (long code answers get clipped)
+SUMMARY_TOKEN_BUDGET    = int(os.getenv("SUMMARY_TOKEN_BUDGET", "200"))      # Rolling summary cap
+MAX_CONTEXT_FACTS       = int(os.getenv("MAX_CONTEXT_FACTS", "8"))           # Facts injected per turn
+PINNED_FACT_KEYS        = ["name", "location", "city", "country", "timezone"]  # Always injected (whole key, "user_"/"home_" prefixes allowed)
+FACT_EMBED_BATCH        = 16    # Missing fact vectors embedded per background request
+FACT_EXTRACTION_DEBOUNCE = 30   # Seconds of quiet before a fact-extraction batch runs
+FACT_EXTRACTION_BATCH    = 20   # Utterances per extraction call (also triggers an early run)
+PATTERN_HALF_LIFE_DAYS   = float(os.getenv("PATTERN_HALF_LIFE_DAYS", "14"))  # Habit decay
+MEMORY_BACKEND           = os.getenv("MEMORY_BACKEND", "sqlite")  # "sqlite" (SQLite + ChromaDB) or "memory" (no disk)
+
+# ─── Profiles (multi-user memory) ───────────────────────
+DEFAULT_PROFILE          = os.getenv("JARVIS_PROFILE", "default")  # Uses DB_PATH / CHROMA_DIR
+MAX_OPEN_PROFILES        = 4      # Profiles kept open at once (least recently used is closed)
+PROFILE_IDLE_SECONDS     = 600    # Inactive profiles are closed after this long
+PROFILE_MAX_CONVERSATIONS = 50000  # Per-profile size limits (oldest entries pruned)
+PROFILE_MAX_FACTS        = 5000
+PROFILE_MAX_EPISODES     = 20000
+
+# ─── Backups ────────────────────────────────────────────
+BACKUP_DIR               = DATA_DIR / "backups"
+BACKUP_INTERVAL_HOURS    = float(os.getenv("BACKUP_INTERVAL_HOURS", "24"))  # 0 disables the schedule
+BACKUP_KEEP              = int(os.getenv("BACKUP_KEEP", "7"))   # Snapshots kept per profile
+BACKUP_PAGES_PER_STEP    = 256    # SQLite pages copied per backup step
+BACKUP_STEP_SLEEP        = 0.005  # Pause between steps so writers are never starved
+
+# ─── Notes ──────────────────────────────────────────────
+NOTES_STORAGE            = os.getenv("NOTES_STORAGE", "files")   # "files" (one .md per note) or "journal"
+NOTES_JOURNAL_DIR        = DATA_DIR / "notes_journal"    # Segments for NOTES_STORAGE=journal
+NOTES_SEGMENT_BYTES      = 64 * 1024 * 1024              # Journal segment size before rolling over
+NOTES_COMPACT_RATIO      = 0.5    # Compact the journal once this fraction is deleted/overwritten
+NOTES_INDEX_PATH         = DATA_DIR / "notes_index.db"   # Full-text index of NOTES_DIR
+NOTES_SYNC_INTERVAL      = 60     # Seconds between index syncs (picks up edits made outside JARVIS)
+NOTES_EMBED_BATCH        = 32     # Notes per embedding request
+NOTES_EMBED_DELAY        = 2      # Seconds to wait after a save so bursts embed together
+NOTES_EMBED_CHARS        = 2000   # Leading characters of a note that get embedded
+NOTES_EMBED_RETRY        = 60     # Seconds before a note whose embedding failed is tried again (doubles per attempt)
+NOTES_EMBED_RETRY_MAX    = 86400  # Longest wait between attempts
+NOTES_MIN_SIMILARITY     = 0.35   # Cosine floor for semantic-only note matches
+
+# ─── File Index ─────────────────────────────────────────
+FILE_INDEX_ROOTS = [p for p in os.getenv("FILE_INDEX_ROOTS", "").split(os.pathsep) if p] or [
+    os.getcwd(),
+    str(Path.home() / "Desktop"),
+    str(Path.home() / "Documents"),
+    str(Path.home() / "Downloads"),
+]                                  # Where "open X folder/file" looks (os.pathsep-separated env override)
+FILE_INDEX_REFRESH       = 60     # Seconds between incremental refreshes (only changed dirs re-listed)
+FILE_INDEX_MAX_DEPTH     = 8      # Directory levels crawled below each root
+FILE_INDEX_SKIP_DIRS     = ["node_modules", "__pycache__", "venv", ".venv", "site-packages", "$recycle.bin"]
+FUZZY_MIN_OVERLAP        = 0.5    # Fraction of query trigrams a name must share to match at all
+FUZZY_PREFIX_BOOST       = 0.2    # Added when the name starts with the query
+FUZZY_RECENCY_BOOST      = 0.1    # Added for entries in recently changed folders (decays over ~30 days)
+FUZZY_OPEN_MARGIN        = 0.15   # Best match is opened directly when it leads the runner-up by this much
+APP_MATCH_MIN_SCORE      = 0.6    # Fuzzy app-name matches below this are not treated as that app
+APP_REGISTRY_PATH        = DATA_DIR / "app_registry.json"   # Cached installed-app discovery
+APP_REGISTRY_REFRESH     = 6 * 3600   # Seconds between background rescans of installed apps
+APP_LAUNCH_DENYLIST      = [          # Never started through "open X", whatever the registry says
+    "shutdown", "reboot", "poweroff", "halt", "init", "telinit", "systemctl", "loginctl",
+    "logoff", "logout", "restart", "tsdiscon", "rundll32", "regedit", "reg", "bcdedit",
+    "diskpart", "format", "cipher", "takeown", "icacls", "vssadmin", "wmic", "sfc", "dism",
+    "mkfs", "fdisk", "parted", "dd", "shred", "wipefs", "rm", "rmdir", "del", "kill",
+    "killall", "pkill", "taskkill", "sudo", "su", "doas", "pkexec", "runas",
+    "cmd", "powershell", "pwsh", "sh", "bash", "zsh", "dash", "fish",
+]
+
+# ─── Screenshots ────────────────────────────────────────
+SCREENSHOTS_DIR          = DATA_DIR / "screenshots"
+SCREENSHOT_FORMAT        = os.getenv("SCREENSHOT_FORMAT", "PNG")   # PNG, JPEG or WEBP
+SCREENSHOT_QUALITY       = int(os.getenv("SCREENSHOT_QUALITY", "85"))   # JPEG/WebP quality
+SCREENSHOT_RING_SIZE     = 3      # Recent frames kept in memory (shared by system + vision)
+SCREENSHOT_RING_BYTES    = 96 * 1024 * 1024   # Pixel memory cap for that ring (the newest frame is always kept)
+SCREENSHOT_WORKERS       = 2      # Encoder/writer threads
+VISION_IMAGE_SIZE        = (1280, 720)   # Frames sent to the vision model are shrunk to fit
+VISION_IMAGE_FORMAT      = "JPEG"        # Much faster to encode than PNG for the same model input
+SCREENSHOT_INDEX_PATH    = DATA_DIR / "screenshots.db"   # Metadata index (time, dHash, source, tier)
+SCREENSHOT_DEDUP_DISTANCE = 4     # dHash bits that may differ for two captures to count as the same screen
+SCREENSHOT_DEDUP_WINDOW  = 600    # Seconds a screenshot stays eligible as a duplicate target
+SCREENSHOT_DEDUP_PIXELS  = 64     # Pixels that may visibly differ once the hashes agree (automatic captures only)
+SCREENSHOT_TIERS = [              # (minimum age in days, format, quality, scale) — applied in order
+    (1,  "WEBP", 90, 1.0),
+    (7,  "JPEG", 60, 0.5),
+]
+SCREENSHOT_MAX_AGE_DAYS  = 90     # Older screenshots are deleted
+SCREENSHOT_MAX_BYTES     = 500 * 1024 * 1024   # Total size cap (oldest deleted first)
+SCREENSHOT_MAINTENANCE_INTERVAL = 3600   # Seconds between recompression/retention passes
+
+# ─── System Metrics ─────────────────────────────────────
+METRICS_INTERVAL         = float(os.getenv("METRICS_INTERVAL", "5"))   # Seconds between samples
+METRICS_WINDOW_MINUTES   = 15     # History kept for the 1/5/15-minute trends
+METRICS_DISK_PATH        = os.getenv("METRICS_DISK_PATH", os.path.abspath(os.sep))   # C:\ on Windows, / elsewhere
+
+# ─── File Viewer ────────────────────────────────────────
+FILE_PAGE_LINES          = 60     # Lines per page for "read file ... page N"
+FILE_PAGE_MAX_CHARS      = 6000   # Cap on what one page returns (long lines)
+FILE_MMAP_THRESHOLD      = 1024 * 1024   # Files at least this big are memory-mapped
+FILE_LINE_INDEX_CACHE    = 16     # Files whose line-offset index is kept in memory
+FILE_LIST_PAGE_SIZE      = 40     # Entries per page for "list files"
+
+# ─── Web Search ─────────────────────────────────────────
+SEARCH_BACKEND           = os.getenv("SEARCH_BACKEND", "duckduckgo")   # "duckduckgo" or "local" (canned results)
+SEARCH_FIXTURES          = Path(os.getenv("SEARCH_FIXTURES", DATA_DIR / "search_fixtures.json"))   # For "local"
+SEARCH_CACHE_PATH        = DATA_DIR / "search_cache.db"
+SEARCH_CACHE_TTL         = 6 * 3600     # Seconds web results stay fresh
+SEARCH_NEWS_TTL          = 15 * 60      # News goes stale much faster
+SEARCH_CACHE_MAX_BYTES   = 20 * 1024 * 1024   # Least recently used entries are evicted beyond this
+SEARCH_FETCH_PAGES       = 3      # Result pages fetched and read per question
+SEARCH_FETCH_WORKERS     = 6      # Concurrent page fetches (and pooled connections)
+SEARCH_FETCH_TIMEOUT     = 3.0    # Connect/read timeout per page, seconds
+SEARCH_FETCH_DEADLINE    = 2.5    # All page fetches together; late pages are left out
+SEARCH_FETCH_MAX_BYTES   = 1536 * 1024   # Read at most this much of a page
+SEARCH_PASSAGE_WORDS     = 80     # Page text is ranked in passages of about this many words
+SEARCH_CONTEXT_CHARS     = 4000   # Page excerpts given to the summarizer
+SEARCH_RATE              = 1.0    # Requests per second per provider (the ceiling the governor climbs back to)
+SEARCH_RATE_MIN          = 0.1    # Floor the rate is cut to while a provider keeps throttling
+SEARCH_BURST             = 3      # Requests a provider can take back to back
+SEARCH_MAX_RETRIES       = 3      # Retries of a throttled search, with exponential backoff
+SEARCH_BACKOFF_BASE      = 1.0    # First backoff, seconds (doubles per retry, jittered)
+SEARCH_BACKOFF_MAX       = 30.0   # Longest single backoff
+SEARCH_QUEUE_TIMEOUT     = 10.0   # Give up if a search can't get a slot within this many seconds
+
+# ─── Document Search ────────────────────────────────────
+DOCS_ROOTS = [p for p in os.getenv("DOCS_ROOTS", "").split(os.pathsep) if p] or [
+    str(Path.home() / "Documents"),
+    str(Path.home() / "Downloads"),
+    str(NOTES_DIR),
+]                                  # Folders searched offline (os.pathsep-separated env override)
+DOCS_EXTENSIONS          = [".txt", ".md", ".markdown", ".rst", ".org", ".tex", ".html", ".htm",
+                            ".csv", ".log", ".json", ".xml", ".yaml", ".yml", ".ini"]
+DOCS_INDEX_PATH          = DATA_DIR / "doc_index.db"
+DOCS_REFRESH             = 300    # Seconds between incremental crawls (only changed files re-read)
+DOCS_MAX_BYTES           = 2 * 1024 * 1024   # Only the start of bigger files is indexed
+DOCS_COMMON_TERM         = 0.3    # Query words in more than this fraction of documents are ignored
+DOCS_MIN_COVERAGE        = 0.6    # Share of the remaining query words a document must contain to be a result
+DOCS_SNIPPET_WORDS       = 40     # Snippet length
+DOCS_SEARCH_MODE         = os.getenv("DOCS_SEARCH_MODE", "alongside")   # "alongside" the web, "first" (web only if nothing local), or "off"
+DOCS_SEARCH_RESULTS      = 2      # Local documents included in a web answer
+
+# ─── Code Index ─────────────────────────────────────────
+CODE_ROOTS = [p for p in os.getenv("CODE_ROOTS", "").split(os.pathsep) if p] or [
+    str(Path.home() / "Projects"),
+]                                  # Project folders CodeHandler draws context from (os.pathsep-separated env override)
+CODE_EXTENSIONS          = [".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".kt", ".c", ".h", ".cpp", ".hpp",
+                            ".cc", ".cs", ".go", ".rs", ".rb", ".php", ".swift", ".scala"]
+CODE_SKIP_DIRS           = FILE_INDEX_SKIP_DIRS + ["build", "dist", "target", "out", "vendor", "bin", "obj"]
+CODE_INDEX_PATH          = DATA_DIR / "code_index.db"
+CODE_INDEX_REFRESH       = 120    # Seconds between incremental passes (only changed files re-parsed)
+CODE_INDEX_WORKERS       = int(os.getenv("CODE_INDEX_WORKERS", "1"))   # Parser processes; 1 parses in-process (spawned workers re-import main.py)
+CODE_MAX_FILE_BYTES      = 1024 * 1024   # Bigger files (generated, minified) are skipped
+CODE_CONTEXT_TOKENS      = 1500   # Budget for code snippets added to a code prompt
+CODE_SNIPPET_LINES       = 80     # Longest single snippet; longer definitions are cut
+
+# ─── Summaries ──────────────────────────────────────────
+SUMMARY_CHUNK_TOKENS     = 1500   # Long inputs are split into chunks of about this size
+SUMMARY_CONCURRENCY      = 3      # Chunk summaries in flight at once (see OLLAMA_NUM_PARALLEL)
+SUMMARY_MAP_TOKENS       = 200    # Output budget for each chunk's notes
+SUMMARY_REDUCE_TOKENS    = 500    # Output budget for the final summary
+SUMMARY_DIRECT_TOKENS    = 2500   # Inputs up to this size are summarized in one call
+SUMMARY_MAX_INPUT_CHARS  = 400_000   # Longer inputs are cut before chunking
 
 # ─── Brain ───────────────────────────────────────────────
 COMPLEXITY_WORD_THRESHOLD = 20
@@ -87,6 +250,15 @@ BLOCKED_COMMANDS = [
     "stop-computer", "restart-computer"
 ]
 
+SAFETY_CACHE_SIZE = 8192   # Safety decisions / resolved directories kept in the LRU caches
+
+SAFETY_AUDIT_ENABLED        = os.getenv("SAFETY_AUDIT", "1") != "0"   # Record every safety decision
+SAFETY_AUDIT_PATH           = DATA_DIR / "safety_audit.db"
+SAFETY_AUDIT_BATCH          = 500      # Max decisions written per transaction
+SAFETY_AUDIT_FLUSH          = 1.0      # Seconds a batch may wait before it's written
+SAFETY_AUDIT_QUEUE_MAX      = 10000    # Backlog beyond this is dropped (and counted), never blocks
+SAFETY_AUDIT_RETENTION_DAYS = 30
+
 MAX_FILE_SIZE_BYTES = 10 * 1024 * 1024
 
 ALLOWED_WORK_DIRS = [
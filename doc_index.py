@@ -0,0 +1,333 @@
+"""
+JARVIS v1.0 — Document Index
+Offline full-text search over documents on disk (DOCS_ROOTS): notes,
+docs, exported web pages. Used by SearchHandler next to (or instead of)
+the web, and works with no network at all.
+
+  - Crawls with os.scandir and re-reads only files whose mtime or size
+    changed; deleted files are dropped from the index
+  - Text is indexed in a contentless SQLite FTS5 table (the inverted
+    index alone, no second copy of the text in it) and ranked with BM25;
+    each document's text is kept zlib-compressed for snippets and for
+    removing its old postings when it changes
+  - Words found in most documents (DOCS_COMMON_TERM) are left out of
+    queries, so "what is the ..." doesn't match everything; a result must
+    contain DOCS_MIN_COVERAGE of the words that remain, not just one
+  - Snippets are the passage of the document that best matches the query
+
+Usage:
+  python doc_index.py build
+  python doc_index.py search "query" [-n 5]
+  python doc_index.py stats
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import (
+    DOCS_COMMON_TERM,
+    DOCS_EXTENSIONS,
+    DOCS_INDEX_PATH,
+    DOCS_MAX_BYTES,
+    DOCS_MIN_COVERAGE,
+    DOCS_REFRESH,
+    DOCS_ROOTS,
+    DOCS_SNIPPET_WORDS,
+    FILE_INDEX_MAX_DEPTH,
+    FILE_INDEX_SKIP_DIRS,
+)
+from file_pager import sniff_encoding
+from safety import is_path_protected
+from web_pages import extract_text, rank_passages, split_passages
+
+_BATCH = 500              # Documents written per transaction while crawling
+_HTML_EXTENSIONS = {'.html', '.htm'}
+_SMALL_CORPUS = 1000      # Below this many documents, common words are still searched
+
+
+def read_document(path: str, max_bytes: int = DOCS_MAX_BYTES) -> Optional[Tuple[str, str]]:
+    """(title, text) of a document, or None if it is binary or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            raw = f.read(max_bytes)
+    except OSError:
+        return None
+    encoding, bom = sniff_encoding(raw[:4096])
+    if encoding is None:
+        return None
+    text = raw[bom:].decode(encoding, errors='replace')
+    name = os.path.basename(path)
+
+    if os.path.splitext(name)[1].lower() in _HTML_EXTENSIONS:
+        title, paragraphs = extract_text(text)
+        return title or name, '\n\n'.join(paragraphs)
+    first = text.lstrip().split('\n', 1)[0].strip()
+    title = first.lstrip('# ').strip() if first.startswith('#') else name
+    return title[:200], text
+
+
+class DocumentIndex:
+    """Incrementally crawled BM25 index of the documents under a set of roots."""
+
+    def __init__(self, roots: List[str] = None, db_path: Path = DOCS_INDEX_PATH,
+                 refresh_interval: float = DOCS_REFRESH, extensions: List[str] = None):
+        self.roots = [os.path.abspath(r) for r in (roots or DOCS_ROOTS)]
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.refresh_interval = refresh_interval
+        self.extensions = {e.lower() for e in (extensions or DOCS_EXTENSIONS)}
+        self.skip_dirs = {d.lower() for d in FILE_INDEX_SKIP_DIRS}
+        self.running = False
+        self._thread = None
+        self._refresh_lock = threading.Lock()
+        self._ready = threading.Event()
+        self.available = self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self) -> bool:
+        """Create the tables. Returns False if this SQLite build lacks FTS5."""
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS docs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path TEXT NOT NULL UNIQUE,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    title TEXT NOT NULL,
+                    body BLOB NOT NULL          -- zlib-compressed indexed text
+                );
+            ''')
+            try:
+                conn.executescript('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+                        title, body, content='', tokenize='unicode61 remove_diacritics 2'
+                    );
+                    CREATE VIRTUAL TABLE IF NOT EXISTS docs_vocab USING fts5vocab(docs_fts, 'row');
+                ''')
+                return True
+            except sqlite3.OperationalError as e:
+                print(f"[DOCS] FTS5 not available, local document search disabled: {e}")
+                return False
+
+    # ─── Crawling ────────────────────────────────────────
+
+    def _skip_dir(self, name: str, path: str) -> bool:
+        return name.startswith('.') or name.lower() in self.skip_dirs or is_path_protected(path)
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """{path: (mtime_ns, size)} of every document under the roots."""
+        found = {}
+        stack = [(root, 0) for root in self.roots if os.path.isdir(root) and not is_path_protected(root)]
+        while stack:
+            current, depth = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if depth < FILE_INDEX_MAX_DEPTH and not self._skip_dir(entry.name, entry.path):
+                                    stack.append((entry.path, depth + 1))
+                            elif (entry.is_file(follow_symlinks=False)
+                                  and os.path.splitext(entry.name)[1].lower() in self.extensions):
+                                st = entry.stat(follow_symlinks=False)
+                                found[entry.path] = (st.st_mtime_ns, st.st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return found
+
+    @staticmethod
+    def _remove(conn, doc_id: int, title: str, body: bytes):
+        conn.execute("INSERT INTO docs_fts(docs_fts, rowid, title, body) VALUES ('delete', ?, ?, ?)",
+                     (doc_id, title, zlib.decompress(body).decode('utf-8')))
+
+    def refresh(self) -> Tuple[int, int]:
+        """
+        Index new and changed documents and drop deleted ones.
+        Returns (documents indexed, documents removed).
+        """
+        if not self.available:
+            return 0, 0
+        with self._refresh_lock:
+            on_disk = self._scan()
+            with self._connect() as conn:
+                known = {path: (doc_id, mtime_ns, size) for doc_id, path, mtime_ns, size
+                         in conn.execute('SELECT id, path, mtime_ns, size FROM docs')}
+            changed = [path for path, stat in on_disk.items() if path not in known or known[path][1:] != stat]
+            gone = [known[path][0] for path in known.keys() - on_disk.keys()]
+
+            for start in range(0, len(changed), _BATCH):
+                with self._connect() as conn:
+                    for path in changed[start:start + _BATCH]:
+                        self._index_one(conn, path, on_disk[path], known.get(path))
+            if gone:
+                with self._connect() as conn:
+                    for doc_id in gone:
+                        row = conn.execute('SELECT title, body FROM docs WHERE id = ?', (doc_id,)).fetchone()
+                        if row:
+                            self._remove(conn, doc_id, *row)
+                            conn.execute('DELETE FROM docs WHERE id = ?', (doc_id,))
+            return len(changed), len(gone)
+
+    def _index_one(self, conn, path: str, stat: Tuple[int, int], known: Optional[Tuple[int, int, int]]):
+        document = read_document(path)
+        title, text = document if document else (os.path.basename(path), '')
+        body = zlib.compress(text.encode('utf-8', 'replace'), 6)
+        if known:
+            doc_id = known[0]
+            old = conn.execute('SELECT title, body FROM docs WHERE id = ?', (doc_id,)).fetchone()
+            if old:
+                self._remove(conn, doc_id, *old)
+            conn.execute('UPDATE docs SET mtime_ns = ?, size = ?, title = ?, body = ? WHERE id = ?',
+                         (stat[0], stat[1], title, body, doc_id))
+        else:
+            doc_id = conn.execute('INSERT INTO docs (path, mtime_ns, size, title, body) VALUES (?, ?, ?, ?, ?)',
+                                  (path, stat[0], stat[1], title, body)).lastrowid
+        conn.execute('INSERT INTO docs_fts(rowid, title, body) VALUES (?, ?, ?)', (doc_id, title, text))
+
+    # ─── Search ──────────────────────────────────────────
+
+    def _query_terms(self, conn, query: str) -> List[str]:
+        """
+        Words of a free-text query worth searching for, leaving out words
+        most documents contain ([] if nothing is left to search for).
+        """
+        words = list(dict.fromkeys(re.findall(r'\w+', query.lower())))
+        if not words:
+            return []
+        total = conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0] or 1
+        counts = dict(conn.execute(
+            f"SELECT term, doc FROM docs_vocab WHERE term IN ({','.join('?' * len(words))})", words
+        ).fetchall())
+        rare = [w for w in words if counts.get(w, 0) <= DOCS_COMMON_TERM * total]
+        if not rare and total > _SMALL_CORPUS:
+            return []       # Only words nearly every document has: nothing to rank by
+        return rare or words
+
+    @staticmethod
+    def _coverage(terms: List[str], title: str, text: str) -> float:
+        """Share of the query terms the document contains (accents ignored, like the FTS tokenizer)."""
+        def fold(s: str) -> str:
+            return ''.join(c for c in unicodedata.normalize('NFKD', s.lower()) if not unicodedata.combining(c))
+        words = set(re.findall(r'\w+', fold(f'{title}\n{text}')))
+        return sum(fold(term) in words for term in terms) / len(terms)
+
+    def _snippet(self, query: str, text: str, words: int = DOCS_SNIPPET_WORDS) -> str:
+        passages = [(0, p) for p in split_passages(re.split(r'\n\s*\n|\n', text), words)]
+        best = rank_passages(query, passages, budget=words * 12)
+        snippet = best[0][1] if best else ' '.join(text.split()[:words])
+        return snippet if len(snippet) <= words * 10 else snippet[:words * 10].rstrip() + '…'
+
+    def search(self, query: str, limit: int = 5) -> List[dict]:
+        """
+        Best matching documents, as search results: dicts with 'title',
+        'body' (a snippet), 'href' (the file path) and 'score'.
+        """
+        if not self.available:
+            return []
+        with self._connect() as conn:
+            terms = self._query_terms(conn, query)
+            if not terms:
+                return []
+            # Any word matches in FTS; documents sharing too few of them are dropped below
+            rows = conn.execute('''
+                SELECT d.path, d.title, d.body, bm25(docs_fts, 3.0, 1.0) AS score
+                FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid
+                WHERE docs_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            ''', (' OR '.join(f'"{w}"' for w in terms), limit * 4)).fetchall()
+        results = []
+        for path, title, body, score in rows:
+            text = zlib.decompress(body).decode('utf-8')
+            if self._coverage(terms, title, text) < DOCS_MIN_COVERAGE:
+                continue
+            results.append({'title': title, 'body': self._snippet(query, text), 'href': path,
+                            'score': round(-score, 3)})
+            if len(results) == limit:
+                break
+        return results
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM docs').fetchone()[0]
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            docs, stored = conn.execute('SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM docs').fetchone()
+        return {'documents': docs, 'compressed_text_bytes': stored,
+                'db_bytes': sum(p.stat().st_size for p in self.db_path.parent.glob(self.db_path.name + '*'))}
+
+    # ─── Background Refresh ──────────────────────────────
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def _loop(self):
+        while self.running:
+            try:
+                started = time.perf_counter()
+                indexed, removed = self.refresh()
+                if indexed or removed:
+                    print(f"[DOCS] Indexed {indexed} documents, removed {removed} "
+                          f"({time.perf_counter() - started:.1f}s)")
+            except Exception as e:
+                print(f"[DOCS] Index error: {e}")
+            self._ready.set()
+            for _ in range(int(max(1, self.refresh_interval))):
+                if not self.running:
+                    return
+                time.sleep(1)
+
+    def start(self):
+        """Crawl in the background, then keep refreshing."""
+        if self.running or not self.available:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS offline document search.')
+    parser.add_argument('command', choices=['build', 'search', 'stats'])
+    parser.add_argument('query', nargs='?', default='')
+    parser.add_argument('-n', type=int, default=5, help='results to show')
+    args = parser.parse_args()
+
+    index = DocumentIndex()
+    if args.command == 'build':
+        started = time.perf_counter()
+        indexed, removed = index.refresh()
+        print(f"Indexed {indexed}, removed {removed} in {time.perf_counter() - started:.1f}s "
+              f"({index.count()} documents)")
+    elif args.command == 'search':
+        started = time.perf_counter()
+        results = index.search(args.query, args.n)
+        print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for r in results:
+            print(f"\n{r['title']}  ({r['score']})\n  {r['href']}\n  {r['body']}")
+    else:
+        stats = index.stats()
+        print(f"{stats['documents']} documents, index {stats['db_bytes'] / 1024 / 1024:.1f} MB "
+              f"(text {stats['compressed_text_bytes'] / 1024 / 1024:.1f} MB compressed)")
+
+
+if __name__ == '__main__':
+    main()
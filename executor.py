@@ -21,7 +21,7 @@ from handlers.phone_handler import PhoneHandler
 class Executor:
     """Routes tasks to specialized handlers based on intent classification."""
 
-    def __init__(self, brain: Brain, memory: Memory):
+    def __init__(self, brain: Brain, memory: Memory, profiles=None):
         self.brain = brain
         self.memory = memory
 
@@ -31,15 +31,24 @@ class Executor:
             Intent.SEARCH:  SearchHandler(brain),
             Intent.SYSTEM:  SystemHandler(brain),
             Intent.CODE:    CodeHandler(brain),
-            Intent.MEMORY:  MemoryHandler(memory),
-            Intent.NOTES:   NotesHandler(memory),
+            Intent.MEMORY:  MemoryHandler(memory, profiles),
+            Intent.NOTES:   NotesHandler(memory, brain),
             Intent.UTILITY: UtilityHandler(),
             Intent.VISION:  VisionHandler(brain),
             Intent.AUTONOMY: AutonomyHandler(brain, memory),
             Intent.PHONE:   PhoneHandler(brain),
         }
+        if profiles is not None:
+            profiles.on_switch(self.set_memory)
         print(f"[EXECUTOR] Initialized {len(self.handlers)} handlers.")
 
+    def set_memory(self, memory: Memory):
+        """Point the executor and every memory-backed handler at another profile."""
+        self.memory = memory
+        for handler in self.handlers.values():
+            if hasattr(handler, 'memory'):
+                handler.memory = memory
+
     def execute(self, routing_result: dict) -> str:
         """
         Execute a routed task. Handles both single and multi-step requests.
@@ -0,0 +1,242 @@
+"""
+JARVIS v1.0 — File Index
+Background index of file and folder names under the configured roots,
+so "open the X folder/file" is answered from memory instead of walking
+the disk on every request.
+
+  - Crawls with os.scandir (no per-entry stat calls, symlinks not followed)
+  - Never descends into paths that safety.is_path_protected() rejects
+  - Refreshes incrementally: a directory is re-listed only when its mtime
+    changed (i.e. entries were added, removed or renamed in it)
+  - Lookups are ranked by a trigram index (fuzzy_match.TrigramIndex),
+    with entries in recently changed folders boosted
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    FILE_INDEX_MAX_DEPTH,
+    FILE_INDEX_REFRESH,
+    FILE_INDEX_ROOTS,
+    FILE_INDEX_SKIP_DIRS,
+    FUZZY_RECENCY_BOOST,
+)
+from fuzzy_match import TrigramIndex
+from safety import is_path_protected
+
+_RECENCY_DAYS = 30
+
+
+class _DirEntry:
+    __slots__ = ('mtime_ns', 'depth', 'subdirs', 'files')
+
+    def __init__(self, mtime_ns: int, depth: int, subdirs: List[str], files: List[str]):
+        self.mtime_ns = mtime_ns
+        self.depth = depth
+        self.subdirs = subdirs
+        self.files = files
+
+
+class FileIndex:
+    """In-memory, incrementally refreshed index of names under a set of roots."""
+
+    def __init__(self, roots: List[str] = None, refresh_interval: float = FILE_INDEX_REFRESH,
+                 max_depth: int = FILE_INDEX_MAX_DEPTH):
+        self.roots = [os.path.abspath(r) for r in (roots or FILE_INDEX_ROOTS) if os.path.isdir(r)]
+        self.refresh_interval = refresh_interval
+        self.max_depth = max_depth
+        self.skip_dirs = {d.lower() for d in FILE_INDEX_SKIP_DIRS}
+        self._ready = threading.Event()   # Set once the first full crawl finished
+        self.running = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, _DirEntry] = {}
+        self._generation = 0           # Bumped whenever the directory map changes
+        self._flat = None              # (generation, paths, is_dir mask, TrigramIndex)
+
+    # ─── Crawling ────────────────────────────────────────
+
+    def _skip(self, name: str, path: str) -> bool:
+        return name.startswith('.') or name.lower() in self.skip_dirs or is_path_protected(path)
+
+    def _list_dir(self, path: str, depth: int) -> Optional[_DirEntry]:
+        """List one directory's children."""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            subdirs, files = [], []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self._skip(entry.name, entry.path):
+                                subdirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+            return _DirEntry(mtime_ns, depth, subdirs, files)
+        except OSError:
+            return None
+
+    def _crawl(self, path: str, depth: int, found: Dict[str, _DirEntry]):
+        """List a directory and everything below it (iteratively, no recursion limit issues)."""
+        stack = [(path, depth)]
+        while stack:
+            current, d = stack.pop()
+            entry = self._list_dir(current, d)
+            if entry is None:
+                continue
+            found[current] = entry
+            if d < self.max_depth:
+                stack.extend((os.path.join(current, name), d + 1) for name in entry.subdirs)
+
+    def refresh(self) -> Tuple[int, int]:
+        """
+        Re-list directories whose mtime changed and crawl new subdirectories.
+        Returns (directories re-listed, directories dropped).
+        """
+        with self._lock:
+            known = dict(self._dirs)
+
+        updated: Dict[str, _DirEntry] = {}
+        dropped = set()
+        relisted = 0
+
+        # New roots (or the first run) are crawled in full
+        for root in self.roots:
+            if root not in known and not is_path_protected(root):
+                self._crawl(root, 0, updated)
+                relisted += 1
+
+        for path, entry in known.items():
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                dropped.add(path)
+                continue
+            if mtime_ns == entry.mtime_ns:
+                continue
+            fresh = self._list_dir(path, entry.depth)
+            if fresh is None:
+                dropped.add(path)
+                continue
+            updated[path] = fresh
+            relisted += 1
+            # Crawl subdirectories that appeared; forget ones that vanished
+            if entry.depth < self.max_depth:
+                for name in set(fresh.subdirs) - set(entry.subdirs):
+                    self._crawl(os.path.join(path, name), entry.depth + 1, updated)
+            for name in set(entry.subdirs) - set(fresh.subdirs):
+                dropped.add(os.path.join(path, name))
+
+        if not updated and not dropped:
+            return 0, 0
+
+        with self._lock:
+            self._dirs.update(updated)
+            if dropped:
+                # Drop vanished directories together with everything below them
+                prefixes = tuple(p + os.sep for p in dropped)
+                for path in [p for p in self._dirs if p in dropped or p.startswith(prefixes)]:
+                    del self._dirs[path]
+            self._generation += 1
+        return relisted, len(dropped)
+
+    # ─── Lookups ─────────────────────────────────────────
+
+    def _flatten(self):
+        """Paths, kind mask and trigram index of every entry (rebuilt only after changes)."""
+        with self._lock:
+            if self._flat is not None and self._flat[0] == self._generation:
+                return self._flat
+            generation = self._generation
+            dirs = list(self._dirs.items())
+
+        started = time.perf_counter()
+        names, paths, is_dir, ages = [], [], [], []
+        now_ns = time.time_ns()
+        for parent, entry in dirs:
+            # Folder mtime stands in for entry recency (the crawl never stats files)
+            age_days = (now_ns - entry.mtime_ns) / 86400e9
+            for name in entry.subdirs:
+                names.append(name)
+                paths.append(os.path.join(parent, name))
+            # Files match on the name without extension
+            names.extend(os.path.splitext(name)[0] for name in entry.files)
+            paths.extend(os.path.join(parent, name) for name in entry.files)
+            is_dir.extend([True] * len(entry.subdirs) + [False] * len(entry.files))
+            ages.extend([age_days] * (len(entry.subdirs) + len(entry.files)))
+
+        boosts = FUZZY_RECENCY_BOOST * np.exp(-np.maximum(np.array(ages, dtype=np.float32), 0) / _RECENCY_DAYS)
+        flat = (generation, paths, np.array(is_dir, dtype=bool), TrigramIndex(names, boosts.astype(np.float32)))
+        if len(paths) > 100000:
+            print(f"[FILES] Rebuilt name index for {len(paths)} entries ({time.perf_counter() - started:.1f}s)")
+        with self._lock:
+            self._flat = flat
+        return flat
+
+    def find(self, query: str, kind: Optional[str] = None, limit: int = 10) -> Tuple[int, List[Tuple[str, float]]]:
+        """
+        Best-matching paths for a spoken name, ranked by trigram similarity.
+        kind: 'dir', 'file' or None for both.
+        Returns (number of matches, [(path, score), ...] best first).
+        """
+        query = query.strip()
+        if not query:
+            return 0, []
+        _, paths, is_dir, index = self._flatten()
+        mask = is_dir if kind == 'dir' else ~is_dir if kind == 'file' else None
+        total, hits = index.search(query, limit=limit, mask=mask)
+        return total, [(paths[i], score) for i, score in hits]
+
+    def __len__(self) -> int:
+        return len(self._flatten()[1])
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        """Block until the first crawl finished (crawls inline if the thread isn't running)."""
+        if not self.running and not self.ready:
+            self.refresh()
+            self._ready.set()
+        return self._ready.wait(timeout)
+
+    # ─── Background Refresh ──────────────────────────────
+
+    def _loop(self):
+        while self.running:
+            try:
+                started = time.perf_counter()
+                relisted, dropped = self.refresh()
+                if not self._ready.is_set():
+                    print(f"[FILES] Indexed {len(self)} entries under {len(self.roots)} roots "
+                          f"({time.perf_counter() - started:.1f}s)")
+                    self._ready.set()
+                elif relisted or dropped:
+                    print(f"[FILES] Index refreshed: {relisted} directories re-listed, {dropped} dropped.")
+                self._flatten()   # Rebuild the name index here rather than on the next lookup
+            except Exception as e:
+                print(f"[FILES] Index error: {e}")
+                self._ready.set()   # Don't keep lookups waiting on a crawl that failed
+            for _ in range(int(max(1, self.refresh_interval))):
+                if not self.running:
+                    return
+                time.sleep(1)
+
+    def start(self):
+        """Crawl in the background, then keep refreshing."""
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,325 @@
+"""
+JARVIS v1.0 — File Pager
+Paged access to large text files and directories without loading them
+into memory.
+
+  - Files above FILE_MMAP_THRESHOLD are memory-mapped; smaller ones are
+    read in one go
+  - A line-offset index (numpy array of byte offsets) is built lazily, a
+    chunk at a time, only as far as the requested lines need, so "read
+    page 1" of a multi-GB log doesn't scan the whole file
+  - Indexes are cached per file; a file that only grew (a log being
+    appended to) keeps its index and is scanned from the old end
+  - The encoding is sniffed from the first bytes (BOMs, UTF-16 without a
+    BOM, UTF-8, else cp1252); binary files are detected and refused
+  - Directories are listed with os.scandir as a stream: sorted pages are
+    picked with a bounded heap, so only page * per_page entries are held
+
+Usage:
+  python file_pager.py app.log --page 5
+  python file_pager.py app.log --lines 2000 2100
+  python file_pager.py ~/Downloads --list --sort size --desc
+"""
+
+import argparse
+import codecs
+import heapq
+import itertools
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import FILE_LINE_INDEX_CACHE, FILE_LIST_PAGE_SIZE, FILE_MMAP_THRESHOLD, FILE_PAGE_LINES
+
+_FIRST_CHUNK = 1024 * 1024            # Bytes scanned for newlines in the first step (multiple of 4);
+_SCAN_CHUNK = 16 * 1024 * 1024        # doubles each step up to this
+_MAX_LINE_BYTES = 16 * 1024           # Longer lines (minified JSON...) are cut when shown
+_SNIFF_BYTES = 64 * 1024
+_FINGERPRINT_BYTES = 64
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32-le'),   # Before UTF-16 LE: it starts with the same two bytes
+    (codecs.BOM_UTF32_BE, 'utf-32-be'),
+    (codecs.BOM_UTF8, 'utf-8'),
+    (codecs.BOM_UTF16_LE, 'utf-16-le'),
+    (codecs.BOM_UTF16_BE, 'utf-16-be'),
+]
+_CODE_UNITS = {'utf-16-le': '<u2', 'utf-16-be': '>u2', 'utf-32-le': '<u4', 'utf-32-be': '>u4'}
+_TEXT_CONTROLS = {7, 8, 9, 10, 12, 13, 27}
+
+SORT_KEYS = ('name', 'size', 'modified', 'none')
+
+
+def sniff_encoding(head: bytes) -> Tuple[Optional[str], int]:
+    """(encoding, BOM length) from a file's first bytes; encoding is None for binary data."""
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+    if not head:
+        return 'utf-8', 0
+    if b'\x00' in head:
+        # Mostly-ASCII UTF-16 without a BOM has a NUL in every other byte
+        even, odd = head[0::2], head[1::2]
+        if odd.count(0) > 0.4 * len(odd) and even.count(0) < 0.05 * len(even):
+            return 'utf-16-le', 0
+        if even.count(0) > 0.4 * len(even) and odd.count(0) < 0.05 * len(odd):
+            return 'utf-16-be', 0
+        return None, 0
+    controls = sum(1 for b in head if b < 32 and b not in _TEXT_CONTROLS)
+    if controls > 0.1 * len(head):
+        return None, 0
+    try:
+        # Incremental decode so a multi-byte character cut off at the end isn't an error
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8', 0
+    except UnicodeDecodeError:
+        return 'cp1252', 0
+
+
+class LineIndex:
+    """Byte offsets of line starts, discovered a chunk at a time."""
+
+    def __init__(self, start: int, unit: int, dtype: str):
+        self.unit = unit
+        self.dtype = dtype
+        self.size = 0
+        self.mtime_ns = 0
+        self.fingerprint = b''
+        self.scanned = start               # Everything before this offset has been scanned
+        self._chunk = _FIRST_CHUNK
+        self._parts = [np.array([start], dtype=np.int64)]
+        self._count = 1
+        self._starts = None
+
+    @property
+    def starts(self) -> np.ndarray:
+        if self._starts is None or len(self._starts) != self._count:
+            self._starts = np.concatenate(self._parts) if len(self._parts) > 1 else self._parts[0]
+            self._parts = [self._starts]
+        return self._starts
+
+    def complete(self, end: int) -> bool:
+        return self.scanned >= end
+
+    def scan(self, buf, end: int, until: int = None):
+        """Scan for newlines until `until` + 1 line starts are known (or the end)."""
+        while self.scanned < end and (until is None or self._count <= until + 1):
+            stop = min(end, self.scanned + self._chunk)
+            self._chunk = min(self._chunk * 2, _SCAN_CHUNK)
+            chunk = np.frombuffer(buf, dtype=self.dtype, count=(stop - self.scanned) // self.unit,
+                                  offset=self.scanned)
+            hits = np.flatnonzero(chunk == 10).astype(np.int64) * self.unit + (self.scanned + self.unit)
+            del chunk                       # Release the buffer export so the mmap can close
+            if len(hits):
+                self._parts.append(hits)
+                self._count += len(hits)
+            self.scanned = stop
+
+    def line_count(self, end: int) -> int:
+        """Lines found so far (a final newline doesn't start another line)."""
+        starts = self.starts
+        if self.complete(end) and len(starts) > 1 and starts[-1] >= end:
+            return len(starts) - 1
+        if self.complete(end) and end == starts[0]:
+            return 0
+        return len(starts)
+
+
+_index_cache: 'OrderedDict[str, LineIndex]' = OrderedDict()
+_index_lock = threading.Lock()
+
+
+class FilePager:
+    """Read a text file by page or by line range."""
+
+    def __init__(self, path, lines_per_page: int = FILE_PAGE_LINES):
+        self.path = Path(path)
+        self.lines_per_page = lines_per_page
+        self._file = open(self.path, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self.size = stat.st_size
+        if self.size and self.size >= FILE_MMAP_THRESHOLD:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._buf = self._file.read()
+        self.encoding, bom = sniff_encoding(bytes(self._buf[:_SNIFF_BYTES]))
+        self.binary = self.encoding is None
+        unit = int(_CODE_UNITS.get(self.encoding, 'u1')[-1])
+        self._end = bom + (self.size - bom) // unit * unit
+        self._index = None if self.binary else self._load_index(stat, bom, unit)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._file.close()
+
+    def _load_index(self, stat, bom: int, unit: int) -> LineIndex:
+        """Cached index for this file, extended if the file was only appended to."""
+        key = str(self.path.resolve())
+        dtype = _CODE_UNITS.get(self.encoding, 'u1')
+        with _index_lock:
+            index = _index_cache.pop(key, None)
+        if index is not None and (index.size, index.mtime_ns) != (self.size, stat.st_mtime_ns):
+            tail = bytes(self._buf[max(0, index.size - _FINGERPRINT_BYTES):index.size])
+            if self.size <= index.size or tail != index.fingerprint or index.dtype != dtype:
+                index = None
+        if index is None:
+            index = LineIndex(bom, unit, dtype)
+        index.size, index.mtime_ns = self.size, stat.st_mtime_ns
+        index.fingerprint = bytes(self._buf[max(0, self.size - _FINGERPRINT_BYTES):self.size])
+        with _index_lock:
+            _index_cache[key] = index
+            while len(_index_cache) > FILE_LINE_INDEX_CACHE:
+                _index_cache.popitem(last=False)
+        return index
+
+    # ─── Reading ─────────────────────────────────────────
+
+    @property
+    def line_count(self) -> int:
+        """Total number of lines (scans the rest of the file if needed)."""
+        if self.binary:
+            return 0
+        self._index.scan(self._buf, self._end)
+        return self._index.line_count(self._end)
+
+    @property
+    def complete(self) -> bool:
+        """Has the whole file been indexed (so line_count is free)?"""
+        return self.binary or self._index.complete(self._end)
+
+    @property
+    def page_count(self) -> int:
+        return max(1, -(-self.line_count // self.lines_per_page))
+
+    def _line(self, starts: np.ndarray, i: int) -> str:
+        start = int(starts[i])
+        end = int(starts[i + 1]) if i + 1 < len(starts) else self._end
+        cut = end - start > _MAX_LINE_BYTES
+        raw = bytes(self._buf[start:start + _MAX_LINE_BYTES if cut else end])
+        text = raw.decode(self.encoding, errors='replace').rstrip('\r\n')
+        return text + ' …' if cut else text
+
+    def lines(self, first: int, last: int) -> List[str]:
+        """Lines first..last (1-based, inclusive); fewer if the file is shorter."""
+        if self.binary or last < first:
+            return []
+        first = max(1, first)
+        self._index.scan(self._buf, self._end, until=last)
+        total = self._index.line_count(self._end)
+        starts = self._index.starts
+        return [self._line(starts, i) for i in range(first - 1, min(last, total))]
+
+    def page(self, number: int) -> List[str]:
+        """Lines of a 1-based page."""
+        first = (number - 1) * self.lines_per_page + 1
+        return self.lines(first, first + self.lines_per_page - 1)
+
+    def has_more(self, last: int) -> bool:
+        """Is there anything after line `last`?"""
+        self._index.scan(self._buf, self._end, until=last + 1)
+        return self._index.line_count(self._end) > last
+
+
+# ─── Directory Listing ──────────────────────────────────
+
+def _entry_key(entry: os.DirEntry, sort: str):
+    try:
+        if sort == 'size':
+            return 0 if entry.is_dir() else entry.stat().st_size
+        if sort == 'modified':
+            return entry.stat().st_mtime
+    except OSError:
+        return 0
+    return entry.name.lower()
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def list_directory(path, page: int = 1, per_page: int = FILE_LIST_PAGE_SIZE, sort: str = 'name',
+                   descending: bool = False, dirs_first: bool = True) -> Tuple[int, List[os.DirEntry]]:
+    """
+    One page of a directory as (total entries, [DirEntry]).
+    Streams os.scandir; a sorted page keeps at most page * per_page entries in memory.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort order: {sort}")
+    total = 0
+    skip = (page - 1) * per_page
+
+    with os.scandir(path) as it:
+        def counted():
+            nonlocal total
+            for entry in it:
+                total += 1
+                yield entry
+
+        if sort == 'none':
+            entries = list(itertools.islice(counted(), skip, skip + per_page))
+            for _ in counted():
+                pass
+            return total, entries
+
+        if descending:
+            # Directories still come first: True sorts above False in nlargest
+            best = heapq.nlargest(skip + per_page, counted(),
+                                  key=lambda e: (dirs_first and _is_dir(e), _entry_key(e, sort)))
+        else:
+            best = heapq.nsmallest(skip + per_page, counted(),
+                                   key=lambda e: (dirs_first and not _is_dir(e), _entry_key(e, sort)))
+    return total, best[skip:]
+
+
+def format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Page through a file or directory.')
+    parser.add_argument('path')
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--lines', type=int, nargs=2, metavar=('FIRST', 'LAST'))
+    parser.add_argument('--list', action='store_true', help='list a directory')
+    parser.add_argument('--sort', choices=SORT_KEYS, default='name')
+    parser.add_argument('--desc', action='store_true')
+    args = parser.parse_args()
+
+    if args.list:
+        total, entries = list_directory(args.path, args.page, sort=args.sort, descending=args.desc)
+        print(f"{total} entries")
+        for entry in entries:
+            print(f"  {'[dir]' if _is_dir(entry) else format_size(entry.stat().st_size):>10}  {entry.name}")
+        return
+
+    with FilePager(args.path) as pager:
+        if pager.binary:
+            print("Binary file.")
+            return
+        first = args.lines[0] if args.lines else (args.page - 1) * pager.lines_per_page + 1
+        last = args.lines[1] if args.lines else first + pager.lines_per_page - 1
+        for number, line in enumerate(pager.lines(first, last), start=first):
+            print(f"{number:>7}  {line}")
+        print(f"[{pager.encoding}, {pager.line_count} lines]")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+JARVIS v1.0 — Fuzzy Name Matching
+Trigram index used to resolve spoken names ("the quarterly report",
+"vs code") to files, folders and apps.
+
+  - Names are normalized (lowercase, punctuation/underscores -> spaces)
+    and split into byte trigrams of " name "
+  - Each distinct name is indexed once (file trees repeat names like
+    README or index a lot); the postings are one sorted numpy array
+    built in a single vectorized pass
+  - A query counts shared trigrams over the postings of its own
+    trigrams only, keeps names sharing at least FUZZY_MIN_OVERLAP of
+    them, and scores them with trigram Jaccard + a prefix boost + an
+    optional per-entry boost (e.g. recency)
+"""
+
+import math
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import FUZZY_MIN_OVERLAP, FUZZY_PREFIX_BOOST
+
+_NON_WORD = re.compile(r'[\W_]+', re.UNICODE)
+_PREFIX_BYTES = 8
+
+
+def normalize_name(name: str) -> str:
+    """'Quarterly_Report-2024' -> 'quarterly report 2024'"""
+    return _NON_WORD.sub(' ', name.lower()).strip()
+
+
+def _padded(name: str) -> bytes:
+    return f' {normalize_name(name)} '.encode('utf-8')
+
+
+def _prefix_key(norm: bytes) -> int:
+    return int.from_bytes(norm[:_PREFIX_BYTES].ljust(_PREFIX_BYTES, b'\0'), 'big')
+
+
+class TrigramIndex:
+    """Immutable trigram index over a list of names (rebuild to change it)."""
+
+    def __init__(self, names: Sequence[str], boosts: Optional[np.ndarray] = None):
+        self.size = len(names)
+        self.boosts = boosts
+
+        # Index each distinct normalized name once; entries point at their name
+        unique: dict = {}
+        entry_name = np.fromiter((unique.setdefault(normalize_name(n), len(unique)) for n in names),
+                                 dtype=np.int64, count=self.size)
+        padded = [f' {n} '.encode('utf-8') for n in unique]
+        self._names = len(padded)
+        self._order = np.argsort(entry_name, kind='stable').astype(np.int32)
+        self._name_starts = np.searchsorted(entry_name[self._order], np.arange(self._names + 1))
+        self._prefixes = np.fromiter((_prefix_key(p[1:]) for p in padded), dtype=np.uint64, count=self._names)
+
+        lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=self._names)
+        buf = np.frombuffer(b''.join(padded), dtype=np.uint8).astype(np.int64)
+        owner = np.repeat(np.arange(self._names, dtype=np.int64), lengths)
+        if len(buf) >= 3:
+            # Trigram at every position whose three bytes belong to the same name
+            valid = owner[:-2] == owner[2:]
+            codes = (buf[:-2] << 16) | (buf[1:-1] << 8) | buf[2:]
+            keys = np.sort((codes[valid] << 32) | owner[:-2][valid])
+            keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        else:
+            keys = np.zeros(0, dtype=np.int64)
+
+        # Postings: name ids grouped by trigram code, ascending within each group
+        self._ids = (keys & 0xFFFFFFFF).astype(np.int32)
+        codes = keys >> 32
+        if len(keys):
+            self._starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+        else:
+            self._starts = np.zeros(0, dtype=np.int64)     # No names, or all shorter than a trigram
+        self._codes = codes[self._starts]
+        self._ends = np.append(self._starts[1:], len(keys))
+        self._counts = np.bincount(self._ids, minlength=self._names).astype(np.float32)
+
+    def _postings(self, code: int) -> np.ndarray:
+        i = np.searchsorted(self._codes, code)
+        if i < len(self._codes) and self._codes[i] == code:
+            return self._ids[self._starts[i]:self._ends[i]]
+        return self._ids[:0]
+
+    def search(self, query: str, limit: int = 10, mask: Optional[np.ndarray] = None,
+               min_overlap: float = FUZZY_MIN_OVERLAP) -> Tuple[int, List[Tuple[int, float]]]:
+        """
+        Best-matching names for a query.
+        mask: optional bool array, only True entries are returned.
+        Returns (number of matches, [(entry id, score), ...] best first).
+        """
+        padded = _padded(query)
+        grams = {padded[i:i + 3] for i in range(len(padded) - 2)}
+        if not self.size or not grams or not len(self._codes):
+            return 0, []
+        postings = {g: self._postings(int.from_bytes(g, 'big')) for g in grams}
+        q = len(postings)
+        need = max(1, math.ceil(min_overlap * q))
+
+        overlap = np.zeros(self._names, dtype=np.uint8 if q < 256 else np.uint16)
+        for p in postings.values():
+            overlap[p] += 1
+        names = np.flatnonzero(overlap >= need)
+        if not len(names):
+            return 0, []
+        shared = overlap[names].astype(np.float32)
+        name_scores = shared / (q + self._counts[names] - shared)
+
+        # Prefix boost: the name starts with the query (same first 8 bytes and,
+        # for longer queries, every leading trigram present; the last one ends
+        # in the padding space, which a longer name doesn't have there)
+        norm = padded[1:-1]
+        shift = 8 * (_PREFIX_BYTES - min(len(norm), _PREFIX_BYTES))
+        same_prefix = (self._prefixes[names] >> np.uint64(shift)) == np.uint64(_prefix_key(norm) >> shift)
+        if len(norm) > _PREFIX_BYTES:
+            leading = {padded[i:i + 3] for i in range(len(padded) - 3)}
+            lead_overlap = np.zeros(self._names, dtype=overlap.dtype)
+            for g in leading:
+                lead_overlap[postings[g]] += 1
+            same_prefix &= lead_overlap[names] == len(leading)
+        name_scores += FUZZY_PREFIX_BOOST * same_prefix
+
+        # Expand matching names to every entry carrying them
+        starts, ends = self._name_starts[names], self._name_starts[names + 1]
+        sizes = ends - starts
+        offsets = np.repeat(starts - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+        entries = self._order[offsets]
+        scores = np.repeat(name_scores, sizes)
+        if mask is not None:
+            keep = mask[entries]
+            entries, scores = entries[keep], scores[keep]
+        if not len(entries):
+            return 0, []
+        if self.boosts is not None:
+            scores = scores + self.boosts[entries]
+
+        top = min(limit, len(entries)) if limit else len(entries)
+        best = np.argpartition(-scores, top - 1)[:top] if top < len(entries) else np.arange(len(entries))
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return len(entries), [(int(entries[i]), float(scores[i])) for i in best]
@@ -1,16 +1,22 @@
 """
 JARVIS v1.0 — Code Handler
 Code generation, explanation, and debugging using Ollama models.
+Requests are sent with the most relevant definitions from the user's
+projects (see code_index.py), so "fix the bug in my parser" comes with
+the parser's code.
 """
 
 import requests
+from code_index import CodeIndex
 from config import OLLAMA_HOST, SMART_MODEL, OLLAMA_TIMEOUT, SYSTEM_PROMPT
 
 class CodeHandler:
     """Code generation and assistance handler."""
 
-    def __init__(self, brain):
+    def __init__(self, brain, index: CodeIndex = None):
         self.brain = brain
+        self.index = index or CodeIndex()
+        self.index.start()
 
     def handle(self, user_input: str, context: str = '') -> str:
         """Handle code-related requests."""
@@ -28,6 +34,14 @@ If explaining code, be clear and educational."""
         if context:
             system += f"\n\nRelevant context:\n{context}"
 
+        try:
+            code_context = self.index.context_for(user_input)
+        except Exception as e:
+            print(f"[CODE] Code index lookup failed: {e}")
+            code_context = ''
+        if code_context:
+            system += f"\n\nRelevant code from the user's projects:\n{code_context}"
+
         prompt = f"User: {user_input}\n\nAssistant:"
 
         try:
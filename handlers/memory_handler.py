@@ -1,18 +1,29 @@
 """
 JARVIS v1.0 — Memory Handler
-Handles memory-related requests: recall, search, privacy, export, wipe.
+Handles memory-related requests: recall, search, privacy, export, wipe, profiles.
 """
 
 import os
+import re
 from datetime import datetime
-from memory import Memory
+from memory import Memory, normalize_profile_id
 from config import DATA_DIR
 
+# "switch to alice's profile", "switch user to bob", "change profile to carol", "use profile dave"
+_SWITCH_PROFILE = re.compile(
+    r"\b(?:(?:switch|change)\s+(?:(?:to|the|profile|user)\s+)*|use\s+(?:the\s+)?profile\s+)([\w-]+)")
+# "create profile erin", "new profile for frank", "add a user called grace"
+_CREATE_PROFILE = re.compile(
+    r"\b(?:create|new|add)\s+(?:a\s+)?(?:new\s+)?(?:profile|user)\s+(?:for\s+|called\s+|named\s+)?([\w-]+)")
+_NOT_A_NAME = {'profile', 'profiles', 'user', 'users', 'to', 'the', 'a', 'my', 'your', 'this', 'that',
+               'another', 'his', 'her', 'their', 'our'}
+
 class MemoryHandler:
     """Memory management handler."""
 
-    def __init__(self, memory: Memory):
+    def __init__(self, memory: Memory, profiles=None):
         self.memory = memory
+        self.profiles = profiles
 
     def handle(self, user_input: str, context: str = '') -> str:
         """Route memory commands."""
@@ -22,6 +33,31 @@ class MemoryHandler:
         try:
             lower = user_input.lower().strip()
 
+            # Profiles (per-user memory)
+            if self.profiles is not None and ('profile' in lower or 'switch user' in lower):
+                created = _CREATE_PROFILE.search(lower)
+                if created and created.group(1) not in _NOT_A_NAME:
+                    name = normalize_profile_id(created.group(1))
+                    if name in self.profiles.list_profiles():
+                        return f"There's already a profile called {name}. Say 'switch to {name}'s profile' to use it."
+                    memory = self.profiles.switch(name)
+                    return f"Created {memory.profile_id}'s profile and switched to it."
+                switch = _SWITCH_PROFILE.search(lower)
+                if switch or 'switch' in lower:
+                    if not switch or switch.group(1) in _NOT_A_NAME:
+                        return f"Which profile should I switch to? Profiles: {', '.join(self.profiles.list_profiles())}"
+                    name = normalize_profile_id(switch.group(1))
+                    known = self.profiles.list_profiles()
+                    if name not in known:
+                        # Never create a profile by accident ("switch to my profile")
+                        return (f"I don't have a profile called {name}. Profiles: {', '.join(known)}. "
+                                f"Say 'create profile {name}' to make a new one.")
+                    memory = self.profiles.switch(name)
+                    return f"Switched to {memory.profile_id}'s profile."
+                if 'list' in lower or 'all profiles' in lower:
+                    return "Profiles: " + ", ".join(self.profiles.list_profiles())
+                return f"Current profile: {self.memory.profile_id}"
+
             # Privacy mode
             if 'privacy mode' in lower or 'go private' in lower:
                 if 'off' in lower or 'disable' in lower or 'stop' in lower:
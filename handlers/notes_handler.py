@@ -1,21 +1,41 @@
 """
 JARVIS v1.0 — Notes Handler
 Voice notes: save, search, list, and delete timestamped notes.
+Notes are markdown files or, with NOTES_STORAGE=journal, records in an
+append-only journal. Lookups go through a full-text index either way.
+"Summarize my notes [about X]" runs the matching notes through the
+map-reduce summarizer (see summarizer.py).
 """
 
 import os
+import re
 from datetime import datetime
 from pathlib import Path
-from config import NOTES_DIR
+from config import DATA_DIR, NOTES_DIR, NOTES_STORAGE, NOTES_JOURNAL_DIR
+from notes_index import NotesIndex
+from notes_journal import NotesJournal
+from summarizer import Summarizer
 
 class NotesHandler:
     """Voice notes management handler."""
 
-    def __init__(self, memory):
+    def __init__(self, memory, brain=None):
         self.memory = memory
+        self.summarizer = Summarizer(brain) if brain else None
         self.notes_dir = Path(NOTES_DIR)
         self.notes_dir.mkdir(parents=True, exist_ok=True)
 
+        self.journal = None
+        if NOTES_STORAGE == 'journal':
+            self.journal = NotesJournal(NOTES_JOURNAL_DIR)
+            if not len(self.journal) and any(self.notes_dir.glob('*.md')):
+                imported = self.journal.import_markdown(self.notes_dir)
+                print(f"[NOTES] Imported {imported} markdown notes into the journal.")
+
+        # self.memory is looked up per call: it is rebound on profile switches
+        self.index = NotesIndex(self.journal or self.notes_dir, embed_batch=lambda texts: self.memory.embed_batch(texts))
+        self.index.start()
+
     def _save_note(self, content: str) -> str:
         """Save a timestamped note."""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -24,76 +44,98 @@ class NotesHandler:
         filepath = self.notes_dir / filename
 
         note_content = f"# Note — {date_str}\n\n{content}\n"
-        filepath.write_text(note_content, encoding='utf-8')
+        if self.journal:
+            mtime_ns, size = self.journal.put(filename, note_content)
+        else:
+            filepath.write_text(note_content, encoding='utf-8')
+            stat = filepath.stat()
+            mtime_ns, size = stat.st_mtime_ns, stat.st_size
+        self.index.upsert(filename, note_content, mtime_ns, size)
         return f"Note saved: {filename}"
 
     def _list_notes(self, limit: int = 10) -> str:
         """List recent notes."""
-        notes = sorted(self.notes_dir.glob('note_*.md'), reverse=True)
-        if not notes:
+        total = self.index.count()
+        if not total:
             return "You don't have any notes yet."
 
-        lines = [f"📝 Your notes ({len(notes)} total):"]
-        for note in notes[:limit]:
-            try:
-                first_line = note.read_text(encoding='utf-8').split('\n')[0]
-                # Remove markdown header
-                first_line = first_line.lstrip('# ').strip()
-                lines.append(f"  • {note.stem}: {first_line}")
-            except Exception:
-                lines.append(f"  • {note.stem}")
-
-        if len(notes) > limit:
-            lines.append(f"  ... and {len(notes) - limit} more")
+        lines = [f"📝 Your notes ({total} total):"]
+        for name, title in self.index.list_recent(limit):
+            stem = Path(name).stem
+            lines.append(f"  • {stem}: {title}" if title else f"  • {stem}")
+
+        if total > limit:
+            lines.append(f"  ... and {total - limit} more")
         return "\n".join(lines)
 
     def _search_notes(self, query: str) -> str:
         """Search notes by content."""
-        notes = sorted(self.notes_dir.glob('note_*.md'), reverse=True)
-        if not notes:
+        if not self.index.count():
             return "No notes to search."
 
-        matches = []
-        query_lower = query.lower()
-        for note in notes:
-            try:
-                content = note.read_text(encoding='utf-8')
-                if query_lower in content.lower():
-                    # Get first 100 chars of match context
-                    idx = content.lower().index(query_lower)
-                    start = max(0, idx - 30)
-                    end = min(len(content), idx + len(query) + 70)
-                    snippet = content[start:end].replace('\n', ' ').strip()
-                    matches.append(f"  • {note.stem}: ...{snippet}...")
-            except Exception:
-                pass
-
-        if not matches:
+        # Hybrid lexical + semantic ranking once notes have vectors and the
+        # query can be embedded; plain full-text search otherwise
+        query_vec = self.memory.embed(query) if self.index.has_vectors() else None
+        if query_vec:
+            results = self.index.hybrid_search(query, query_vec, limit=10)
+            total = len(results)
+        else:
+            total, results = self.index.search(query, limit=10)
+        if not results:
             return f"No notes found matching '{query}'."
 
-        lines = [f"Found {len(matches)} notes matching '{query}':"] + matches[:10]
+        matches = [f"  • {Path(name).stem}: ...{snippet}..." for name, snippet in results]
+        lines = [f"Found {total} notes matching '{query}':"] + matches
         return "\n".join(lines)
 
     def _read_note(self, identifier: str) -> str:
         """Read a specific note."""
-        # Try to find by partial name match
-        notes = list(self.notes_dir.glob(f'*{identifier}*.md'))
-        if not notes:
+        # Find by partial name match
+        found = self.index.find(identifier)
+        if not found:
             return f"No note found matching '{identifier}'."
-        
-        note = notes[0]
-        content = note.read_text(encoding='utf-8')
-        return f"📄 {note.name}:\n{content}"
+
+        name, content = found
+        return f"📄 {name}:\n{content}"
 
     def _delete_note(self, identifier: str) -> str:
         """Delete a specific note."""
-        notes = list(self.notes_dir.glob(f'*{identifier}*.md'))
-        if not notes:
+        found = self.index.find(identifier)
+        if not found:
             return f"No note found matching '{identifier}'."
-        
-        note = notes[0]
-        note.unlink()
-        return f"Deleted note: {note.name}"
+
+        name = found[0]
+        if self.journal:
+            self.journal.delete(name)
+        else:
+            (self.notes_dir / name).unlink(missing_ok=True)
+        self.index.remove(name)
+        return f"Deleted note: {name}"
+
+    def _summarize_notes(self, query: str = '', limit: int = 50) -> str:
+        """Summarize the notes matching a query, or the most recent ones."""
+        if not self.summarizer:
+            return "I need my language model to summarize notes."
+        if query:
+            _, results = self.index.search(query, limit=limit)
+            names = [name for name, _ in results]
+        else:
+            names = [name for name, _ in self.index.list_recent(limit)]
+        if not names:
+            return f"No notes found matching '{query}'." if query else "You don't have any notes yet."
+
+        notes = [found[1].strip() for found in map(self.index.find, names) if found]
+        task = f"Summarize my notes about {query}." if query else "Summarize my recent notes."
+        task += " Group related points and mention dates where they matter."
+        return self.summarizer.summarize("\n\n".join(notes), task)
+
+    def _export_notes(self) -> str:
+        """Write journal notes back out as markdown files."""
+        if not self.journal:
+            return f"Your notes are already markdown files in {self.notes_dir}."
+        dest = DATA_DIR / f"notes_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        count = self.journal.export_markdown(dest)
+        return f"Exported {count} notes to {dest}"
 
     def handle(self, user_input: str, context: str = '') -> str:
         """Route notes commands."""
@@ -118,6 +160,16 @@ class NotesHandler:
                     return "What should I note down?"
                 return self._save_note(content)
 
+            # Export notes
+            if 'export notes' in lower or 'export my notes' in lower:
+                return self._export_notes()
+
+            # Summarize notes
+            if lower.startswith(('summarize', 'summarise')) and 'note' in lower:
+                query = re.sub(r'^summari[sz]e\s+(?:all\s+)?(?:my\s+|the\s+)?(?:recent\s+)?notes?\s*(?:about|on|for)?',
+                               '', lower).strip()
+                return self._summarize_notes(query)
+
             # List notes
             if any(w in lower for w in ['my notes', 'show notes', 'list notes', 'all notes']):
                 return self._list_notes()
@@ -2,61 +2,172 @@
 JARVIS v1.0 — Search Handler
 Web search using DuckDuckGo (free, no API key).
 Searches the web, then summarizes results using the LLM.
+Results and summaries are cached (see search_cache.py), so repeated
+questions are answered without searching or summarizing again.
+Web and news are searched in parallel, and the top result pages are
+fetched concurrently (starting as soon as the main results arrive) so
+the summary draws on their most relevant passages (see web_pages.py),
+not just the snippets.
+Summaries go through the map-reduce summarizer (see summarizer.py): one
+direct call for ordinary result sets, chunked in parallel when long.
+Provider calls go through a request governor (see request_governor.py):
+throttled searches back off and retry, and when the provider keeps
+refusing, stale cached results are used if there are any.
+Documents on disk (see doc_index.py) are searched alongside the web, or
+first with DOCS_SEARCH_MODE=first, so questions about the user's own
+files are answered offline too.
 """
 
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
 from brain import Brain
+from config import DOCS_SEARCH_MODE, DOCS_SEARCH_RESULTS, SEARCH_FETCH_PAGES, SEARCH_RATE
+from request_governor import RateLimited, RequestGovernor, get_governor
+from search_backends import SearchBackend, create_search_backend
+from search_cache import SearchCache, normalize_query, results_hash
+from summarizer import Summarizer
+from web_pages import PageFetcher
 
 class SearchHandler:
     """Web search and summarization handler."""
 
-    def __init__(self, brain: Brain):
+    def __init__(self, brain: Brain, backend: SearchBackend = None, cache: SearchCache = None,
+                 fetcher: PageFetcher = None, summarizer: Summarizer = None, governor: RequestGovernor = None,
+                 docs: SearchBackend = None):
         self.brain = brain
-        self.available = False
-        try:
-            from ddgs import DDGS
-            self.ddgs = DDGS
-            self.available = True
-            print("[SEARCH] DuckDuckGo search ready.")
-        except ImportError:
-            try:
-                from duckduckgo_search import DDGS
-                self.ddgs = DDGS
-                self.available = True
-                print("[SEARCH] DuckDuckGo search ready (legacy package).")
-            except ImportError:
-                self.ddgs = None
-                print("[SEARCH] WARNING: No search package found. Run: pip install ddgs")
+        self.backend = backend or create_search_backend()
+        self.available = self.backend.available
+        self.cache = cache or SearchCache()
+        self.fetcher = fetcher or PageFetcher()
+        self.summarizer = summarizer or Summarizer(brain)
+        self.governor = governor or get_governor(self.backend.name,
+                                                 SEARCH_RATE if self.backend.rate_limited else None)
+        self.docs = docs
+        if docs is None and DOCS_SEARCH_MODE != 'off' and self.backend.name != 'docs':
+            self.docs = create_search_backend('docs')
+        self._pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='search')
+        self._limited_until = 0.0    # When the provider's last refusal is expected to lift
 
     def _search_web(self, query: str, max_results: int = 5) -> list[dict]:
-        """Search DuckDuckGo and return results."""
+        """Search the web and return results. Raises RateLimited if the provider keeps refusing."""
         if not self.available:
             return []
         try:
-            with self.ddgs() as ddgs:
-                results = list(ddgs.text(query, max_results=max_results))
-                return results
+            key = normalize_query(query)     # Sent as-is, so it matches the cache key
+            if not key:
+                return []
+            return self.governor.call(('text', key, max_results),
+                                      self.backend.text, key, max_results=max_results)
+        except RateLimited:
+            raise
         except Exception as e:
             print(f"[SEARCH] Error: {e}")
             return []
 
     def _search_news(self, query: str, max_results: int = 5) -> list[dict]:
-        """Search DuckDuckGo News."""
+        """Search news. Raises RateLimited if the provider keeps refusing."""
         if not self.available:
             return []
-            try:
-                with self.ddgs() as ddgs:
-                    results = list(ddgs.news(query, max_results=max_results))
-                    return results
-            except Exception as e:
-                print(f"[SEARCH] News error: {e}")
+        try:
+            key = normalize_query(query)     # Sent as-is, so it matches the cache key
+            if not key:
                 return []
+            return self.governor.call(('news', key, max_results),
+                                      self.backend.news, key, max_results=max_results)
+        except RateLimited:
+            raise
+        except Exception as e:
+            print(f"[SEARCH] News error: {e}")
+            return []
+
+    def _search(self, query: str, kind: str) -> list[dict]:
+        """Cached results if still fresh, otherwise a new search (stale results if throttled)."""
+        results = self.cache.get_results(query, kind)
+        if results is not None:
+            print(f"[SEARCH] Cached {kind} results for: {query}")
+            return results
+        try:
+            results = self._search_news(query) if kind == 'news' else self._search_web(query)
+        except RateLimited as e:
+            print(f"[SEARCH] {e}")
+            self._limited_until = max(self._limited_until, time.monotonic() + e.retry_after)
+            return self.cache.get_results(query, kind, stale_ok=True) or []
+        if results:
+            self.cache.put_results(query, kind, results)
+        return results
+
+    def _search_docs(self, query: str, max_results: int = DOCS_SEARCH_RESULTS) -> list[dict]:
+        """Matching documents on disk."""
+        if not self.docs or not self.docs.available:
+            return []
+        try:
+            return self.docs.text(query, max_results=max_results)
+        except Exception as e:
+            print(f"[SEARCH] Document search error: {e}")
+            return []
+
+    def _gather(self, query: str, is_news: bool) -> tuple[list[dict], Optional[Future]]:
+        """
+        Web and news searches in parallel. Results of the question's own kind
+        come first; other questions get at most two news results on top.
+        Matching local documents follow the top web results, the ones whose
+        pages are read (or, in "first" mode, replace the web search whenever
+        there are any).
+        Returns (results, Future of page passages): fetching the top pages
+        starts as soon as the main results are in, while the rest finish.
+        """
+        if DOCS_SEARCH_MODE == 'first':
+            local = self._search_docs(query, max_results=5)
+            if local:
+                print(f"[SEARCH] Answering from {len(local)} local documents")
+                return local, None
+        local = self._pool.submit(self._search_docs, query) if DOCS_SEARCH_MODE == 'alongside' else None
+        kinds = ('news', 'text') if is_news else ('text', 'news')
+        primary_future, secondary_future = [self._pool.submit(self._search, query, kind) for kind in kinds]
+        primary = primary_future.result()
+        pages = self._pool.submit(self._fetch_passages, query, primary) if primary else None
+        secondary = secondary_future.result()
+        merged, seen = [], set()
+        ordered = (primary[:SEARCH_FETCH_PAGES] + (local.result() if local else []) + primary[SEARCH_FETCH_PAGES:]
+                   + (secondary if is_news else secondary[:2]))
+        for r in ordered:
+            url = r.get('href', r.get('url', ''))
+            if url and url in seen:
+                continue
+            seen.add(url)
+            merged.append(r)
+        return merged, pages
+
+    def _fetch_passages(self, query: str, results: list[dict]) -> list[tuple[str, str]]:
+        """Most relevant passages from the top result pages, as (url, text)."""
+        urls = [r.get('href', r.get('url', '')) for r in results[:SEARCH_FETCH_PAGES]]
+        # Local documents are left out: their snippet is already in the results
+        urls = [url if url.startswith(('http://', 'https://')) else '' for url in urls]
+        if not any(urls):
+            return []
+        return [(urls[source], text) for source, text in self.fetcher.passages(query, urls)]
+
+    def _page_excerpts(self, top: list[dict], pages: Optional[Future]) -> str:
+        """Fetched passages labelled with the number of their result in `top`."""
+        position = {r.get('href', r.get('url', '')): i for i, r in enumerate(top)}
+        passages = [(position[url], text) for url, text in (pages.result() if pages else []) if url in position]
+        if passages:
+            print(f"[SEARCH] Using {len(passages)} passages from {len({source for source, _ in passages})} pages")
+        return "\n\n".join(f"[{source + 1}] {text}" for source, text in passages)
+
+    def stats(self) -> dict:
+        """Cache and outbound request counters."""
+        return {'cache': self.cache.stats(), 'provider': self.backend.name, 'governor': self.governor.metrics()}
 
     def handle(self, user_input: str, context: str = '') -> str:
         """Search the web and summarize results."""
         # Input validation
         if not isinstance(user_input, str) or not user_input.strip():
             return "Sorry, I didn't receive any input."
-        if not self.available:
+        if not self.available and not (self.docs and self.docs.available):
             return "Web search is not available. Install duckduckgo-search package."
 
         try:
@@ -65,35 +176,47 @@ class SearchHandler:
             is_news = any(w in lower for w in ['news', 'latest', 'recent', 'today', 'current'])
 
             print(f"[SEARCH] Searching: {user_input}")
-
-            if is_news:
-                results = self._search_news(user_input)
-            else:
-                results = self._search_web(user_input)
+            results, pages = self._gather(user_input, is_news)
 
             if not results:
+                wait = self._limited_until - time.monotonic()
+                if wait > 0:
+                    return (f"The search provider is limiting requests right now, so I couldn't look that up. "
+                            f"Try again in about {math.ceil(wait)} seconds.")
                 return f"No search results found for '{user_input}'. This may be due to query phrasing, search engine limitations, or a temporary block. Try a different query or check for rate limits."
 
+            # Same question, same results: reuse the summary
+            top = results[:5]
+            rhash = results_hash(top)
+            cached = self.cache.get_summary(user_input, rhash)
+            if cached:
+                if pages:
+                    pages.cancel()
+                return cached
+
             # Format results for LLM summarization
             formatted = []
-            for i, r in enumerate(results[:5], 1):
+            for i, r in enumerate(top, 1):
                 title = r.get('title', 'No title')
                 body = r.get('body', r.get('description', 'No description'))
                 url = r.get('href', r.get('url', ''))
                 formatted.append(f"{i}. {title}\n   {body}\n   Source: {url}")
 
             results_text = "\n\n".join(formatted)
+            excerpts = self._page_excerpts(top, pages)
+            if excerpts:
+                results_text += f"\n\nExcerpts from the result pages (numbers match the results above):\n{excerpts}"
 
             # Summarize with LLM
-            summary_prompt = f"""Based on these search results, provide a clear and concise answer to the user's question.
+            task = f"""Based on these search results, provide a clear and concise answer to the user's question.
 
 User's question: "{user_input}"
 
-Search results:
-{results_text}
-
 Provide a helpful summary. Cite sources when relevant. If the results don't fully answer the question, say so."""
 
-            return self.brain.generate_response(summary_prompt, context)
+            summary = self.summarizer.summarize(results_text, task, context)
+            if not Brain.is_error(summary):
+                self.cache.put_summary(user_input, rhash, summary)
+            return summary
         except Exception as e:
             return f"Sorry, an error occurred: {e}"
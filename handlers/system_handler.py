@@ -10,8 +10,25 @@ import platform
 import json
 from pathlib import Path
 from safety import validate_command, validate_file_operation
+from safety_audit import format_entry, get_audit_log
 from brain import Brain
-import shutil
+from app_registry import AppRegistry
+from config import (
+    APP_LAUNCH_DENYLIST,
+    APP_MATCH_MIN_SCORE,
+    FILE_LIST_PAGE_SIZE,
+    FILE_PAGE_MAX_CHARS,
+    FUZZY_OPEN_MARGIN,
+    SCREENSHOT_FORMAT,
+    SCREENSHOTS_DIR,
+    SUMMARY_MAX_INPUT_CHARS,
+)
+from file_pager import FilePager, format_size, list_directory
+from file_index import FileIndex
+from fuzzy_match import TrigramIndex
+from screenshot_store import ScreenshotStore
+from summarizer import Summarizer
+from system_metrics import MetricsSampler
 import webbrowser
 import re
 from urllib.parse import quote_plus
@@ -40,8 +57,19 @@ class SystemHandler:
             self._psutil_available = True
         except ImportError:
             print("[SYSTEM] psutil not installed. Some system info unavailable.")
-    SCREENSHOTS_DIR = Path(__file__).parent.parent / "data" / "screenshots"
-    SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
+        self.metrics = MetricsSampler()
+        self.metrics.start()
+        self.screenshots = ScreenshotStore()
+        self.screenshots.start()
+        self.file_index = FileIndex()
+        self.file_index.start()
+        self._app_names = list(self.APP_ALIASES)
+        self._app_index = TrigramIndex(self._app_names)
+        self.apps = AppRegistry()
+        self.apps.start()
+        self._paging = None
+        self.summarizer = Summarizer(brain) if brain else None
+    SCREENSHOTS_DIR = SCREENSHOTS_DIR
     # App aliases (merge masterplan and advanced)
     APP_ALIASES = {
         "notepad":        "notepad.exe",
@@ -96,42 +124,18 @@ class SystemHandler:
             return f"Failed to open {app_name}: {e}"
     def take_screenshot(self, label: str = "") -> str:
         try:
-            import mss
-            import mss.tools
             timestamp = time.strftime("%Y%m%d_%H%M%S")
             suffix = f"_{label}" if label else ""
-            filename = self.SCREENSHOTS_DIR / f"screenshot{suffix}_{timestamp}.png"
-            with mss.mss() as sct:
-                monitor = sct.monitors[0]
-                sct_img = sct.grab(monitor)
-                mss.tools.to_png(sct_img.rgb, sct_img.size, output=str(filename))
-            return f"Screenshot saved to {filename}"
+            ext = '.jpg' if SCREENSHOT_FORMAT.upper() == 'JPEG' else f'.{SCREENSHOT_FORMAT.lower()}'
+            shot = self.screenshots.add(source=label or 'user', wait=True,
+                                        path=self.SCREENSHOTS_DIR / f"screenshot{suffix}_{timestamp}{ext}")
+            if shot['duplicate']:
+                return f"The screen hasn't changed since an earlier screenshot: {shot['path']}"
+            return f"Screenshot saved to {shot['path']}"
         except Exception as e:
             return f"Screenshot failed: {e}"
     def get_system_info(self) -> str:
-        try:
-            import psutil
-            cpu = psutil.cpu_percent(interval=0.5)
-            ram = psutil.virtual_memory()
-            disk = psutil.disk_usage("C:\\")
-            battery = psutil.sensors_battery()
-            ram_used  = ram.used  / (1024 ** 3)
-            ram_total = ram.total / (1024 ** 3)
-            disk_used  = disk.used  / (1024 ** 3)
-            disk_total = disk.total / (1024 ** 3)
-            bat_str = (
-                f"{battery.percent:.0f}% ({'plugged in' if battery.power_plugged else 'on battery'})"
-                if battery else "N/A"
-            )
-            return (
-                f"OS: {platform.system()} {platform.release()}\n"
-                f"CPU Usage: {cpu}%\n"
-                f"RAM: {ram_used:.1f} GB / {ram_total:.1f} GB ({ram.percent}%)\n"
-                f"Disk (C:): {disk_used:.0f} GB / {disk_total:.0f} GB ({disk.percent}%)\n"
-                f"Battery: {bat_str}"
-            )
-        except Exception as e:
-            return f"Could not retrieve system info: {e}"
+        return self._get_system_info()
     def run_command(self, command: str, working_dir: str = None) -> str:
         from config import BLOCKED_COMMANDS
         cmd_lower = command.lower()
@@ -154,21 +158,8 @@ class SystemHandler:
         except Exception as e:
             return f"Command failed: {e}"
     def list_directory(self, path: str = None) -> str:
-        target = Path(path) if path else Path.home() / "Desktop"
-        if not target.exists():
-            return f"Directory not found: {target}"
-        try:
-            items = sorted(target.iterdir(), key=lambda x: (x.is_file(), x.name.lower()))
-            lines = [f"📁 {target}\n"]
-            for item in items[:30]:
-                icon = "📄" if item.is_file() else "📂"
-                size = f" ({item.stat().st_size // 1024} KB)" if item.is_file() else ""
-                lines.append(f"  {icon} {item.name}{size}")
-            if len(list(target.iterdir())) > 30:
-                lines.append("  ... (more items)")
-            return "\n".join(lines)
-        except PermissionError:
-            return f"Permission denied: {target}"
+        return self._list_files(str(path) if path else str(Path.home() / "Desktop"))
+
     def handle(self, text: str, context: dict = None) -> str:
         lower = text.lower()
         if any(w in lower for w in ["screenshot", "capture screen", "take a screenshot"]):
@@ -211,6 +202,74 @@ class SystemHandler:
                 )
             except Exception as e:
                 return f"Could not retrieve system info: {e}"
+
+    def _find_paths(self, query: str, kind: str = None):
+        """Ranked files/folders under the indexed roots. Returns (total, [(path, score)])."""
+        # Only the very first request after startup can wait on the initial crawl
+        if not self.file_index.wait_ready(timeout=10):
+            print("[SYSTEM] File index still crawling; results may be incomplete.")
+        return self.file_index.find(query, kind, limit=10)
+
+    def _open_path(self, path: str) -> str:
+        try:
+            os.startfile(path)
+            if os.path.isdir(path):
+                return f"Opened folder: {path}"
+            return f"Opened file: {path}"
+        except Exception as e:
+            return f"Could not open {path}: {e}"
+
+    def _open_best_match(self, query: str, kind: str = None):
+        """Open the best file/folder match, or list the candidates when it's ambiguous."""
+        total, matches = self._find_paths(query, kind)
+        if not matches:
+            return None
+        for path, _ in matches:
+            name = os.path.basename(path).lower()
+            if query in (name, os.path.splitext(name)[0]):
+                return self._open_path(path)
+        if len(matches) == 1 or matches[0][1] - matches[1][1] >= FUZZY_OPEN_MARGIN:
+            return self._open_path(matches[0][0])
+        msg = [f"Found multiple matches for '{query}':"]
+        for path, _ in matches:
+            msg.append(f"  - {path}")
+        if total > len(matches):
+            msg.append(f"  ...and {total - len(matches)} more")
+        msg.append("Please specify a more precise name.")
+        return "\n".join(msg)
+
+    def _resolve_app_alias(self, name: str) -> str:
+        """Map a spoken app name onto an APP_ALIASES key ('vs cod' -> 'vs code')."""
+        name = name.lower().strip()
+        if name in self.APP_ALIASES:
+            return name
+        _, hits = self._app_index.search(name, limit=1)
+        if hits and hits[0][1] >= APP_MATCH_MIN_SCORE:
+            return self._app_names[hits[0][0]]
+        return name
+
+    def _launch_installed(self, name: str, label: str, fuzzy: bool = True, alias: bool = False):
+        """
+        Launch an app from the installed-app registry; None if it isn't known.
+        alias=True is for the curated APP_ALIASES targets, which may be bare PATH executables.
+        """
+        entry = self.apps.resolve(name, fuzzy=fuzzy, path=alias)
+        if not entry:
+            return None
+        # Safety: system tools are never "apps", even when a shortcut or desktop entry exists
+        exe = entry.get('exe') or os.path.basename(entry['command'])
+        if not alias and (Path(exe).stem.lower() in APP_LAUNCH_DENYLIST
+                          or entry['name'].lower() in APP_LAUNCH_DENYLIST):
+            return f"I can't open {label} — it's a system tool."
+        is_safe, reason = validate_command(entry['command'])
+        if not is_safe:
+            return reason
+        try:
+            self.apps.launch(entry)
+            return f"Opening {entry['name'] if fuzzy else label}."
+        except Exception as e:
+            return f"Failed to open {label}: {e}"
+
     def _open_app(self, app_name: str) -> str:
         """Open an application or website using Gemini-style strategy."""
         lower = app_name.lower().strip()
@@ -357,73 +416,16 @@ class SystemHandler:
                 fuzzy_lower = fuzzy_lower[:-5].strip()
                 is_file = True
             fuzzy_lower = fuzzy_lower.lower()
-            search_dirs = [os.getcwd(), str(Path.home() / "Desktop")]
-            matches = []
-            for base in search_dirs:
-                try:
-                    for entry in os.listdir(base):
-                        entry_path = os.path.join(base, entry)
-                        entry_name, entry_ext = os.path.splitext(entry)
-                        entry_lc = entry.lower().strip()
-                        entry_name_lc = entry_name.lower().strip()
-                        if is_folder and os.path.isdir(entry_path) and fuzzy_lower in entry_lc:
-                            matches.append(entry_path)
-                        elif is_file and os.path.isfile(entry_path) and fuzzy_lower in entry_name_lc:
-                            matches.append(entry_path)
-                    for root, dirs, files in os.walk(base):
-                        for d in dirs:
-                            d_lc = d.lower().strip()
-                            if is_folder and fuzzy_lower in d_lc:
-                                matches.append(os.path.join(root, d))
-                        for f in files:
-                            name, _ = os.path.splitext(f)
-                            name_lc = name.lower().strip()
-                            if is_file and fuzzy_lower in name_lc:
-                                matches.append(os.path.join(root, f))
-                except Exception:
-                    pass
-            if matches:
-                matches = list(dict.fromkeys(matches))
-                exact_match = None
-                for m in matches:
-                    base_name = os.path.basename(m).lower()
-                    if base_name == fuzzy_lower:
-                        exact_match = m
-                        break
-                if exact_match:
-                    try:
-                        os.startfile(exact_match)
-                        if os.path.isdir(exact_match):
-                            return f"Opened folder: {exact_match}"
-                        else:
-                            return f"Opened file: {exact_match}"
-                    except Exception as e:
-                        return f"Could not open {exact_match}: {e}"
-                elif len(matches) == 1:
-                    try:
-                        os.startfile(matches[0])
-                        if os.path.isdir(matches[0]):
-                            return f"Opened folder: {matches[0]}"
-                        else:
-                            return f"Opened file: {matches[0]}"
-                    except Exception as e:
-                        return f"Could not open {matches[0]}: {e}"
-                else:
-                    msg = [f"Found multiple matches for '{fuzzy_lower}':"]
-                    for m in matches[:10]:
-                        msg.append(f"  - {m}")
-                    if len(matches) > 10:
-                        msg.append(f"  ...and {len(matches)-10} more")
-                    msg.append("Please specify a more precise name.")
-                    return "\n".join(msg)
-            else:
-                return f"No file or folder found containing '{fuzzy_lower}'."
+            result = self._open_best_match(fuzzy_lower, 'dir' if is_folder else 'file')
+            return result or f"No file or folder found containing '{fuzzy_lower}'."
         else:
             # --- App keyword check: trigger app open logic ---
             app_keywords = [
                 "vscode", "vs code", "visual studio code", "chrome", "google chrome", "firefox", "edge", "microsoft edge", "notepad", "calculator", "calc", "explorer", "file explorer", "files", "cmd", "terminal", "windows terminal", "spotify", "discord", "slack", "word", "excel", "powerpoint", "paint", "snipping tool", "task manager", "settings", "control panel", "whatsapp"
             ]
-            if lower in app_keywords:
+            app_key = self._resolve_app_alias(lower)
+            if app_key in app_keywords:
+                lower = app_key
                 exe = self.APP_ALIASES.get(lower)
                 if exe:
                     # VS Code special handling
@@ -457,13 +459,14 @@ class SystemHandler:
                                 except Exception:
                                     pass
                         return "Could not open VS Code. Please ensure it is installed and 'code' is in your PATH."
-                    if shutil.which(exe):
-                        try:
-                            subprocess.Popen(exe, shell=True)
-                            return f"Opening {lower}."
-                        except Exception as e:
-                            return f"Failed to open {lower}: {e}"
+                    result = self._launch_installed(exe, lower, fuzzy=False, alias=True)
+                    if result:
+                        return result
                     return f"{lower} not found in PATH or standard locations."
+            # Installed app under its own name ("gimp", "obs studio")
+            result = self._launch_installed(lower, app_name, fuzzy=False)
+            if result:
+                return result
             # Fallback: fuzzy file/folder search if not an app
             # ...existing fuzzy search logic below...
 
@@ -485,77 +488,13 @@ class SystemHandler:
             fuzzy_lower = fuzzy_lower[:-5].strip()
             is_file = True
         fuzzy_lower = fuzzy_lower.lower()
-        search_dirs = [os.getcwd(), str(Path.home() / "Desktop")]
-        matches = []
         if fuzzy_lower:
-            for base in search_dirs:
-                try:
-                    for entry in os.listdir(base):
-                        entry_path = os.path.join(base, entry)
-                        entry_name, entry_ext = os.path.splitext(entry)
-                        entry_lc = entry.lower().strip()
-                        entry_name_lc = entry_name.lower().strip()
-                        if is_folder and os.path.isdir(entry_path) and fuzzy_lower in entry_lc:
-                            matches.append(entry_path)
-                        elif is_file and os.path.isfile(entry_path) and fuzzy_lower in entry_name_lc:
-                            matches.append(entry_path)
-                        elif not is_folder and not is_file:
-                            if os.path.isdir(entry_path) and fuzzy_lower in entry_lc:
-                                matches.append(entry_path)
-                            if os.path.isfile(entry_path) and fuzzy_lower in entry_name_lc:
-                                matches.append(entry_path)
-                    for root, dirs, files in os.walk(base):
-                        for d in dirs:
-                            d_lc = d.lower().strip()
-                            if is_folder and fuzzy_lower in d_lc:
-                                matches.append(os.path.join(root, d))
-                            elif not is_folder and not is_file and fuzzy_lower in d_lc:
-                                matches.append(os.path.join(root, d))
-                        for f in files:
-                            name, _ = os.path.splitext(f)
-                            name_lc = name.lower().strip()
-                            if is_file and fuzzy_lower in name_lc:
-                                matches.append(os.path.join(root, f))
-                            elif not is_folder and not is_file and fuzzy_lower in name_lc:
-                                matches.append(os.path.join(root, f))
-                except Exception:
-                    pass
-        if matches:
-            matches = list(dict.fromkeys(matches))
-            exact_match = None
-            for m in matches:
-                base_name = os.path.basename(m).lower()
-                if base_name == fuzzy_lower:
-                    exact_match = m
-                    break
-            if exact_match:
-                try:
-                    os.startfile(exact_match)
-                    if os.path.isdir(exact_match):
-                        return f"Opened folder: {exact_match}"
-                    else:
-                        return f"Opened file: {exact_match}"
-                except Exception as e:
-                    return f"Could not open {exact_match}: {e}"
-            elif len(matches) == 1:
-                try:
-                    os.startfile(matches[0])
-                    if os.path.isdir(matches[0]):
-                        return f"Opened folder: {matches[0]}"
-                    else:
-                        return f"Opened file: {matches[0]}"
-                except Exception as e:
-                    return f"Could not open {matches[0]}: {e}"
-            else:
-                msg = [f"Found multiple matches for '{fuzzy_lower}':"]
-                for m in matches[:10]:
-                    msg.append(f"  - {m}")
-                if len(matches) > 10:
-                    msg.append(f"  ...and {len(matches)-10} more")
-                msg.append("Please specify a more precise name.")
-                return "\n".join(msg)
-        elif fuzzy_lower:
-            return f"No file or folder found containing '{fuzzy_lower}'."
+            kind = 'dir' if is_folder else 'file' if is_file else None
+            result = self._open_best_match(fuzzy_lower, kind)
+            if not result and kind is None:
+                # Closest installed app name ("photoshp" -> Adobe Photoshop)
+                result = self._launch_installed(fuzzy_lower, app_name, fuzzy=True)
+            return result or f"No file or folder found containing '{fuzzy_lower}'."
         path_candidate = Path(app_name).expanduser().resolve()
         if path_candidate.exists():
             try:
@@ -637,29 +576,11 @@ class SystemHandler:
                 pass
 
         # Try to open as a desktop app (check PATH and common install locations)
-        exe = self.APP_ALIASES.get(lower)
+        exe = self.APP_ALIASES.get(self._resolve_app_alias(lower))
         if exe:
-            if shutil.which(exe):
-                try:
-                    subprocess.Popen(exe, shell=True)
-                    return f"Opening {app_name}."
-                except Exception as e:
-                    return f"Failed to open {app_name}: {e}"
-            browser_paths = [
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files\Mozilla Firefox\firefox.exe",
-                r"C:\Program Files (x86)\Mozilla Firefox\firefox.exe",
-                r"C:\Program Files\Microsoft\Edge\Application\msedge.exe",
-                r"C:\Program Files (x86)\Microsoft\Edge\Application\msedge.exe"
-            ]
-            for path in browser_paths:
-                if exe in path and os.path.exists(path):
-                    try:
-                        subprocess.Popen(f'"{path}"', shell=True)
-                        return f"Opening {app_name} from {path}."
-                    except Exception as e:
-                        return f"Failed to open {app_name} from {path}: {e}"
+            result = self._launch_installed(exe, app_name, fuzzy=False)
+            if result:
+                return result
             if exe.startswith('ms-'):
                 try:
                     os.startfile(exe)
@@ -685,7 +606,10 @@ class SystemHandler:
     def _close_app(self, app_name: str) -> str:
         """Close an application by name."""
         lower = app_name.lower().strip()
-        exe = self.APP_ALIASES.get(lower, f'{lower}.exe')
+        exe = self.APP_ALIASES.get(self._resolve_app_alias(lower))
+        if not exe:
+            entry = self.apps.resolve(lower, fuzzy=False)
+            exe = entry.get('exe', f'{lower}.exe') if entry else f'{lower}.exe'
 
         # Safety: don't kill critical processes
         critical = ['explorer.exe', 'csrss.exe', 'winlogon.exe', 'svchost.exe',
@@ -758,79 +682,69 @@ class SystemHandler:
     def _take_screenshot(self) -> str:
         """Take a screenshot and save to JARVIS data/screenshots folder."""
         try:
-            from datetime import datetime
-            jarvis_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "screenshots")
-            os.makedirs(jarvis_dir, exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filepath = os.path.join(jarvis_dir, f'screenshot_{timestamp}.png')
-
-            # Use PowerShell to take screenshot
-            ps_cmd = f'''
-            Add-Type -AssemblyName System.Windows.Forms
-            $screen = [System.Windows.Forms.Screen]::PrimaryScreen.Bounds
-            $bitmap = New-Object System.Drawing.Bitmap($screen.Width, $screen.Height)
-            $graphics = [System.Drawing.Graphics]::FromImage($bitmap)
-            $graphics.CopyFromScreen($screen.Location, [System.Drawing.Point]::Empty, $screen.Size)
-            $bitmap.Save("{filepath}")
-            $graphics.Dispose()
-            $bitmap.Dispose()
-            '''
-            subprocess.run(['powershell', '-c', ps_cmd], capture_output=True, timeout=10)
-
-            if os.path.exists(filepath):
-                return f"Screenshot saved to {filepath}"
-            else:
-                return "Screenshot may have failed. Check the JARVIS screenshots folder."
+            shot = self.screenshots.add(source='user', wait=True)
+            if shot['duplicate']:
+                return f"The screen hasn't changed since your last screenshot: {shot['path']}"
+            return f"Screenshot saved to {shot['path']}"
         except Exception as e:
             return f"Screenshot error: {e}"
 
+    def _show_last_screenshot(self) -> str:
+        """Open the most recent screenshot from the store's index."""
+        shot = self.screenshots.latest()
+        if not shot:
+            return "You don't have any screenshots yet."
+        taken = time.strftime('%d %b %H:%M', time.localtime(shot['taken_at']))
+        try:
+            os.startfile(shot['path'])
+            return f"Opened your last screenshot ({taken}): {shot['path']}"
+        except Exception:
+            return f"Your last screenshot ({taken}) is at {shot['path']}"
+
     # ─── System Info ─────────────────────────────────────
 
     def _get_system_info(self) -> str:
-        """Get system information."""
+        """Get system information (latest background sample plus 1/5/15-minute trends)."""
         info = [f"OS: {platform.system()} {platform.release()}"]
 
         if self._psutil_available:
-            import psutil
+            m = self.metrics.latest()
+
+            def trend(metric):
+                values = [f"{v:.0f}" if v is not None else "-" for v in self.metrics.trend(metric)]
+                return f" (1/5/15 min avg: {'/'.join(values)}%)" if self.metrics.samples > 1 else ""
+
             # CPU
-            cpu_percent = psutil.cpu_percent(interval=1)
-            info.append(f"CPU Usage: {cpu_percent}%")
+            info.append(f"CPU Usage: {m['cpu']:.0f}%{trend('cpu')}")
 
             # Memory
-            mem = psutil.virtual_memory()
-            info.append(f"RAM: {mem.used // (1024**3):.1f} GB / {mem.total // (1024**3):.1f} GB ({mem.percent}%)")
+            info.append(f"RAM: {m['ram_used'] / 1024**3:.1f} GB / {m['ram_total'] / 1024**3:.1f} GB "
+                        f"({m['ram']:.0f}%){trend('ram')}")
 
             # Disk
-            disk = psutil.disk_usage('C:\\')
-            info.append(f"Disk (C:): {disk.used // (1024**3):.0f} GB / {disk.total // (1024**3):.0f} GB ({disk.percent}%)")
+            if 'disk_total' in m:
+                info.append(f"Disk ({self.metrics.disk_path}): {m['disk_used'] / 1024**3:.0f} GB / "
+                            f"{m['disk_total'] / 1024**3:.0f} GB ({m['disk']:.0f}%)")
 
             # Battery
-            battery = psutil.sensors_battery()
-            if battery:
-                plug = "plugged in" if battery.power_plugged else "on battery"
-                info.append(f"Battery: {battery.percent}% ({plug})")
+            if 'plugged' in m:
+                plug = "plugged in" if m['plugged'] else "on battery"
+                line = f"Battery: {m['battery']:.0f}% ({plug})"
+                drain = self.metrics.change('battery', 15)
+                if drain:
+                    line += f", {drain:+.0f}% in the last 15 min"
+                info.append(line)
 
         return "\n".join(info)
 
     def _get_top_processes(self, n: int = 5) -> str:
-        """Get top CPU-consuming processes."""
+        """Get top CPU-consuming processes (averaged over the last minute)."""
         if not self._psutil_available:
             return "psutil not installed. Can't show processes."
-        import psutil
-        procs = []
-        for p in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                procs.append(p.info)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-
-        procs.sort(key=lambda x: x.get('cpu_percent', 0) or 0, reverse=True)
-        lines = [f"Top {n} processes by CPU:"]
-        for p in procs[:n]:
-            name = p.get('name', 'Unknown')
-            cpu = p.get('cpu_percent', 0) or 0
-            mem = p.get('memory_percent', 0) or 0
-            lines.append(f"  • {name}: CPU {cpu:.1f}%, RAM {mem:.1f}%")
+        procs = self.metrics.top_processes(n, minutes=1)
+        lines = [f"Top {n} processes by CPU (last minute):"]
+        for p in procs:
+            lines.append(f"  • {p['name']}: CPU {p['cpu']:.1f}%, RAM {p['rss'] / 1024**2:.0f} MB")
         return "\n".join(lines)
 
     def _get_ip_address(self) -> str:
@@ -847,8 +761,15 @@ class SystemHandler:
 
     # ─── File Operations ─────────────────────────────────
 
-    def _list_files(self, directory: str) -> str:
-        """List files in a directory."""
+    _SORT_LABELS = {
+        ('name', True): 'Z to A',
+        ('size', False): 'smallest first', ('size', True): 'largest first',
+        ('modified', False): 'oldest first', ('modified', True): 'newest first',
+        ('none', False): 'unsorted', ('none', True): 'unsorted',
+    }
+
+    def _list_files(self, directory: str, page: int = 1, sort: str = 'name', descending: bool = False) -> str:
+        """List one page of a directory (streamed, so huge folders are fine)."""
         try:
             path = Path(directory).expanduser().resolve()
             if not path.exists():
@@ -856,40 +777,131 @@ class SystemHandler:
             if not path.is_dir():
                 return f"Not a directory: {directory}"
 
-            items = list(path.iterdir())
-            if not items:
+            total, entries = list_directory(path, page, FILE_LIST_PAGE_SIZE, sort, descending)
+            if not total:
                 return f"Directory is empty: {directory}"
+            pages = -(-total // FILE_LIST_PAGE_SIZE)
+            if not entries:
+                return f"{path} only has {pages} page{'s' if pages != 1 else ''} ({total} items)."
 
-            dirs = sorted([i.name for i in items if i.is_dir()])
-            files = sorted([i.name for i in items if i.is_file()])
-
-            lines = [f"Contents of {path}:"]
-            for d in dirs[:20]:
-                lines.append(f"  📁 {d}")
-            for f in files[:20]:
-                lines.append(f"  📄 {f}")
-            if len(items) > 40:
-                lines.append(f"  ... and {len(items) - 40} more items")
+            details = []
+            if pages > 1:
+                details.append(f"page {page} of {pages}, {total} items")
+            if sort != 'name' or descending:
+                details.append(self._SORT_LABELS[sort, descending])
+            header = f"Contents of {path}" + (f" ({'; '.join(details)}):" if details else ":")
+            lines = [header]
+            for entry in entries:
+                try:
+                    if entry.is_dir():
+                        lines.append(f"  📁 {entry.name}")
+                    else:
+                        lines.append(f"  📄 {entry.name} ({format_size(entry.stat().st_size)})")
+                except OSError:
+                    lines.append(f"  📄 {entry.name}")
+            if page < pages:
+                lines.append(f"  ... and {total - page * FILE_LIST_PAGE_SIZE} more items. Say 'next page' to continue.")
+            self._paging = {'kind': 'dir', 'path': str(path), 'page': page, 'sort': sort, 'descending': descending}
             return "\n".join(lines)
+        except PermissionError:
+            return f"Permission denied: {directory}"
         except Exception as e:
             return f"Error listing files: {e}"
 
-    def _read_file(self, filepath: str) -> str:
-        """Read a text file's contents."""
+    def _read_file(self, filepath: str, page: int = 1, first: int = None, last: int = None) -> str:
+        """Read one page (or a line range) of a text file, however large it is."""
         try:
             path = Path(filepath).expanduser().resolve()
             if not path.exists():
                 return f"File not found: {filepath}"
             if not path.is_file():
                 return f"Not a file: {filepath}"
-            if path.stat().st_size > 1024 * 1024:  # 1MB limit for reading
-                return "File is too large to read (>1MB)."
 
-            content = path.read_text(encoding='utf-8', errors='replace')
-            return f"Contents of {path.name}:\n{content[:3000]}"
+            with FilePager(path) as pager:
+                if pager.binary:
+                    return f"{path.name} looks like a binary file ({format_size(pager.size)}), so I won't read it out."
+                if first is None:
+                    first = (page - 1) * pager.lines_per_page + 1
+                    last = first + pager.lines_per_page - 1
+                lines = pager.lines(first, last)
+                if not lines:
+                    total = pager.line_count
+                    if not total:
+                        return f"{path.name} is empty."
+                    return f"{path.name} only has {total} lines ({pager.page_count} pages)."
+
+                shown = last if len(lines) == last - first + 1 else first + len(lines) - 1
+                more = pager.has_more(shown)
+                body = "\n".join(lines)
+                if len(body) > FILE_PAGE_MAX_CHARS:
+                    body = body[:FILE_PAGE_MAX_CHARS] + " …"
+                if first == 1 and not more:
+                    header = f"Contents of {path.name}:"
+                else:
+                    header = f"{path.name}, lines {first}-{shown}"
+                    if pager.complete:
+                        header += f" of {pager.line_count}"
+                    header += ":"
+            self._paging = {'kind': 'file', 'path': str(path), 'first': first, 'last': shown,
+                            'span': last - first + 1}
+            return f"{header}\n{body}" + ("\n(Say 'next page' for more.)" if more else "")
+        except PermissionError:
+            return f"Permission denied: {filepath}"
         except Exception as e:
             return f"Error reading file: {e}"
 
+    def _summarize_file(self, filepath: str) -> str:
+        """Summarize a text file; long files are summarized chunk by chunk in parallel."""
+        if not self.summarizer:
+            return "I need my language model to summarize files."
+        try:
+            path = Path(filepath).expanduser().resolve()
+            if not path.exists():
+                return f"File not found: {filepath}"
+            if not path.is_file():
+                return f"Not a file: {filepath}"
+
+            with FilePager(path) as pager:
+                if pager.binary:
+                    return f"{path.name} looks like a binary file ({format_size(pager.size)}), so I can't summarize it."
+                blocks, size, first = [], 0, 1
+                while size < SUMMARY_MAX_INPUT_CHARS:
+                    lines = pager.lines(first, first + 999)
+                    if not lines:
+                        break
+                    blocks.append("\n".join(lines))
+                    size += len(blocks[-1]) + 1
+                    first += len(lines)
+                partial = pager.has_more(first - 1)
+            if not size or not "".join(blocks).strip():
+                return f"{path.name} is empty."
+
+            task = f"Summarize the file {path.name}: what it is, and its key points."
+            if partial:
+                task += f" Only its first {first - 1} lines are included; say so."
+            return self.summarizer.summarize("\n".join(blocks), task)
+        except PermissionError:
+            return f"Permission denied: {filepath}"
+        except Exception as e:
+            return f"Error summarizing file: {e}"
+
+    def _show_safety_denials(self, limit: int = 10) -> str:
+        """Most recent operations the safety checks refused."""
+        entries = get_audit_log().recent_denials(limit)
+        if not entries:
+            return "Nothing has been blocked recently."
+        return "Recently blocked:\n" + "\n".join(f"  {format_entry(entry)}" for entry in entries)
+
+    def _turn_page(self, step: int) -> str:
+        """Next/previous page of whatever file or directory was shown last."""
+        state = self._paging
+        if not state:
+            return "There's nothing to page through. Ask me to read a file or list a folder first."
+        if state['kind'] == 'dir':
+            return self._list_files(state['path'], max(1, state['page'] + step), state['sort'], state['descending'])
+        first = max(1, state['first'] + step * state['span'])
+        return self._read_file(state['path'], first=first, last=first + state['span'] - 1)
+
     def _create_file(self, filepath: str, content: str) -> str:
         """Create a file with content."""
         is_safe, reason = validate_file_operation('create', filepath)
@@ -919,6 +931,46 @@ class SystemHandler:
         except Exception as e:
             return f"Error deleting file: {e}"
 
+    _LINES_RE = re.compile(r'^(?:read|show)\s+lines?\s+(\d+)\s*(?:-|–|to|through)\s*(\d+)\s+(?:of|in|from)\s+(?:file\s+)?(.+)$', re.I)
+    _PAGE_RE = re.compile(r'^(?:read|show)\s+page\s+(\d+)\s+(?:of|in|from)\s+(?:file\s+)?(.+)$', re.I)
+    _READ_RE = re.compile(r'^read\s+file\s+(.+?)(?:\s+page\s+(\d+))?$', re.I)
+    _SUMMARIZE_RE = re.compile(r'^summari[sz]e\s+(?:the\s+)?file\s+(.+)$', re.I)
+    _LIST_RE = re.compile(r'^(?:list|show)\s+files(?:\s+in\s+(.+?))?(?:\s+page\s+(\d+))?'
+                          r'(?:\s+(?:sorted\s+)?by\s+(name|size|date|modified|time))?'
+                          r'(?:\s+(newest|largest|biggest|descending|reversed?)(?:\s+first)?)?$', re.I)
+
+    def _handle_file_command(self, text: str, lower: str):
+        """Reading/listing/paging commands; None if the input isn't one."""
+        if lower in ('next page', 'show next page'):
+            return self._turn_page(1)
+        if lower in ('previous page', 'prev page', 'go back a page'):
+            return self._turn_page(-1)
+        if lower in ('summarize this file', 'summarise this file', 'summarize it', 'summarise it'):
+            if not self._paging or self._paging['kind'] != 'file':
+                return "Which file should I summarize?"
+            return self._summarize_file(self._paging['path'])
+
+        m = self._LINES_RE.match(text)
+        if m:
+            first, last = sorted((int(m.group(1)), int(m.group(2))))
+            return self._read_file(m.group(3).strip(' "\''), first=first, last=last)
+        m = self._PAGE_RE.match(text)
+        if m:
+            return self._read_file(m.group(2).strip(' "\''), page=max(1, int(m.group(1))))
+        m = self._READ_RE.match(text)
+        if m:
+            return self._read_file(m.group(1).strip(' "\''), page=max(1, int(m.group(2) or 1)))
+        m = self._SUMMARIZE_RE.match(text)
+        if m:
+            return self._summarize_file(m.group(1).strip(' "\''))
+        m = self._LIST_RE.match(text)
+        if m:
+            directory = (m.group(1) or '').strip(' "\'') or os.path.expanduser('~\\Desktop')
+            sort = {'date': 'modified', 'time': 'modified'}.get((m.group(3) or 'name').lower(), (m.group(3) or 'name').lower())
+            descending = bool(m.group(4)) or sort != 'name'   # Size/date: biggest/newest first
+            return self._list_files(directory, max(1, int(m.group(2) or 1)), sort, descending)
+        return None
+
     # ─── Main Handler ────────────────────────────────────
 
     def handle(self, user_input: str, context: str = '') -> str:
@@ -974,7 +1026,18 @@ class SystemHandler:
                     return self._set_volume('mute')
                 return self._set_volume('up')
 
+            # Safety audit
+            if any(w in lower for w in ['safety log', 'blocked actions', 'what did you block', 'recent denials']):
+                return self._show_safety_denials()
+
+            # File operations (before the keyword checks below: file names can contain 'ram', 'process'...)
+            file_reply = self._handle_file_command(user_input.strip(), lower)
+            if file_reply is not None:
+                return file_reply
+
             # Screenshot
+            if any(w in lower for w in ['last screenshot', 'latest screenshot', 'previous screenshot']):
+                return self._show_last_screenshot()
             if 'screenshot' in lower or 'screen capture' in lower:
                 return self._take_screenshot()
 
@@ -990,16 +1053,6 @@ class SystemHandler:
             if 'process' in lower or 'what is eating' in lower or 'top process' in lower:
                 return self._get_top_processes()
 
-            # File operations
-            if 'list files' in lower or 'show files' in lower:
-                parts = lower.replace('list files', '').replace('show files', '').replace('in ', '').strip()
-                directory = parts if parts else os.path.expanduser('~\\Desktop')
-                return self._list_files(directory)
-
-            if 'read file' in lower:
-                filepath = lower.replace('read file', '').strip()
-                return self._read_file(filepath)
-
             # Fallback: ask LLM to interpret the system command
             return self.brain.generate_response(
                 f"The user wants to perform a system action: {user_input}. "
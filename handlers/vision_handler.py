@@ -1,8 +1,7 @@
-import mss
 import pyautogui
-import base64, json, io, requests
-from PIL import Image
-from config import OLLAMA_HOST
+import json, requests
+from config import OLLAMA_HOST, VISION_IMAGE_FORMAT, VISION_IMAGE_SIZE
+from screen_capture import get_capture_engine
 
 VISION_MODEL = 'llava:7b'  # Use llava:7b for low RAM
 
@@ -13,13 +12,8 @@ class VisionHandler:
         pyautogui.PAUSE = 0.4       # Safety pause between actions
 
     def _screenshot_b64(self) -> str:
-        with mss.mss() as sct:
-            shot = sct.grab(sct.monitors[0])
-            img = Image.frombytes('RGB', shot.size, shot.bgra, 'raw', 'BGRX')
-            img.thumbnail((1280, 720))  # Resize for faster processing
-            buf = io.BytesIO()
-            img.save(buf, format='PNG')
-            return base64.b64encode(buf.getvalue()).decode()
+        # Shared capture engine: reused grabber, resize + encode on its worker pool
+        return get_capture_engine().b64(max_size=VISION_IMAGE_SIZE, fmt=VISION_IMAGE_FORMAT)
 
     def _ask_vision(self, b64img: str, question: str) -> dict:
         """Send screenshot to local LLaVA model via Ollama API"""
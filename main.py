@@ -22,9 +22,10 @@ import signal
 import argparse
 from datetime import datetime
 
-from config import ASSISTANT_NAME, HOTKEY
+from config import ASSISTANT_NAME, HOTKEY, ensure_data_dirs
 from brain import Brain
-from memory import Memory
+from profiles import ProfileRegistry
+from backup import BackupManager
 from executor import Executor
 from tts import TextToSpeech
 from intent_filter import IntentFilter
@@ -215,20 +216,28 @@ def main():
     parser.add_argument('--voice', action='store_true', help='Enable voice mode (hotkey-activated)')
     parser.add_argument('--speech-assistant', action='store_true', help='Enable fully hands-free speech-to-speech mode')
     parser.add_argument('--no-proactive', action='store_true', help='Disable proactive engine')
+    parser.add_argument('--profile', default=None, help='User profile whose memory to load')
     args = parser.parse_args()
 
     print_banner()
 
     # ─── Initialize subsystems ───────────────────────────
     print("Initializing subsystems...")
+    ensure_data_dirs()
 
     brain = Brain()
-    memory = Memory()
-    executor = Executor(brain, memory)
+    profiles = ProfileRegistry(args.profile) if args.profile else ProfileRegistry()
+    memory = profiles.active
+    executor = Executor(brain, memory, profiles)
     tts = TextToSpeech()
 
     # Proactive engine
     proactive = ProactiveEngine(memory, tts)
+    profiles.on_switch(lambda m: setattr(proactive, 'memory', m))
+
+    # Scheduled online backups of every profile's memory
+    backups = BackupManager()
+    backups.start()
     if not args.no_proactive:
         proactive.start()
 
@@ -236,6 +245,8 @@ def main():
     def shutdown(sig=None, frame=None):
         print(f"\n[{ASSISTANT_NAME}] Shutting down...")
         proactive.stop()
+        backups.stop()
+        profiles.close_all()
         print(f"[{ASSISTANT_NAME}] Goodbye!")
         sys.exit(0)
 
@@ -255,6 +266,7 @@ def main():
                 speak_text("Goodbye! Have a great day.")
                 break
             # Route through JARVIS pipeline for a real response
+            memory = profiles.active
             context = memory.get_context(text)
             routing = brain.route(text, context)
             print(f"[BRAIN] Intent: {routing['intent'].value} | Model: {routing['model']}")
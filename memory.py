@@ -1,116 +1,185 @@
 """
 JARVIS v1.0 — Memory System
 Long-term persistent memory with:
-  - Short-term context (last N exchanges in RAM)
-  - Fact memory (SQLite — explicit user facts)
-  - Episode memory (ChromaDB — semantic search over conversations)
-  - Pattern memory (SQLite — tracks usage patterns)
-  - LLM-powered fact extraction
+  - Short-term context (ring buffer of recent turns + rolling summary)
+  - Fact memory (explicit user facts)
+  - Episode memory (semantic search over conversations)
+  - Pattern memory (time-decayed weekly histograms — tracks usage patterns)
+  - LLM-powered fact extraction (debounced, batched, resumable)
+Storage is delegated to a MemoryBackend (see memory_backends.py).
 """
 
-import sqlite3
 import json
 import requests
 import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
+import numpy as np
 from config import (
-    DB_PATH,
-    CHROMA_DIR,
+    DEFAULT_PROFILE,
+    PROFILE_MAX_CONVERSATIONS,
+    PROFILE_MAX_FACTS,
+    PROFILE_MAX_EPISODES,
     OLLAMA_HOST,
     FAST_MODEL,
     EMBED_MODEL,
     MAX_SHORT_TERM,
     MAX_SEMANTIC_RESULTS,
+    SHORT_TERM_TOKEN_BUDGET,
+    SHORT_TERM_ENTRY_TOKENS,
+    SUMMARY_TOKEN_BUDGET,
+    MAX_CONTEXT_FACTS,
+    PINNED_FACT_KEYS,
+    FACT_EMBED_BATCH,
+    FACT_EXTRACTION_DEBOUNCE,
+    FACT_EXTRACTION_BATCH,
+    PATTERN_HALF_LIFE_DAYS,
     PRIVACY_MODE,
     DATA_DIR,
 )
+from memory_backends import (  # Profile helpers are re-exported for existing callers
+    MemoryBackend,
+    create_backend,
+    known_profiles,
+    normalize_profile_id,
+    profile_paths,
+)
+from patterns import PatternModel
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) — good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+
+def _clip_to_tokens(text: str, max_tokens: int) -> str:
+    """Trim text to roughly max_tokens, marking the cut."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " …"
+
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by do for from how i in is it me my of on or "
+    "that the this to was what when where who why with you your".split()
+)
+
+
+# Utterances containing one of these are sent to the fact extractor
+_FACT_INDICATORS = (
+    'my name', 'i am', "i'm", 'i like', 'i hate', 'i prefer',
+    'i work', 'i live', 'i study', 'remember that', 'my favorite',
+    'my wife', 'my husband', 'my dog', 'my cat', 'my car',
+    'i was born', 'my birthday', 'my age', 'my email', 'my phone',
+    'i use', 'i need', 'call me',
+)
+
+
+def _is_fact_candidate(text: str) -> bool:
+    lower = text.lower()
+    return any(indicator in lower for indicator in _FACT_INDICATORS)
+
+
+def _is_pinned_key(key: str) -> bool:
+    """'name', 'user_name', 'home city' are core facts; 'pet_name' and 'ethnicity' aren't."""
+    key = re.sub(r'[\W_]+', '_', key.lower()).strip('_')
+    return re.sub(r'^(?:user|my|full|home|current)_', '', key) in PINNED_FACT_KEYS
+
+
+def _keywords(text: str) -> set:
+    """Lowercased content words, used for keyword-overlap scoring."""
+    return {w for w in re.findall(r"[a-z0-9']+", text.lower()) if w not in _STOPWORDS and len(w) > 1}
+
 
 class Memory:
-    """Unified memory system combining structured and semantic storage."""
+    """Unified memory system combining structured and semantic storage for one profile."""
 
-    def __init__(self):
-        self.db_path = str(DB_PATH)
+    def __init__(self, profile_id: str = DEFAULT_PROFILE, backend: Optional[MemoryBackend] = None,
+                 embed_fn: Optional[Callable[[str], Optional[List[float]]]] = None):
+        self.profile_id = normalize_profile_id(profile_id)
+        self.store = backend or create_backend(self.profile_id)
+        self._embed_fn = embed_fn    # Replaces the Ollama embedding call (benchmarks, tests)
         self.privacy_mode = PRIVACY_MODE
-        self.short_term: List[dict] = []
         self.max_short_term = MAX_SHORT_TERM
-
-        # Initialize SQLite
-        self._init_db()
-
-        # Initialize ChromaDB
-        try:
-            import chromadb
-            self.chroma = chromadb.PersistentClient(path=CHROMA_DIR)
-            self.episodes = self.chroma.get_or_create_collection(
-                name='episodes',
-                metadata={'hnsw:space': 'cosine'}
-            )
-            self.chroma_available = True
-            print(f"[MEMORY] ChromaDB loaded. Episodes: {self.episodes.count()}")
-        except Exception as e:
-            self.chroma_available = False
-            print(f"[MEMORY] ChromaDB not available: {e}")
-
-        print(f"[MEMORY] SQLite loaded. Facts: {self._count_facts()}, Conversations: {self._count_conversations()}")
-
-    def _init_db(self):
-        """Initialize SQLite tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.executescript('''
-                CREATE TABLE IF NOT EXISTS facts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    category TEXT NOT NULL,
-                    key TEXT NOT NULL,
-                    value TEXT NOT NULL,
-                    confidence REAL DEFAULT 1.0,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(category, key)
-                );
-
-                CREATE TABLE IF NOT EXISTS conversations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    session_id TEXT NOT NULL,
-                    user_input TEXT NOT NULL,
-                    response TEXT NOT NULL,
-                    intent TEXT,
-                    model_used TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                );
-
-                CREATE TABLE IF NOT EXISTS patterns (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_type TEXT NOT NULL,
-                    hour_of_day INTEGER,
-                    day_of_week INTEGER,
-                    count INTEGER DEFAULT 1,
-                    last_used DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(task_type, hour_of_day, day_of_week)
-                );
-
-                CREATE TABLE IF NOT EXISTS reminders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    message TEXT NOT NULL,
-                    trigger_time DATETIME,
-                    is_done INTEGER DEFAULT 0,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                );
-            ''')
-            conn.commit()
+        self.short_term: deque = deque(maxlen=self.max_short_term * 2)  # user + assistant pairs
+
+        # Rolling summary of turns that fell out of the short-term window
+        self.rolling_summary = ""
+        self._evicted: List[dict] = []
+        self._summary_lock = threading.Lock()
+        self._summary_thread: Optional[threading.Thread] = None
+        self._summary_running = False  # Set and cleared under _summary_lock
+        self._summary_generation = 0  # Bumped on wipe so in-flight summaries are dropped
+
+        # Embedding caches: recent query vectors and a matrix of fact vectors
+        self._embed_cache: OrderedDict = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
+        self._fact_index = None      # (facts, keyword sets, matrix, has_vector mask, pinned rows)
+        self._fact_index_lock = threading.Lock()
+        self._backfill_running = threading.Lock()
+
+        # Debounced background fact extraction
+        self._extract_lock = threading.Lock()
+        self._extract_running = threading.Lock()
+        self._extract_timer: Optional[threading.Timer] = None
+        self._extract_pending = 0
+
+        self.pattern_model = PatternModel(self.store, PATTERN_HALF_LIFE_DAYS)
+        self._writes_since_prune = 0
+
+        print(f"[MEMORY] Profile '{self.profile_id}' loaded ({self.store.name}). "
+              f"Facts: {self._count_facts()}, Conversations: {self._count_conversations()}")
+
+        # Resume extraction for utterances logged after the last watermark. A
+        # store without one predates batched extraction and its history was
+        # already extracted, so start from its newest conversation
+        if not self.store.get_state('fact_watermark'):
+            self.store.set_state('fact_watermark', str(self.store.last_conversation_id()))
+        self._schedule_fact_extraction()
+
+    @property
+    def chroma_available(self) -> bool:
+        return self.store.episodes_available
+
+    def close(self):
+        """Release open handles (vector store, pending timers). Safe to reopen later."""
+        with self._extract_lock:
+            if self._extract_timer:
+                self._extract_timer.cancel()
+                self._extract_timer = None
+        self.store.close()
+        self._invalidate_fact_index()
+        print(f"[MEMORY] Profile '{self.profile_id}' closed.")
 
     def _count_facts(self) -> int:
-        with sqlite3.connect(self.db_path) as conn:
-            count = conn.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
-        return count
+        return self.store.count_facts()
 
     def _count_conversations(self) -> int:
-        with sqlite3.connect(self.db_path) as conn:
-            count = conn.execute('SELECT COUNT(*) FROM conversations').fetchone()[0]
-        return count
+        return self.store.count_conversations()
 
     def _embed(self, text: str) -> Optional[List[float]]:
-        """Get embedding vector from Ollama."""
+        """Get embedding vector from Ollama (recent queries are memoized)."""
+        with self._embed_cache_lock:
+            cached = self._embed_cache.get(text)
+            if cached is not None:
+                self._embed_cache.move_to_end(text)
+                return cached
+        embedding = self._embed_uncached(text)
+        if embedding:
+            with self._embed_cache_lock:
+                self._embed_cache[text] = embedding
+                if len(self._embed_cache) > 256:
+                    self._embed_cache.popitem(last=False)
+        return embedding
+
+    def _embed_uncached(self, text: str) -> Optional[List[float]]:
+        if self._embed_fn:
+            return self._embed_fn(text)
         try:
             resp = requests.post(
                 f'{OLLAMA_HOST}/api/embeddings',
@@ -123,66 +192,274 @@ class Memory:
             print(f"[MEMORY] Embedding error: {e}")
         return None
 
+    def embed(self, text: str) -> Optional[List[float]]:
+        """Embedding for a query string (shared with other subsystems, e.g. notes search)."""
+        return self._embed(text)
+
+    def embed_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed many texts in one request, falling back to one request per text."""
+        if not texts:
+            return []
+        if not self._embed_fn:
+            try:
+                resp = requests.post(
+                    f'{OLLAMA_HOST}/api/embed',
+                    json={'model': EMBED_MODEL, 'input': texts},
+                    timeout=60,
+                )
+                if resp.status_code == 200:
+                    embeddings = resp.json().get('embeddings') or []
+                    if len(embeddings) == len(texts):
+                        return embeddings
+            except Exception as e:
+                print(f"[MEMORY] Batch embedding error: {e}")
+                return [None] * len(texts)  # Service unreachable — don't retry one by one
+        # Older Ollama without /api/embed, or a custom embedding function
+        return [self._embed_uncached(text) for text in texts]
+
     # ─── Short-Term Memory ───────────────────────────────
 
     def add_to_short_term(self, role: str, content: str):
-        """Add an exchange to short-term memory."""
-        self.short_term.append({'role': role, 'content': content})
-        max_entries = self.max_short_term * 2  # user + assistant pairs
-        if len(self.short_term) > max_entries:
-            self.short_term = self.short_term[-max_entries:]
+        """Add an exchange to short-term memory, summarizing whatever falls out."""
+        with self._summary_lock:
+            if len(self.short_term) == self.short_term.maxlen:
+                self._evicted.append(self.short_term[0])
+            self.short_term.append({'role': role, 'content': content})
+            needs_summary = bool(self._evicted)
+        if needs_summary:
+            self._schedule_summary()
+
+    def _schedule_summary(self):
+        """Fold evicted turns into the rolling summary on a background thread."""
+        with self._summary_lock:
+            if self._summary_running:
+                return  # The running worker drains new evictions before it exits
+            self._summary_running = True
+        self._summary_thread = threading.Thread(target=self._summary_worker, daemon=True)
+        self._summary_thread.start()
+
+    def _summary_worker(self):
+        """Drain evicted turns in batches until none are left."""
+        try:
+            while True:
+                with self._summary_lock:
+                    batch, self._evicted = self._evicted, []
+                    previous = self.rolling_summary
+                    generation = self._summary_generation
+                    if not batch:
+                        # Checked and cleared under the lock, so an eviction
+                        # either lands in this batch or starts a new worker
+                        self._summary_running = False
+                        return
+                updated = self._summarize_turns(previous, batch)
+                with self._summary_lock:
+                    # A wipe while we were summarizing discards the result
+                    if generation == self._summary_generation:
+                        self.rolling_summary = updated
+        except Exception as e:
+            print(f"[MEMORY] Summary error: {e}")
+            with self._summary_lock:
+                self._summary_running = False
+
+    def _summarize_turns(self, previous: str, turns: List[dict]) -> str:
+        """Ask the fast model to merge old turns into the running summary."""
+        lines = []
+        for entry in turns:
+            role = "User" if entry['role'] == 'user' else "JARVIS"
+            lines.append(f"{role}: {_clip_to_tokens(entry['content'], SHORT_TERM_ENTRY_TOKENS)}")
+
+        prompt = f"""Update the running summary of this conversation with the new turns.
+Keep names, decisions, open questions and anything the user may refer back to.
+Drop code, long answers and small talk. Reply with the summary only, at most {SUMMARY_TOKEN_BUDGET * 3 // 4} words.
+
+Current summary: {previous or "(empty)"}
+
+New turns:
+{chr(10).join(lines)}"""
+
+        try:
+            resp = requests.post(
+                f'{OLLAMA_HOST}/api/generate',
+                json={
+                    'model': FAST_MODEL,
+                    'prompt': prompt,
+                    'stream': False,
+                    'options': {'num_predict': SUMMARY_TOKEN_BUDGET},
+                },
+                timeout=30,
+            )
+            summary = resp.json().get('response', '').strip()
+            if summary:
+                return _clip_to_tokens(summary, SUMMARY_TOKEN_BUDGET)
+        except Exception as e:
+            print(f"[MEMORY] Summary error: {e}")
+
+        # Model unavailable — keep the old summary rather than losing it
+        return previous
 
     def get_short_term_context(self) -> str:
-        """Format short-term memory for prompt injection."""
-        if not self.short_term:
+        """Format short-term memory for prompt injection, within the token budget."""
+        with self._summary_lock:
+            entries = list(self.short_term)
+            summary = self.rolling_summary
+        if not entries and not summary:
             return ""
+
+        # Walk backwards so the newest turns win when the budget runs out
+        budget = SHORT_TERM_TOKEN_BUDGET
         lines = []
-        for entry in self.short_term[-10:]:  # Last 5 exchanges
+        for entry in reversed(entries):
             role = "User" if entry['role'] == 'user' else "JARVIS"
-            lines.append(f"{role}: {entry['content']}")
-        return "Recent conversation:\n" + "\n".join(lines)
+            line = f"{role}: {_clip_to_tokens(entry['content'], SHORT_TERM_ENTRY_TOKENS)}"
+            cost = _estimate_tokens(line)
+            if cost > budget:
+                break
+            lines.append(line)
+            budget -= cost
+        lines.reverse()
+
+        parts = []
+        if summary:
+            parts.append(f"Earlier in this conversation: {summary}")
+        if lines:
+            parts.append("Recent conversation:\n" + "\n".join(lines))
+        return "\n".join(parts)
 
-    # ─── Fact Memory (SQLite) ────────────────────────────
+    # ─── Fact Memory ─────────────────────────────────────
 
     def add_fact(self, category: str, key: str, value: str, confidence: float = 1.0):
         """Store or update a user fact."""
         if self.privacy_mode:
             return
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO facts (category, key, value, confidence, updated_at)
-                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                ON CONFLICT(category, key) DO UPDATE SET
-                    value = excluded.value,
-                    confidence = excluded.confidence,
-                    updated_at = CURRENT_TIMESTAMP
-            ''', (category, key, value, confidence))
-            conn.commit()
+        self.store.upsert_facts([(category, key, value, confidence)])
+        self._invalidate_fact_index()
         print(f"[MEMORY] Fact stored: [{category}] {key} = {value}")
 
     def get_facts(self, category: str = None) -> List[Tuple]:
-        """Retrieve stored facts."""
-        with sqlite3.connect(self.db_path) as conn:
-            if category:
-                rows = conn.execute(
-                    'SELECT category, key, value FROM facts WHERE category = ? ORDER BY updated_at DESC',
-                    (category,)
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    'SELECT category, key, value FROM facts ORDER BY updated_at DESC'
-                ).fetchall()
-        return rows
+        """Retrieve stored facts, most recently updated first."""
+        return self.store.get_facts(category)
 
     def delete_fact(self, key: str) -> bool:
         """Delete a specific fact."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('DELETE FROM facts WHERE key LIKE ?', (f'%{key}%',))
-            conn.commit()
-            deleted = cursor.rowcount > 0
+        deleted = self.store.delete_facts(key) > 0
+        self._invalidate_fact_index()
         return deleted
 
-    # ─── Episode Memory (ChromaDB) ──────────────────────
+    # ─── Fact Relevance Ranking ──────────────────────────
+
+    @staticmethod
+    def _fact_text(key: str, value: str) -> str:
+        return f"{key.replace('_', ' ')}: {value}"
+
+    def _invalidate_fact_index(self):
+        with self._fact_index_lock:
+            self._fact_index = None
+
+    def _load_fact_index(self):
+        """Load facts and their cached vectors into one normalized matrix."""
+        with self._fact_index_lock:
+            if self._fact_index is not None:
+                return self._fact_index
+
+        facts = self.store.get_facts()
+        stored = self.store.get_fact_vectors()
+
+        keywords = [_keywords(self._fact_text(key, value)) for _, key, value in facts]
+        vectors = []
+        for cat, key, value in facts:
+            text_hash = hashlib.sha1(self._fact_text(key, value).encode()).hexdigest()
+            hit = stored.get((cat, key))
+            vectors.append(np.frombuffer(hit[1], dtype=np.float32) if hit and hit[0] == text_hash else None)
+
+        dim = next((len(v) for v in vectors if v is not None), 0)
+        matrix = np.zeros((len(facts), dim), dtype=np.float32)
+        has_vector = np.zeros(len(facts), dtype=bool)
+        for i, vec in enumerate(vectors):
+            if vec is not None and len(vec) == dim:
+                matrix[i] = vec
+                has_vector[i] = True
+
+        pinned = [i for i, (_, key, _) in enumerate(facts) if _is_pinned_key(key)]
+        index = (facts, keywords, matrix, has_vector, pinned)
+        with self._fact_index_lock:
+            self._fact_index = index
+        return index
+
+    def _backfill_fact_vectors(self, facts: List[Tuple], has_vector) -> bool:
+        """Embed a batch of facts that have no cached vector yet. Returns True if any were added."""
+        missing = [facts[i] for i in np.flatnonzero(~has_vector)[:FACT_EMBED_BATCH]]
+        texts = [self._fact_text(key, value) for _, key, value in missing]
+        rows = []
+        for (cat, key, _), text, embedding in zip(missing, texts, self.embed_batch(texts)):
+            if not embedding:
+                break  # Embedding service is down — don't hammer it
+            vec = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            if norm:
+                vec /= norm
+            rows.append((cat, key, hashlib.sha1(text.encode()).hexdigest(), vec.tobytes()))
+        if not rows:
+            return False
+        self.store.put_fact_vectors(rows)
+        self._invalidate_fact_index()
+        return True
+
+    def _backfill_all_fact_vectors(self):
+        """Embed every fact missing a vector, batch by batch, until done or embedding fails."""
+        if not self._backfill_running.acquire(blocking=False):
+            return  # Another thread is already on it
+        try:
+            while True:
+                facts, _, _, has_vector, _ = self._load_fact_index()
+                if has_vector.all() or not self._backfill_fact_vectors(facts, has_vector):
+                    return
+        finally:
+            self._backfill_running.release()
+
+    def _schedule_fact_backfill(self):
+        """Backfill missing fact vectors off the request path."""
+        if not self._backfill_running.locked():
+            threading.Thread(target=self._backfill_all_fact_vectors, daemon=True).start()
+
+    def get_relevant_facts(self, query: str, limit: int = None) -> List[Tuple]:
+        """
+        Facts most relevant to the query: pinned core facts first, then the
+        rest ranked by embedding similarity plus keyword overlap.
+        """
+        limit = limit or MAX_CONTEXT_FACTS
+        facts, keywords, matrix, has_vector, pinned = self._load_fact_index()
+        if not facts:
+            return []
+
+        if not has_vector.all():
+            self._schedule_fact_backfill()  # Until then, those facts rank on keywords alone
+        pinned = pinned[:limit]
+
+        # Keyword overlap (fraction of query words found in the fact)
+        query_words = _keywords(query)
+        scores = np.zeros(len(facts), dtype=np.float32)
+        if query_words:
+            scores += 0.3 * np.array(
+                [len(query_words & kw) / len(query_words) for kw in keywords], dtype=np.float32
+            )
+
+        # Embedding similarity against the cached, pre-normalized fact vectors
+        if has_vector.any():
+            query_vec = self._embed(query)
+            if query_vec and len(query_vec) == matrix.shape[1]:
+                q = np.asarray(query_vec, dtype=np.float32)
+                norm = np.linalg.norm(q)
+                if norm:
+                    scores += 0.7 * np.where(has_vector, matrix @ (q / norm), 0.0)
+
+        # Facts arrive newest first; a tiny decay keeps recency as the tie-breaker
+        scores -= np.arange(len(facts), dtype=np.float32) * 1e-6
+        scores[pinned] = -np.inf
+        remaining = limit - len(pinned)
+        ranked = list(np.argsort(-scores)[:remaining]) if remaining > 0 else []
+        return [facts[i] for i in pinned + [i for i in ranked if scores[i] > 0]]
+
+    # ─── Episode Memory ─────────────────────────────────
 
     def add_episode(self, session_id: str, user_input: str, response: str, intent: str):
         """Store a conversation episode as a vector embedding."""
@@ -195,64 +472,52 @@ class Memory:
             return
 
         ts = datetime.now().isoformat()
-        try:
-            self.episodes.add(
-                documents=[doc],
-                embeddings=[embedding],
-                metadatas=[{
-                    'intent': intent,
-                    'timestamp': ts,
-                    'session_id': session_id,
-                }],
-                ids=[f'{session_id}_{ts}'],
-            )
-        except Exception as e:
-            print(f"[MEMORY] ChromaDB add error: {e}")
+        self.store.add_episode(
+            f'{session_id}_{ts}',
+            doc,
+            embedding,
+            {'intent': intent, 'timestamp': ts, 'session_id': session_id},
+        )
 
     def search_episodes(self, query: str, n_results: int = None) -> List[str]:
         """Semantic search over past conversations."""
-        if not self.chroma_available or self.episodes.count() == 0:
+        if not self.chroma_available or self.store.count_episodes() == 0:
             return []
 
-        n = min(n_results or MAX_SEMANTIC_RESULTS, self.episodes.count())
         embedding = self._embed(query)
         if not embedding:
             return []
+        return self.store.query_episodes(embedding, n_results or MAX_SEMANTIC_RESULTS)
 
-        try:
-            results = self.episodes.query(
-                query_embeddings=[embedding],
-                n_results=n,
-            )
-            if results and results['documents']:
-                return results['documents'][0]
-        except Exception as e:
-            print(f"[MEMORY] ChromaDB search error: {e}")
-        return []
-
-    # ─── Conversation Log (SQLite) ──────────────────────
+    # ─── Conversation Log ───────────────────────────────
 
     def log_conversation(self, session_id: str, user_input: str,
                          response: str, intent: str, model_used: str = ''):
-        """Log a conversation exchange to SQLite."""
+        """Log a conversation exchange."""
         if self.privacy_mode:
             return
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                '''INSERT INTO conversations (session_id, user_input, response, intent, model_used)
-                   VALUES (?, ?, ?, ?, ?)''',
-                (session_id, user_input, response, intent, model_used)
-            )
-            conn.commit()
+        self.store.log_conversation(session_id, user_input, response, intent, model_used)
+
+        # Size limits are checked every so often, not on every write
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= 100:
+            self._writes_since_prune = 0
+            self.enforce_limits()
+
+    def enforce_limits(self):
+        """Prune the oldest entries beyond this profile's size limits."""
+        convos, facts = self.store.enforce_limits(PROFILE_MAX_CONVERSATIONS, PROFILE_MAX_FACTS)
+        if facts:
+            self._invalidate_fact_index()
+        episodes = self.store.prune_episodes(PROFILE_MAX_EPISODES)
+
+        if convos or facts or episodes:
+            print(f"[MEMORY] Profile '{self.profile_id}' over limits — pruned "
+                  f"{convos} conversations, {facts} facts, {episodes} episodes.")
 
     def get_recent_conversations(self, limit: int = 10) -> List[Tuple]:
         """Get recent conversation entries."""
-        with sqlite3.connect(self.db_path) as conn:
-            rows = conn.execute(
-                'SELECT user_input, response, intent, timestamp FROM conversations ORDER BY timestamp DESC LIMIT ?',
-                (limit,)
-            ).fetchall()
-        return rows
+        return self.store.recent_conversations(limit)
 
     # ─── Pattern Memory ─────────────────────────────────
 
@@ -261,31 +526,35 @@ class Memory:
         if self.privacy_mode:
             return
         now = datetime.now()
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO patterns (task_type, hour_of_day, day_of_week, count, last_used)
-                VALUES (?, ?, ?, 1, CURRENT_TIMESTAMP)
-                ON CONFLICT(task_type, hour_of_day, day_of_week) DO UPDATE SET
-                    count = count + 1,
-                    last_used = CURRENT_TIMESTAMP
-            ''', (task_type, now.hour, now.weekday()))
-            conn.commit()
+        # Raw lifetime counts (used by export) ...
+        self.store.record_pattern(task_type, now.hour, now.weekday())
+        # ... and the decayed model used for predictions
+        self.pattern_model.record(task_type, now)
 
     def get_patterns(self, hour: int = None) -> List[Tuple]:
-        """Get task patterns, optionally filtered by hour."""
-        with sqlite3.connect(self.db_path) as conn:
-            if hour is not None:
-                rows = conn.execute(
-                    '''SELECT task_type, count FROM patterns
-                       WHERE hour_of_day BETWEEN ? AND ?
-                       ORDER BY count DESC LIMIT 5''',
-                    (hour - 1, hour + 1)
-                ).fetchall()
-            else:
-                rows = conn.execute(
-                    'SELECT task_type, SUM(count) as total FROM patterns GROUP BY task_type ORDER BY total DESC LIMIT 10'
-                ).fetchall()
-        return rows
+        """Get task patterns, optionally for an hour of today. Recent habits weigh more."""
+        if hour is not None:
+            when = datetime.now().replace(hour=hour, minute=0, second=0, microsecond=0)
+            return self.pattern_model.top_k(when, k=5)
+        return self.pattern_model.totals(k=10)
+
+    def get_likely_tasks(self, when: datetime = None, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k tasks the user is likely to do around the given time (default: now)."""
+        return self.pattern_model.top_k(when, k=k)
+
+    # ─── Reminders ──────────────────────────────────────
+
+    def add_reminder(self, message: str, trigger_time: datetime) -> int:
+        """Store a reminder. Returns its id."""
+        return self.store.add_reminder(message, trigger_time.strftime('%Y-%m-%d %H:%M:%S'))
+
+    def get_due_reminders(self, now: datetime = None) -> List[Tuple[int, str, str]]:
+        """Open reminders that are due, as (id, message, trigger_time)."""
+        now = now or datetime.now()
+        return self.store.due_reminders(now.strftime('%Y-%m-%d %H:%M:%S'))
+
+    def complete_reminder(self, reminder_id: int):
+        self.store.complete_reminder(reminder_id)
 
     # ─── Full Context Builder ────────────────────────────
 
@@ -296,10 +565,10 @@ class Memory:
         """
         parts = []
 
-        # 1. User facts (always include — this is the user profile)
-        facts = self.get_facts()
+        # 1. User facts (pinned profile facts + those relevant to this query)
+        facts = self.get_relevant_facts(query)
         if facts:
-            fact_lines = [f"  • {key}: {value}" for _, key, value in facts[:15]]
+            fact_lines = [f"  • {key}: {value}" for _, key, value in facts]
             parts.append("Known facts about user:\n" + "\n".join(fact_lines))
 
         # 2. Short-term context
@@ -321,54 +590,114 @@ class Memory:
 
     def extract_facts_with_llm(self, user_input: str) -> List[Tuple[str, str, str]]:
         """
-        Use the LLM to extract personal facts from user speech.
+        Use the LLM to extract personal facts from a single statement.
         Returns list of (category, key, value) tuples.
         """
-        # Quick keyword check first — skip LLM for obvious non-facts
-        fact_indicators = [
-            'my name', 'i am', "i'm", 'i like', 'i hate', 'i prefer',
-            'i work', 'i live', 'i study', 'remember that', 'my favorite',
-            'my wife', 'my husband', 'my dog', 'my cat', 'my car',
-            'i was born', 'my birthday', 'my age', 'my email', 'my phone',
-            'i use', 'i need', 'call me',
-        ]
-        lower = user_input.lower()
-        if not any(indicator in lower for indicator in fact_indicators):
+        if not _is_fact_candidate(user_input):
             return []
+        extracted = self._extract_facts_batch([user_input])
+        return extracted or []
 
-        prompt = f"""Extract personal facts from this statement. 
-If there are no personal facts, reply with "NONE".
+    def _extract_facts_batch(self, statements: List[str]) -> Optional[List[Tuple[str, str, str]]]:
+        """
+        Extract facts from many statements in one fast-model call.
+        Returns None if the model could not be reached (so the caller can retry).
+        """
+        numbered = "\n".join(f'{i}. "{text}"' for i, text in enumerate(statements, 1))
+        prompt = f"""Extract personal facts about the user from these numbered statements.
+Ignore statements that contain no personal facts.
 
-Statement: "{user_input}"
+Statements:
+{numbered}
 
-Reply as JSON array: [{{"category": "personal|preference|work|location", "key": "short_key", "value": "the fact"}}]
-Or reply: NONE"""
+Reply ONLY as a JSON array, one object per fact:
+[{{"statement": 1, "category": "personal|preference|work|location", "key": "short_key", "value": "the fact"}}]
+Reply [] if there are no facts."""
 
         try:
             resp = requests.post(
                 f'{OLLAMA_HOST}/api/generate',
                 json={'model': FAST_MODEL, 'prompt': prompt, 'stream': False},
-                timeout=15,
+                timeout=60,
             )
             result = resp.json().get('response', '').strip()
-
-            if 'NONE' in result.upper():
-                return []
-
-            start = result.find('[')
-            end = result.rfind(']') + 1
-            if start >= 0 and end > start:
-                facts = json.loads(result[start:end])
-                extracted = []
-                for f in facts:
-                    if isinstance(f, dict) and 'key' in f and 'value' in f:
-                        cat = f.get('category', 'personal')
-                        extracted.append((cat, f['key'], f['value']))
-                return extracted
         except Exception as e:
             print(f"[MEMORY] Fact extraction error: {e}")
+            return None
 
-        return []
+        extracted = []
+        start = result.find('[')
+        end = result.rfind(']') + 1
+        if start >= 0 and end > start:
+            try:
+                facts = json.loads(result[start:end])
+            except json.JSONDecodeError:
+                facts = []
+            for f in facts:
+                if isinstance(f, dict) and f.get('key') and f.get('value'):
+                    cat = f.get('category') or 'personal'
+                    extracted.append((str(cat), str(f['key']), str(f['value'])))
+        return extracted
+
+    def _schedule_fact_extraction(self, new_items: int = 0):
+        """(Re)start the debounce timer; a full batch runs right away."""
+        with self._extract_lock:
+            self._extract_pending += new_items
+            if self._extract_timer:
+                self._extract_timer.cancel()
+            delay = 0 if self._extract_pending >= FACT_EXTRACTION_BATCH else FACT_EXTRACTION_DEBOUNCE
+            self._extract_timer = threading.Timer(delay, self._run_fact_extraction)
+            self._extract_timer.daemon = True
+            self._extract_timer.start()
+
+    def _run_fact_extraction(self):
+        """
+        Process logged utterances past the extraction watermark in batches.
+        Facts and the new watermark are committed in one transaction, so a
+        crash or restart resumes exactly where the last batch left off.
+        """
+        with self._extract_lock:
+            self._extract_pending = 0
+            self._extract_timer = None
+
+        # A run already in progress keeps draining until it reaches the end
+        if not self._extract_running.acquire(blocking=False):
+            return
+        try:
+            self._drain_fact_extraction()
+        finally:
+            self._extract_running.release()
+        self._backfill_all_fact_vectors()  # Vectors for the new facts, before they're queried
+
+    def _drain_fact_extraction(self):
+        while True:
+            watermark = int(self.store.get_state('fact_watermark', '0'))
+            rows = self.store.conversations_after(watermark, FACT_EXTRACTION_BATCH * 5)
+            if not rows:
+                return
+
+            # Collect up to one batch of candidates; the watermark advances
+            # only past the rows actually examined
+            candidates = []
+            batch_end = watermark
+            for row_id, text in rows:
+                batch_end = row_id
+                if _is_fact_candidate(text):
+                    candidates.append(text)
+                    if len(candidates) >= FACT_EXTRACTION_BATCH:
+                        break
+
+            facts = []
+            if candidates:
+                facts = self._extract_facts_batch(candidates)
+                if facts is None:
+                    return  # Model unreachable — retry on the next scheduled run
+
+            rows = [(cat, key, value, 1.0) for cat, key, value in facts] if not self.privacy_mode else []
+            self.store.upsert_facts(rows, state={'fact_watermark': str(batch_end)})
+            if facts:
+                self._invalidate_fact_index()
+                print(f"[MEMORY] Extracted {len(facts)} facts from {len(candidates)} statements.")
 
     # ─── Full Exchange Processing ────────────────────────
 
@@ -382,19 +711,17 @@ Or reply: NONE"""
         if self.privacy_mode:
             return
 
-        # SQLite conversation log
+        # Conversation log
         self.log_conversation(session_id, user_input, response, intent, model_used)
 
-        # ChromaDB episode
+        # Vector episode
         self.add_episode(session_id, user_input, response, intent)
 
         # Pattern tracking
         self.record_pattern(intent)
 
-        # LLM fact extraction
-        facts = self.extract_facts_with_llm(user_input)
-        for category, key, value in facts:
-            self.add_fact(category, key, value)
+        # LLM fact extraction (debounced background batch)
+        self._schedule_fact_extraction(new_items=int(_is_fact_candidate(user_input)))
 
     # ─── Privacy & Management ────────────────────────────
 
@@ -406,29 +733,24 @@ Or reply: NONE"""
 
     def export_memories(self, filepath: str) -> str:
         """Export all memories to a JSON file."""
-        with sqlite3.connect(self.db_path) as conn:
-            data = {
-                'exported_at': datetime.now().isoformat(),
-                'facts': [
-                    {'category': r[0], 'key': r[1], 'value': r[2]}
-                    for r in conn.execute('SELECT category, key, value FROM facts').fetchall()
-                ],
-                'conversations': [
-                    {
-                        'session_id': r[0], 'user_input': r[1],
-                        'response': r[2], 'intent': r[3], 'timestamp': r[4]
-                    }
-                    for r in conn.execute(
-                        'SELECT session_id, user_input, response, intent, timestamp FROM conversations'
-                    ).fetchall()
-                ],
-                'patterns': [
-                    {'task_type': r[0], 'count': r[1]}
-                    for r in conn.execute(
-                        'SELECT task_type, SUM(count) FROM patterns GROUP BY task_type'
-                    ).fetchall()
-                ],
-            }
+        data = {
+            'exported_at': datetime.now().isoformat(),
+            'facts': [
+                {'category': r[0], 'key': r[1], 'value': r[2]}
+                for r in self.store.get_facts()
+            ],
+            'conversations': [
+                {
+                    'session_id': r[0], 'user_input': r[1],
+                    'response': r[2], 'intent': r[3], 'timestamp': r[4]
+                }
+                for r in self.store.all_conversations()
+            ],
+            'patterns': [
+                {'task_type': r[0], 'count': r[1]}
+                for r in self.store.pattern_totals()
+            ],
+        }
 
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, indent=2, ensure_ascii=False)
@@ -440,58 +762,24 @@ Or reply: NONE"""
         if not confirm:
             return "Memory wipe requires confirmation. Say 'wipe memory confirm' to proceed."
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('DELETE FROM facts')
-            conn.execute('DELETE FROM conversations')
-            conn.execute('DELETE FROM patterns')
-            conn.execute('DELETE FROM reminders')
-            conn.commit()
+        self.store.wipe()
+        self.pattern_model.clear()
 
-        # Clear ChromaDB
-        if self.chroma_available:
-            try:
-                import chromadb
-                self.chroma.delete_collection('episodes')
-                self.episodes = self.chroma.get_or_create_collection('episodes')
-            except Exception:
-                pass
-
-        self.short_term.clear()
+        with self._summary_lock:
+            self.short_term.clear()
+            self._evicted.clear()
+            self.rolling_summary = ""
+            self._summary_generation += 1
+        self._invalidate_fact_index()
         return "All memories have been wiped. Starting fresh."
 
     def forget_about(self, topic: str) -> str:
         """Selectively forget facts and conversations about a topic."""
-        with sqlite3.connect(self.db_path) as conn:
-            facts_deleted = conn.execute(
-                'DELETE FROM facts WHERE key LIKE ? OR value LIKE ?',
-                (f'%{topic}%', f'%{topic}%')
-            ).rowcount
-            convos_deleted = conn.execute(
-                'DELETE FROM conversations WHERE user_input LIKE ? OR response LIKE ?',
-                (f'%{topic}%', f'%{topic}%')
-            ).rowcount
-            conn.commit()
+        facts_deleted, convos_deleted = self.store.forget(topic)
+        self._invalidate_fact_index()
 
         return f"Forgot {facts_deleted} facts and {convos_deleted} conversations about '{topic}'."
 
     def get_conversation_analytics(self) -> dict:
         """Analyze conversation history for insights."""
-        with sqlite3.connect(self.db_path) as conn:
-            total = conn.execute('SELECT COUNT(*) FROM conversations').fetchone()[0]
-            by_intent = conn.execute(
-                'SELECT intent, COUNT(*) as cnt FROM conversations GROUP BY intent ORDER BY cnt DESC'
-            ).fetchall()
-            by_hour = conn.execute(
-                '''SELECT CAST(strftime('%H', timestamp) AS INT) as hour, COUNT(*) as cnt
-                   FROM conversations GROUP BY hour ORDER BY cnt DESC LIMIT 5'''
-            ).fetchall()
-            recent_sessions = conn.execute(
-                'SELECT DISTINCT session_id FROM conversations ORDER BY timestamp DESC LIMIT 5'
-            ).fetchall()
-
-        return {
-            'total_conversations': total,
-            'by_intent': {row[0]: row[1] for row in by_intent},
-            'most_active_hours': {row[0]: row[1] for row in by_hour},
-            'recent_sessions': len(recent_sessions),
-        }
+        return self.store.conversation_analytics()
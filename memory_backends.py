@@ -0,0 +1,995 @@
+"""
+JARVIS v1.0 — Memory Storage Backends
+Storage behind the Memory system, selectable with MEMORY_BACKEND:
+  - "sqlite": SQLite file + ChromaDB vector store per profile (default)
+  - "memory": pure in-process dicts and numpy arrays — no disk, no services.
+              Used for tests and benchmarks; everything is lost on exit.
+
+Memory only talks to the MemoryBackend interface, so a new store only
+has to implement the methods below.
+
+Benchmark:
+  python memory_backends.py --records 100000 [--backend memory|sqlite]
+"""
+
+import itertools
+import os
+import re
+import sqlite3
+import threading
+from bisect import bisect_right
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    CHROMA_DIR,
+    DB_PATH,
+    DEFAULT_PROFILE,
+    MEMORY_BACKEND,
+    PROFILES_DIR,
+)
+
+
+# ─── Profile Paths ───────────────────────────────────────
+
+def normalize_profile_id(profile_id: str) -> str:
+    """Filesystem-safe profile id ('Alice Smith' -> 'alice_smith')."""
+    cleaned = re.sub(r'[^a-z0-9_-]+', '_', (profile_id or '').strip().lower()).strip('_')
+    return cleaned or DEFAULT_PROFILE
+
+
+def profile_paths(profile_id: str) -> Tuple[str, str]:
+    """(SQLite path, Chroma directory) for a profile. The default profile keeps the legacy paths."""
+    profile_id = normalize_profile_id(profile_id)
+    if profile_id == normalize_profile_id(DEFAULT_PROFILE):
+        return str(DB_PATH), CHROMA_DIR
+    profile_dir = PROFILES_DIR / profile_id
+    profile_dir.mkdir(parents=True, exist_ok=True)
+    return str(profile_dir / "jarvis.db"), str(profile_dir / "chroma_store")
+
+
+def known_profiles() -> List[str]:
+    """All profiles that have stored memory."""
+    known = {normalize_profile_id(DEFAULT_PROFILE)}
+    if PROFILES_DIR.exists():
+        known.update(p.name for p in PROFILES_DIR.iterdir() if p.is_dir())
+    return sorted(known)
+
+
+_chroma_write_locks: Dict[str, threading.Lock] = {}
+_chroma_write_locks_guard = threading.Lock()
+
+
+def chroma_write_lock(chroma_dir: str) -> threading.Lock:
+    """
+    Process-wide lock held while a Chroma store's files are written. Backups
+    hold it while copying the store, so the snapshot's HNSW segments and
+    chroma.sqlite3 come from the same moment.
+    """
+    key = os.path.abspath(chroma_dir)
+    with _chroma_write_locks_guard:
+        return _chroma_write_locks.setdefault(key, threading.Lock())
+
+
+def _utc_timestamp() -> str:
+    """Same format as SQLite's CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# ─── Interface ───────────────────────────────────────────
+
+class MemoryBackend:
+    """
+    Storage interface for one profile's memory.
+
+    Fact rows are (category, key, value), newest first. Fact vector rows
+    are (category, key, text_hash, float32 bytes). Conversation timestamps
+    are 'YYYY-MM-DD HH:MM:SS' strings in UTC.
+    """
+
+    name = 'base'
+
+    # Facts
+    def upsert_facts(self, rows: List[Tuple[str, str, str, float]], state: Optional[Dict[str, str]] = None):
+        """Insert/update (category, key, value, confidence) rows and any state keys in one transaction."""
+        raise NotImplementedError
+
+    def get_facts(self, category: str = None) -> List[Tuple]:
+        raise NotImplementedError
+
+    def delete_facts(self, key_fragment: str) -> int:
+        """Delete facts whose key contains the fragment. Returns the number deleted."""
+        raise NotImplementedError
+
+    def count_facts(self) -> int:
+        raise NotImplementedError
+
+    def get_fact_vectors(self) -> Dict[Tuple[str, str], Tuple[str, bytes]]:
+        raise NotImplementedError
+
+    def put_fact_vectors(self, rows: List[Tuple[str, str, str, bytes]]):
+        raise NotImplementedError
+
+    # Conversations
+    def log_conversation(self, session_id: str, user_input: str, response: str,
+                         intent: str, model_used: str = ''):
+        raise NotImplementedError
+
+    def count_conversations(self) -> int:
+        raise NotImplementedError
+
+    def recent_conversations(self, limit: int) -> List[Tuple]:
+        """(user_input, response, intent, timestamp), newest first."""
+        raise NotImplementedError
+
+    def conversations_after(self, after_id: int, limit: int) -> List[Tuple[int, str]]:
+        """(id, user_input) for conversations logged after the given id, oldest first."""
+        raise NotImplementedError
+
+    def last_conversation_id(self) -> int:
+        """Id of the newest logged conversation (0 if none)."""
+        raise NotImplementedError
+
+    def all_conversations(self) -> List[Tuple]:
+        """(session_id, user_input, response, intent, timestamp) for export."""
+        raise NotImplementedError
+
+    def conversation_analytics(self) -> dict:
+        raise NotImplementedError
+
+    def forget(self, topic: str) -> Tuple[int, int]:
+        """Delete facts and conversations mentioning a topic. Returns (facts, conversations)."""
+        raise NotImplementedError
+
+    # Key/value state (watermarks, model metadata)
+    def get_state(self, key: str, default: str = '') -> str:
+        raise NotImplementedError
+
+    def set_state(self, key: str, value: str):
+        raise NotImplementedError
+
+    # Patterns
+    def record_pattern(self, task_type: str, hour: int, weekday: int):
+        raise NotImplementedError
+
+    def pattern_counts(self) -> List[Tuple[str, int, int, int]]:
+        """(task_type, hour, weekday, count) raw lifetime counts."""
+        raise NotImplementedError
+
+    def pattern_totals(self) -> List[Tuple[str, int]]:
+        raise NotImplementedError
+
+    def load_pattern_rows(self) -> List[Tuple[str, bytes]]:
+        raise NotImplementedError
+
+    def save_pattern_rows(self, rows: List[Tuple[str, bytes]], state: Optional[Dict[str, str]] = None):
+        raise NotImplementedError
+
+    def clear_pattern_rows(self):
+        raise NotImplementedError
+
+    # Reminders
+    def add_reminder(self, message: str, trigger_time: str) -> int:
+        raise NotImplementedError
+
+    def due_reminders(self, now: str) -> List[Tuple[int, str, str]]:
+        """(id, message, trigger_time) for open reminders due at or before `now`."""
+        raise NotImplementedError
+
+    def complete_reminder(self, reminder_id: int):
+        raise NotImplementedError
+
+    # Episodes (vector memory)
+    @property
+    def episodes_available(self) -> bool:
+        raise NotImplementedError
+
+    def add_episode(self, episode_id: str, document: str, embedding: List[float], metadata: dict):
+        raise NotImplementedError
+
+    def query_episodes(self, embedding: List[float], n_results: int) -> List[str]:
+        raise NotImplementedError
+
+    def count_episodes(self) -> int:
+        raise NotImplementedError
+
+    def prune_episodes(self, max_count: int) -> int:
+        """Drop the oldest episodes beyond max_count. Returns the number removed."""
+        raise NotImplementedError
+
+    # Maintenance
+    def enforce_limits(self, max_conversations: int, max_facts: int) -> Tuple[int, int]:
+        """Prune the oldest conversations and least important facts. Returns (conversations, facts)."""
+        raise NotImplementedError
+
+    def wipe(self):
+        """Delete facts, conversations, patterns, reminders and episodes."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release open handles. The backend reopens them on next use."""
+
+
+# ─── SQLite + ChromaDB ───────────────────────────────────
+
+class SQLiteChromaBackend(MemoryBackend):
+    """Persistent storage: one SQLite file plus a lazily opened ChromaDB collection."""
+
+    name = 'sqlite'
+
+    def __init__(self, profile_id: str = DEFAULT_PROFILE):
+        self.profile_id = normalize_profile_id(profile_id)
+        self.db_path, self.chroma_dir = profile_paths(self.profile_id)
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.chroma = None
+        self._episodes = None
+        self._chroma_error = None
+        self._chroma_lock = threading.Lock()
+        self._write_lock = chroma_write_lock(self.chroma_dir)
+        self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self):
+        """Initialize SQLite tables."""
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS facts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    category TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    confidence REAL DEFAULT 1.0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(category, key)
+                );
+
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    user_input TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    intent TEXT,
+                    model_used TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+
+                CREATE TABLE IF NOT EXISTS patterns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_type TEXT NOT NULL,
+                    hour_of_day INTEGER,
+                    day_of_week INTEGER,
+                    count INTEGER DEFAULT 1,
+                    last_used DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(task_type, hour_of_day, day_of_week)
+                );
+
+                CREATE TABLE IF NOT EXISTS pattern_model (
+                    task_type TEXT PRIMARY KEY,
+                    histogram BLOB NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS fact_vectors (
+                    category TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (category, key)
+                );
+
+                CREATE TABLE IF NOT EXISTS memory_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS reminders (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    message TEXT NOT NULL,
+                    trigger_time DATETIME,
+                    is_done INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                );
+            ''')
+            conn.commit()
+
+    @staticmethod
+    def _prune_fact_vectors(conn):
+        """Drop cached vectors whose fact no longer exists."""
+        conn.execute(
+            'DELETE FROM fact_vectors WHERE (category, key) NOT IN (SELECT category, key FROM facts)'
+        )
+
+    @staticmethod
+    def _write_state(conn, state: Optional[Dict[str, str]]):
+        if state:
+            conn.executemany(
+                'INSERT OR REPLACE INTO memory_state (key, value) VALUES (?, ?)', list(state.items())
+            )
+
+    # Facts
+
+    def upsert_facts(self, rows, state=None):
+        with self._connect() as conn:
+            conn.executemany('''
+                INSERT INTO facts (category, key, value, confidence, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(category, key) DO UPDATE SET
+                    value = excluded.value,
+                    confidence = excluded.confidence,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', rows)
+            self._write_state(conn, state)
+            conn.commit()
+
+    def get_facts(self, category=None):
+        with self._connect() as conn:
+            if category:
+                return conn.execute(
+                    'SELECT category, key, value FROM facts WHERE category = ? ORDER BY updated_at DESC, id DESC',
+                    (category,)
+                ).fetchall()
+            return conn.execute(
+                'SELECT category, key, value FROM facts ORDER BY updated_at DESC, id DESC'
+            ).fetchall()
+
+    def delete_facts(self, key_fragment):
+        with self._connect() as conn:
+            deleted = conn.execute('DELETE FROM facts WHERE key LIKE ?', (f'%{key_fragment}%',)).rowcount
+            self._prune_fact_vectors(conn)
+            conn.commit()
+        return deleted
+
+    def count_facts(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM facts').fetchone()[0]
+
+    def get_fact_vectors(self):
+        with self._connect() as conn:
+            return {
+                (cat, key): (text_hash, blob)
+                for cat, key, text_hash, blob in conn.execute(
+                    'SELECT category, key, text_hash, vector FROM fact_vectors'
+                )
+            }
+
+    def put_fact_vectors(self, rows):
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO fact_vectors (category, key, text_hash, vector) VALUES (?, ?, ?, ?)',
+                rows,
+            )
+            conn.commit()
+
+    # Conversations
+
+    def log_conversation(self, session_id, user_input, response, intent, model_used=''):
+        with self._connect() as conn:
+            conn.execute(
+                '''INSERT INTO conversations (session_id, user_input, response, intent, model_used)
+                   VALUES (?, ?, ?, ?, ?)''',
+                (session_id, user_input, response, intent, model_used)
+            )
+            conn.commit()
+
+    def count_conversations(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM conversations').fetchone()[0]
+
+    def recent_conversations(self, limit):
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT user_input, response, intent, timestamp FROM conversations ORDER BY id DESC LIMIT ?',
+                (limit,)
+            ).fetchall()
+
+    def conversations_after(self, after_id, limit):
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT id, user_input FROM conversations WHERE id > ? ORDER BY id LIMIT ?',
+                (after_id, limit),
+            ).fetchall()
+
+    def last_conversation_id(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT COALESCE(MAX(id), 0) FROM conversations').fetchone()[0]
+
+    def all_conversations(self):
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT session_id, user_input, response, intent, timestamp FROM conversations'
+            ).fetchall()
+
+    def conversation_analytics(self):
+        with self._connect() as conn:
+            total = conn.execute('SELECT COUNT(*) FROM conversations').fetchone()[0]
+            by_intent = conn.execute(
+                'SELECT intent, COUNT(*) as cnt FROM conversations GROUP BY intent ORDER BY cnt DESC'
+            ).fetchall()
+            by_hour = conn.execute(
+                '''SELECT CAST(strftime('%H', timestamp) AS INT) as hour, COUNT(*) as cnt
+                   FROM conversations GROUP BY hour ORDER BY cnt DESC LIMIT 5'''
+            ).fetchall()
+            recent_sessions = conn.execute(
+                'SELECT DISTINCT session_id FROM conversations ORDER BY timestamp DESC LIMIT 5'
+            ).fetchall()
+        return {
+            'total_conversations': total,
+            'by_intent': {row[0]: row[1] for row in by_intent},
+            'most_active_hours': {row[0]: row[1] for row in by_hour},
+            'recent_sessions': len(recent_sessions),
+        }
+
+    def forget(self, topic):
+        with self._connect() as conn:
+            facts_deleted = conn.execute(
+                'DELETE FROM facts WHERE key LIKE ? OR value LIKE ?',
+                (f'%{topic}%', f'%{topic}%')
+            ).rowcount
+            convos_deleted = conn.execute(
+                'DELETE FROM conversations WHERE user_input LIKE ? OR response LIKE ?',
+                (f'%{topic}%', f'%{topic}%')
+            ).rowcount
+            self._prune_fact_vectors(conn)
+            conn.commit()
+        return facts_deleted, convos_deleted
+
+    # State
+
+    def get_state(self, key, default=''):
+        with self._connect() as conn:
+            row = conn.execute('SELECT value FROM memory_state WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key, value):
+        with self._connect() as conn:
+            self._write_state(conn, {key: value})
+            conn.commit()
+
+    # Patterns
+
+    def record_pattern(self, task_type, hour, weekday):
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO patterns (task_type, hour_of_day, day_of_week, count, last_used)
+                VALUES (?, ?, ?, 1, CURRENT_TIMESTAMP)
+                ON CONFLICT(task_type, hour_of_day, day_of_week) DO UPDATE SET
+                    count = count + 1,
+                    last_used = CURRENT_TIMESTAMP
+            ''', (task_type, hour, weekday))
+            conn.commit()
+
+    def pattern_counts(self):
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT task_type, hour_of_day, day_of_week, count FROM patterns'
+            ).fetchall()
+
+    def pattern_totals(self):
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT task_type, SUM(count) FROM patterns GROUP BY task_type'
+            ).fetchall()
+
+    def load_pattern_rows(self):
+        with self._connect() as conn:
+            return conn.execute('SELECT task_type, histogram FROM pattern_model').fetchall()
+
+    def save_pattern_rows(self, rows, state=None):
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO pattern_model (task_type, histogram) VALUES (?, ?)', rows
+            )
+            self._write_state(conn, state)
+            conn.commit()
+
+    def clear_pattern_rows(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM pattern_model')
+            conn.execute("DELETE FROM memory_state WHERE key LIKE 'pattern_%'")
+            conn.commit()
+
+    # Reminders
+
+    def add_reminder(self, message, trigger_time):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'INSERT INTO reminders (message, trigger_time) VALUES (?, ?)', (message, trigger_time)
+            )
+            conn.commit()
+            return cursor.lastrowid
+
+    def due_reminders(self, now):
+        with self._connect() as conn:
+            return conn.execute(
+                '''SELECT id, message, trigger_time FROM reminders
+                   WHERE is_done = 0 AND trigger_time <= ? ORDER BY trigger_time''',
+                (now,)
+            ).fetchall()
+
+    def complete_reminder(self, reminder_id):
+        with self._connect() as conn:
+            conn.execute('UPDATE reminders SET is_done = 1 WHERE id = ?', (reminder_id,))
+            conn.commit()
+
+    # Episodes
+
+    def _open_episodes(self):
+        """Open this profile's ChromaDB collection on first use."""
+        with self._chroma_lock:
+            if self._episodes is not None or self._chroma_error is not None:
+                return self._episodes
+            try:
+                import chromadb
+                self.chroma = chromadb.PersistentClient(path=self.chroma_dir)
+                self._episodes = self.chroma.get_or_create_collection(
+                    name='episodes',
+                    metadata={'hnsw:space': 'cosine'}
+                )
+                print(f"[MEMORY] ChromaDB loaded for '{self.profile_id}'. Episodes: {self._episodes.count()}")
+            except Exception as e:
+                self._chroma_error = e
+                print(f"[MEMORY] ChromaDB not available: {e}")
+            return self._episodes
+
+    @property
+    def episodes_available(self):
+        return self._open_episodes() is not None
+
+    def add_episode(self, episode_id, document, embedding, metadata):
+        episodes = self._open_episodes()
+        if episodes is None:
+            return
+        try:
+            with self._write_lock:
+                episodes.add(
+                    documents=[document],
+                    embeddings=[embedding],
+                    metadatas=[metadata],
+                    ids=[episode_id],
+                )
+        except Exception as e:
+            print(f"[MEMORY] ChromaDB add error: {e}")
+
+    def query_episodes(self, embedding, n_results):
+        episodes = self._open_episodes()
+        if episodes is None:
+            return []
+        try:
+            count = episodes.count()
+            if count == 0:
+                return []
+            results = episodes.query(query_embeddings=[embedding], n_results=min(n_results, count))
+            if results and results['documents']:
+                return results['documents'][0]
+        except Exception as e:
+            print(f"[MEMORY] ChromaDB search error: {e}")
+        return []
+
+    def count_episodes(self):
+        episodes = self._open_episodes()
+        return episodes.count() if episodes is not None else 0
+
+    def prune_episodes(self, max_count):
+        episodes = self._open_episodes()
+        if episodes is None:
+            return 0
+        try:
+            excess = episodes.count() - max_count
+            if excess <= 0:
+                return 0
+            stored = episodes.get(include=['metadatas'])
+            by_age = sorted(
+                zip(stored['ids'], stored['metadatas']),
+                key=lambda item: (item[1] or {}).get('timestamp', ''),
+            )
+            with self._write_lock:
+                episodes.delete(ids=[ep_id for ep_id, _ in by_age[:excess]])
+            return excess
+        except Exception as e:
+            print(f"[MEMORY] Episode pruning error: {e}")
+            return 0
+
+    # Maintenance
+
+    def enforce_limits(self, max_conversations, max_facts):
+        with self._connect() as conn:
+            convos = conn.execute(
+                '''DELETE FROM conversations WHERE id NOT IN (
+                       SELECT id FROM conversations ORDER BY id DESC LIMIT ?)''',
+                (max_conversations,)
+            ).rowcount
+            facts = conn.execute(
+                '''DELETE FROM facts WHERE id NOT IN (
+                       SELECT id FROM facts ORDER BY confidence DESC, updated_at DESC LIMIT ?)''',
+                (max_facts,)
+            ).rowcount
+            if facts:
+                self._prune_fact_vectors(conn)
+            conn.commit()
+        return convos, facts
+
+    def wipe(self):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM facts')
+            conn.execute('DELETE FROM fact_vectors')
+            conn.execute('DELETE FROM conversations')
+            conn.execute('DELETE FROM patterns')
+            conn.execute('DELETE FROM reminders')
+            conn.commit()
+
+        # Clear ChromaDB
+        if self.episodes_available:
+            try:
+                with self._write_lock, self._chroma_lock:
+                    self.chroma.delete_collection('episodes')
+                    self._episodes = self.chroma.get_or_create_collection(
+                        name='episodes',
+                        metadata={'hnsw:space': 'cosine'}
+                    )
+            except Exception:
+                pass
+
+    def close(self):
+        with self._chroma_lock:
+            self._episodes = None
+            self.chroma = None
+            self._chroma_error = None
+
+
+# ─── In-Memory ───────────────────────────────────────────
+
+class InMemoryBackend(MemoryBackend):
+    """
+    Non-persistent backend for tests and benchmarks. Thread-safe, touches
+    no files, and episode search is a brute-force cosine scan in numpy.
+    """
+
+    name = 'memory'
+
+    def __init__(self, profile_id: str = DEFAULT_PROFILE):
+        self.profile_id = normalize_profile_id(profile_id)
+        self._lock = threading.RLock()
+        self._seq = itertools.count(1)
+        self._facts: Dict[Tuple[str, str], dict] = {}
+        self._fact_vectors: Dict[Tuple[str, str], Tuple[str, bytes]] = {}
+        self._conversations: List[dict] = []
+        self._conv_ids = itertools.count(1)
+        self._state: Dict[str, str] = {}
+        self._patterns: Counter = Counter()
+        self._pattern_rows: Dict[str, bytes] = {}
+        self._reminders: Dict[int, dict] = {}
+        self._reminder_ids = itertools.count(1)
+        self._episode_ids: List[str] = []
+        self._episode_docs: List[str] = []
+        self._episode_times: List[str] = []
+        self._episode_matrix = np.zeros((0, 0), dtype=np.float32)
+        self._episode_count = 0
+
+    # Facts
+
+    def upsert_facts(self, rows, state=None):
+        with self._lock:
+            for category, key, value, confidence in rows:
+                self._facts[(category, key)] = {
+                    'value': value, 'confidence': confidence, 'seq': next(self._seq),
+                }
+            if state:
+                self._state.update(state)
+
+    def get_facts(self, category=None):
+        with self._lock:
+            items = sorted(self._facts.items(), key=lambda item: -item[1]['seq'])
+        return [
+            (cat, key, fact['value']) for (cat, key), fact in items
+            if category is None or cat == category
+        ]
+
+    def delete_facts(self, key_fragment):
+        fragment = key_fragment.lower()
+        with self._lock:
+            doomed = [k for k in self._facts if fragment in k[1].lower()]
+            for k in doomed:
+                del self._facts[k]
+                self._fact_vectors.pop(k, None)
+        return len(doomed)
+
+    def count_facts(self):
+        return len(self._facts)
+
+    def get_fact_vectors(self):
+        with self._lock:
+            return dict(self._fact_vectors)
+
+    def put_fact_vectors(self, rows):
+        with self._lock:
+            for cat, key, text_hash, blob in rows:
+                self._fact_vectors[(cat, key)] = (text_hash, blob)
+
+    # Conversations
+
+    def log_conversation(self, session_id, user_input, response, intent, model_used=''):
+        with self._lock:
+            self._conversations.append({
+                'id': next(self._conv_ids), 'session_id': session_id,
+                'user_input': user_input, 'response': response, 'intent': intent,
+                'model_used': model_used, 'timestamp': _utc_timestamp(),
+            })
+
+    def count_conversations(self):
+        return len(self._conversations)
+
+    def recent_conversations(self, limit):
+        with self._lock:
+            rows = self._conversations[-limit:] if limit > 0 else []
+        return [(c['user_input'], c['response'], c['intent'], c['timestamp']) for c in reversed(rows)]
+
+    def conversations_after(self, after_id, limit):
+        with self._lock:
+            # Ids are increasing, so bisect on them
+            start = bisect_right(self._conversations, after_id, key=lambda c: c['id'])
+            rows = self._conversations[start:start + limit]
+        return [(c['id'], c['user_input']) for c in rows]
+
+    def last_conversation_id(self):
+        with self._lock:
+            return self._conversations[-1]['id'] if self._conversations else 0
+
+    def all_conversations(self):
+        with self._lock:
+            return [
+                (c['session_id'], c['user_input'], c['response'], c['intent'], c['timestamp'])
+                for c in self._conversations
+            ]
+
+    def conversation_analytics(self):
+        with self._lock:
+            convos = list(self._conversations)
+        by_intent = Counter(c['intent'] for c in convos)
+        by_hour = Counter(int(c['timestamp'][11:13]) for c in convos)
+        sessions = list(dict.fromkeys(c['session_id'] for c in reversed(convos)))
+        return {
+            'total_conversations': len(convos),
+            'by_intent': dict(by_intent.most_common()),
+            'most_active_hours': dict(by_hour.most_common(5)),
+            'recent_sessions': len(sessions[:5]),
+        }
+
+    def forget(self, topic):
+        needle = topic.lower()
+        with self._lock:
+            doomed = [
+                k for k, fact in self._facts.items()
+                if needle in k[1].lower() or needle in fact['value'].lower()
+            ]
+            for k in doomed:
+                del self._facts[k]
+                self._fact_vectors.pop(k, None)
+            before = len(self._conversations)
+            self._conversations = [
+                c for c in self._conversations
+                if needle not in c['user_input'].lower() and needle not in c['response'].lower()
+            ]
+            return len(doomed), before - len(self._conversations)
+
+    # State
+
+    def get_state(self, key, default=''):
+        return self._state.get(key, default)
+
+    def set_state(self, key, value):
+        with self._lock:
+            self._state[key] = value
+
+    # Patterns
+
+    def record_pattern(self, task_type, hour, weekday):
+        with self._lock:
+            self._patterns[(task_type, hour, weekday)] += 1
+
+    def pattern_counts(self):
+        with self._lock:
+            return [(task, hour, weekday, count) for (task, hour, weekday), count in self._patterns.items()]
+
+    def pattern_totals(self):
+        totals = Counter()
+        for (task, _, _), count in list(self._patterns.items()):
+            totals[task] += count
+        return list(totals.items())
+
+    def load_pattern_rows(self):
+        with self._lock:
+            return list(self._pattern_rows.items())
+
+    def save_pattern_rows(self, rows, state=None):
+        with self._lock:
+            self._pattern_rows.update(rows)
+            if state:
+                self._state.update(state)
+
+    def clear_pattern_rows(self):
+        with self._lock:
+            self._pattern_rows.clear()
+            for key in [k for k in self._state if k.startswith('pattern_')]:
+                del self._state[key]
+
+    # Reminders
+
+    def add_reminder(self, message, trigger_time):
+        with self._lock:
+            reminder_id = next(self._reminder_ids)
+            self._reminders[reminder_id] = {'message': message, 'trigger_time': trigger_time, 'done': False}
+            return reminder_id
+
+    def due_reminders(self, now):
+        with self._lock:
+            due = [
+                (rid, r['message'], r['trigger_time']) for rid, r in self._reminders.items()
+                if not r['done'] and r['trigger_time'] and r['trigger_time'] <= now
+            ]
+        return sorted(due, key=lambda row: row[2])
+
+    def complete_reminder(self, reminder_id):
+        with self._lock:
+            if reminder_id in self._reminders:
+                self._reminders[reminder_id]['done'] = True
+
+    # Episodes
+
+    @property
+    def episodes_available(self):
+        return True
+
+    def add_episode(self, episode_id, document, embedding, metadata):
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if norm:
+            vec = vec / norm
+        with self._lock:
+            n = self._episode_count
+            if self._episode_matrix.shape[1] != len(vec):
+                if n:
+                    return  # Dimension mismatch with stored episodes
+                self._episode_matrix = np.zeros((0, len(vec)), dtype=np.float32)
+            if n == self._episode_matrix.shape[0]:
+                # Grow geometrically so inserts stay amortized O(1)
+                grown = np.zeros((max(16, n * 2), len(vec)), dtype=np.float32)
+                grown[:n] = self._episode_matrix[:n]
+                self._episode_matrix = grown
+            self._episode_matrix[n] = vec
+            self._episode_ids.append(episode_id)
+            self._episode_docs.append(document)
+            self._episode_times.append(metadata.get('timestamp', ''))
+            self._episode_count += 1
+
+    def query_episodes(self, embedding, n_results):
+        q = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            n = self._episode_count
+            if n == 0 or self._episode_matrix.shape[1] != len(q):
+                return []
+            scores = self._episode_matrix[:n] @ q
+            k = min(n_results, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [self._episode_docs[i] for i in top]
+
+    def count_episodes(self):
+        return self._episode_count
+
+    def prune_episodes(self, max_count):
+        with self._lock:
+            excess = self._episode_count - max_count
+            if excess <= 0:
+                return 0
+            keep = np.argsort(np.array(self._episode_times, dtype=object), kind='stable')[excess:]
+            keep.sort()
+            self._episode_matrix = self._episode_matrix[:self._episode_count][keep]
+            self._episode_ids = [self._episode_ids[i] for i in keep]
+            self._episode_docs = [self._episode_docs[i] for i in keep]
+            self._episode_times = [self._episode_times[i] for i in keep]
+            self._episode_count = len(keep)
+            return excess
+
+    # Maintenance
+
+    def enforce_limits(self, max_conversations, max_facts):
+        with self._lock:
+            convos = max(0, len(self._conversations) - max_conversations)
+            if convos:
+                self._conversations = self._conversations[convos:]
+            facts = max(0, len(self._facts) - max_facts)
+            if facts:
+                ranked = sorted(
+                    self._facts.items(), key=lambda item: (item[1]['confidence'], item[1]['seq'])
+                )
+                for k, _ in ranked[:facts]:
+                    del self._facts[k]
+                    self._fact_vectors.pop(k, None)
+        return convos, facts
+
+    def wipe(self):
+        with self._lock:
+            self._facts.clear()
+            self._fact_vectors.clear()
+            self._conversations.clear()
+            self._patterns.clear()
+            self._reminders.clear()
+            self._episode_ids, self._episode_docs, self._episode_times = [], [], []
+            self._episode_matrix = np.zeros((0, 0), dtype=np.float32)
+            self._episode_count = 0
+
+
+BACKENDS = {
+    SQLiteChromaBackend.name: SQLiteChromaBackend,
+    InMemoryBackend.name: InMemoryBackend,
+}
+
+
+def create_backend(profile_id: str = DEFAULT_PROFILE, kind: str = None) -> MemoryBackend:
+    """Build the configured storage backend for a profile."""
+    kind = (kind or MEMORY_BACKEND).lower()
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown memory backend '{kind}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[kind](profile_id)
+
+
+# ─── Benchmark ───────────────────────────────────────────
+
+def _benchmark(records: int, kind: str, dim: int):
+    """Drive the full Memory pipeline with synthetic data and report timings."""
+    import hashlib
+    import time
+    from memory import Memory
+
+    def fake_embed(text: str) -> List[float]:
+        vec = np.zeros(dim, dtype=np.float32)
+        for word in text.lower().split():
+            vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % dim] += 1.0
+        return vec.tolist()
+
+    memory = Memory(f'bench_{kind}', backend=create_backend(f'bench_{kind}', kind), embed_fn=fake_embed)
+    memory.wipe_memories(confirm=True)
+    topics = ['coffee', 'python', 'football', 'budget', 'travel', 'guitar', 'garden', 'taxes']
+
+    def timed(label, fn, count):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<28} {elapsed:8.2f}s  ({count / max(elapsed, 1e-9):,.0f}/s)")
+
+    print(f"[BENCH] backend={kind} records={records:,} dim={dim}")
+    timed('log_conversation', lambda: [
+        memory.log_conversation('bench', f'tell me about {topics[i % 8]} {i}', f'answer {i}', 'chat')
+        for i in range(records)
+    ], records)
+    timed('add_fact', lambda: memory.store.upsert_facts([
+        ('misc', f'{topics[i % 8]}_{i}', f'likes {topics[i % 8]} variant {i}', 1.0)
+        for i in range(min(records, 5000))
+    ]), min(records, 5000))
+
+    timed('fact vector backfill', memory._backfill_all_fact_vectors, min(records, 5000))
+    timed('add_episode', lambda: [
+        memory.add_episode('bench', f'question {i} about {topics[i % 8]}', f'answer {i}', 'chat')
+        for i in range(records)
+    ], records)
+    timed('record_pattern', lambda: [memory.record_pattern(topics[i % 8]) for i in range(records)], records)
+    queries = 200
+    timed('get_context', lambda: [
+        memory.get_context(f'what about my {topics[i % 8]}') for i in range(queries)
+    ], queries)
+    timed('get_likely_tasks', lambda: [memory.get_likely_tasks() for _ in range(queries)], queries)
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmark the memory pipeline with synthetic records')
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--backend', default='memory', choices=sorted(BACKENDS))
+    parser.add_argument('--dim', type=int, default=64, help='Synthetic embedding size')
+    args = parser.parse_args()
+    _benchmark(args.records, args.backend, args.dim)
@@ -0,0 +1,484 @@
+"""
+JARVIS v1.0 — Notes Index
+SQLite index of the notes (name, mtime, size, title, content) with an
+FTS5 table for full-text search. List, search and lookup are answered
+from the index instead of reading every note.
+
+The index syncs incrementally from a note source (the notes directory,
+or the note journal): each note's mtime and size are compared with the
+indexed values and only changed notes are re-read. It runs once at
+startup and then on a polling interval.
+
+Given an embedding function, notes are also embedded in the background
+(batched) and search merges full-text and semantic rankings.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from config import (
+    NOTES_EMBED_BATCH,
+    NOTES_EMBED_CHARS,
+    NOTES_EMBED_DELAY,
+    NOTES_EMBED_RETRY,
+    NOTES_EMBED_RETRY_MAX,
+    NOTES_INDEX_PATH,
+    NOTES_MIN_SIMILARITY,
+    NOTES_SYNC_INTERVAL,
+)
+
+_RRF_K = 60           # Reciprocal rank fusion constant
+_CANDIDATES = 50      # Results taken from each ranking before fusing
+
+
+def note_title(content: str) -> str:
+    """First line of a note without the markdown header marker."""
+    return content.split('\n', 1)[0].lstrip('# ').strip()
+
+
+def _fts_query(query: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{w}"*' for w in words)
+
+
+def _best_line(content: str, query: str, width: int = 110) -> str:
+    """The body line sharing the most words with the query, as a snippet."""
+    words = set(re.findall(r'\w+', query.lower()))
+    lines = [l.strip() for l in content.split('\n')[1:] if l.strip()] or [content.strip()]
+    best = max(lines, key=lambda l: len(words & set(re.findall(r'\w+', l.lower()))))
+    return best if len(best) <= width else best[:width].rstrip() + '…'
+
+
+class DirectorySource:
+    """Notes stored as one markdown file each."""
+
+    def __init__(self, notes_dir: Path):
+        self.notes_dir = Path(notes_dir)
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """name -> (mtime_ns, size) for every note."""
+        found = {}
+        try:
+            with os.scandir(self.notes_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.md') and entry.is_file():
+                        stat = entry.stat()
+                        found[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            pass
+        return found
+
+    def read(self, name: str) -> str:
+        return (self.notes_dir / name).read_text(encoding='utf-8', errors='replace')
+
+
+class NotesIndex:
+    """Incrementally synced full-text index over a note source."""
+
+    def __init__(self, source: Union[Path, str, DirectorySource], db_path: Path = NOTES_INDEX_PATH,
+                 sync_interval: float = NOTES_SYNC_INTERVAL,
+                 embed_batch: Optional[Callable[[List[str]], List[Optional[List[float]]]]] = None):
+        # Anything with scan() and read(name) works (plus an optional maintain(),
+        # run after each background sync); a path means a notes directory
+        self.source = source if hasattr(source, 'scan') else DirectorySource(source)
+        self.db_path = str(db_path)
+        self.sync_interval = sync_interval
+        self.running = False
+        self._thread = None
+        self._sync_lock = threading.Lock()
+
+        # Semantic search: vectors are computed by a background worker and
+        # held in memory as one normalized matrix
+        self.embed_batch = embed_batch
+        self._embed_thread = None
+        self._embed_wakeup = threading.Event()
+        self._vectors = None          # (names, matrix)
+        self._vectors_lock = threading.Lock()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.fts = self._init_db()
+
+    def _connect(self):
+        return sqlite3.connect(self.db_path)
+
+    def _init_db(self) -> bool:
+        """Create the tables. Returns False if this SQLite build lacks FTS5."""
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS notes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    title TEXT NOT NULL,
+                    content TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_notes_mtime ON notes(mtime_ns);
+
+                -- A note's vector is dropped whenever its content changes,
+                -- so "no vector" means exactly "needs embedding"
+                CREATE TABLE IF NOT EXISTS note_vectors (
+                    note_id INTEGER PRIMARY KEY,
+                    vector BLOB NOT NULL
+                );
+                CREATE TRIGGER IF NOT EXISTS note_vectors_au AFTER UPDATE OF content ON notes BEGIN
+                    DELETE FROM note_vectors WHERE note_id = old.id;
+                END;
+                CREATE TRIGGER IF NOT EXISTS note_vectors_ad AFTER DELETE ON notes BEGIN
+                    DELETE FROM note_vectors WHERE note_id = old.id;
+                END;
+
+                -- Notes whose embedding failed wait until retry_at (backing
+                -- off per attempt), so they don't hold up the notes after them
+                CREATE TABLE IF NOT EXISTS note_embed_failures (
+                    note_id INTEGER PRIMARY KEY,
+                    attempts INTEGER NOT NULL,
+                    retry_at REAL NOT NULL
+                );
+                CREATE TRIGGER IF NOT EXISTS note_embed_failures_au AFTER UPDATE OF content ON notes BEGIN
+                    DELETE FROM note_embed_failures WHERE note_id = old.id;
+                END;
+                CREATE TRIGGER IF NOT EXISTS note_embed_failures_ad AFTER DELETE ON notes BEGIN
+                    DELETE FROM note_embed_failures WHERE note_id = old.id;
+                END;
+            ''')
+            try:
+                conn.executescript('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                        title, content, content='notes', content_rowid='id'
+                    );
+                    CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+                        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+                        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+                        VALUES ('delete', old.id, old.title, old.content);
+                    END;
+                    CREATE TRIGGER IF NOT EXISTS notes_au AFTER UPDATE ON notes BEGIN
+                        INSERT INTO notes_fts(notes_fts, rowid, title, content)
+                        VALUES ('delete', old.id, old.title, old.content);
+                        INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+                    END;
+                ''')
+                return True
+            except sqlite3.OperationalError as e:
+                print(f"[NOTES] FTS5 not available, falling back to substring search: {e}")
+                return False
+
+    # ─── Updates ─────────────────────────────────────────
+
+    @staticmethod
+    def _upsert(conn, name: str, mtime_ns: int, size: int, content: str):
+        conn.execute('''
+            INSERT INTO notes (name, mtime_ns, size, title, content) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns,
+                size = excluded.size,
+                title = excluded.title,
+                content = excluded.content
+        ''', (name, mtime_ns, size, note_title(content), content))
+
+    def upsert(self, name: str, content: str, mtime_ns: int = None, size: int = None):
+        """Index one note right away (called after a save, before the next sync)."""
+        with self._connect() as conn:
+            self._upsert(
+                conn, name,
+                mtime_ns if mtime_ns is not None else time.time_ns(),
+                size if size is not None else len(content.encode('utf-8')),
+                content,
+            )
+            conn.commit()
+        self._invalidate_vectors()
+        self._embed_wakeup.set()
+
+    def remove(self, name: str):
+        with self._connect() as conn:
+            conn.execute('DELETE FROM notes WHERE name = ?', (name,))
+            conn.commit()
+        self._invalidate_vectors()
+
+    def sync(self) -> Tuple[int, int]:
+        """Bring the index up to date with the source. Returns (updated, removed)."""
+        with self._sync_lock:
+            with self._connect() as conn:
+                indexed = {
+                    name: (mtime_ns, size)
+                    for name, mtime_ns, size in conn.execute('SELECT name, mtime_ns, size FROM notes')
+                }
+
+            current = self.source.scan()
+            changed = [
+                (name, mtime_ns, size) for name, (mtime_ns, size) in current.items()
+                if indexed.get(name) != (mtime_ns, size)
+            ]
+            removed = [name for name in indexed if name not in current]
+            if not changed and not removed:
+                return 0, 0
+
+            with self._connect() as conn:
+                for name, mtime_ns, size in changed:
+                    try:
+                        content = self.source.read(name)
+                    except (OSError, KeyError):
+                        continue  # Deleted or locked mid-scan; picked up next sync
+                    self._upsert(conn, name, mtime_ns, size, content)
+                conn.executemany('DELETE FROM notes WHERE name = ?', [(n,) for n in removed])
+                conn.commit()
+            self._invalidate_vectors()
+            self._embed_wakeup.set()
+
+        print(f"[NOTES] Index synced: {len(changed)} updated, {len(removed)} removed.")
+        return len(changed), len(removed)
+
+    # ─── Queries ─────────────────────────────────────────
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM notes').fetchone()[0]
+
+    def list_recent(self, limit: int = 10) -> List[Tuple[str, str]]:
+        """(name, title) of the most recently written notes (any .md, not just note_*.md)."""
+        with self._connect() as conn:
+            return conn.execute(
+                'SELECT name, title FROM notes ORDER BY mtime_ns DESC, name DESC LIMIT ?', (limit,)
+            ).fetchall()
+
+    def find(self, identifier: str) -> Optional[Tuple[str, str]]:
+        """(name, content) of the most recently written note whose name contains the identifier."""
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT name, content FROM notes WHERE name LIKE ? ESCAPE '\\' "
+                "ORDER BY mtime_ns DESC, name DESC LIMIT 1",
+                ('%' + re.sub(r'([%_\\])', r'\\\1', identifier) + '%',),
+            ).fetchone()
+
+    def search(self, query: str, limit: int = 10) -> Tuple[int, List[Tuple[str, str]]]:
+        """Full-text search. Returns (total matches, [(name, snippet)]) best first."""
+        if self.fts:
+            match = _fts_query(query)
+            if not match:
+                return 0, []
+            with self._connect() as conn:
+                total = conn.execute(
+                    'SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH ?', (match,)
+                ).fetchone()[0]
+                rows = conn.execute('''
+                    SELECT n.name, snippet(notes_fts, 1, '', '', '…', 16)
+                    FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid
+                    WHERE notes_fts MATCH ?
+                    ORDER BY bm25(notes_fts, 2.0, 1.0)
+                    LIMIT ?
+                ''', (match, limit)).fetchall()
+            return total, [(name, snippet.replace('\n', ' ').strip()) for name, snippet in rows]
+
+        # No FTS5: substring match over the indexed content (still no file reads)
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT name, content FROM notes WHERE instr(lower(content), ?) > 0 '
+                'ORDER BY mtime_ns DESC, name DESC',
+                (query.lower(),),
+            ).fetchall()
+        results = []
+        for name, content in rows[:limit]:
+            idx = content.lower().index(query.lower())
+            snippet = content[max(0, idx - 30):idx + len(query) + 70].replace('\n', ' ').strip()
+            results.append((name, snippet))
+        return len(rows), results
+
+    # ─── Semantic Search ─────────────────────────────────
+
+    def _invalidate_vectors(self):
+        with self._vectors_lock:
+            self._vectors = None
+
+    def embed_pending(self) -> int:
+        """
+        Embed notes that have no vector yet, one batch per request. Returns the
+        number embedded. Notes that fail while the rest of their batch works
+        are retried later with backoff (NOTES_EMBED_RETRY doubling per
+        attempt), not on every pass. A batch with no vectors at all means the
+        service is unavailable: the pass stops and no note is held against it.
+        """
+        if not self.embed_batch:
+            return 0
+        done = 0
+        while True:
+            now = time.time()
+            with self._connect() as conn:
+                pending = conn.execute('''
+                    SELECT n.id, n.content FROM notes n
+                    LEFT JOIN note_vectors v ON v.note_id = n.id
+                    LEFT JOIN note_embed_failures f ON f.note_id = n.id
+                    WHERE v.note_id IS NULL AND (f.retry_at IS NULL OR f.retry_at <= ?)
+                    ORDER BY n.name DESC
+                    LIMIT ?
+                ''', (now, NOTES_EMBED_BATCH)).fetchall()
+            if not pending:
+                break
+
+            embeddings = self.embed_batch([content[:NOTES_EMBED_CHARS] for _, content in pending])
+            rows, failed = [], []
+            for (note_id, _), embedding in zip(pending, embeddings):
+                vec = np.asarray(embedding or [], dtype=np.float32)
+                norm = np.linalg.norm(vec)
+                if norm:
+                    rows.append((note_id, (vec / norm).tobytes(), note_id))
+                else:
+                    failed.append(note_id)
+            if not rows:
+                break  # Nothing embedded (the service may be down) — try again on the next wakeup
+
+            with self._connect() as conn:
+                # Skip notes deleted while we were embedding
+                conn.executemany(
+                    'INSERT OR REPLACE INTO note_vectors (note_id, vector) '
+                    'SELECT ?, ? WHERE EXISTS (SELECT 1 FROM notes WHERE id = ?)',
+                    rows,
+                )
+                conn.executemany('DELETE FROM note_embed_failures WHERE note_id = ?', [(r[0],) for r in rows])
+                conn.executemany(
+                    'INSERT INTO note_embed_failures (note_id, attempts, retry_at) '
+                    'SELECT ?, 1, ? WHERE EXISTS (SELECT 1 FROM notes WHERE id = ?) '
+                    'ON CONFLICT(note_id) DO UPDATE SET attempts = attempts + 1, '
+                    'retry_at = ? + MIN(?, ? << attempts)',
+                    [(note_id, now + NOTES_EMBED_RETRY, note_id, now, NOTES_EMBED_RETRY_MAX, NOTES_EMBED_RETRY)
+                     for note_id in failed],
+                )
+                conn.commit()
+            done += len(rows)
+            self._invalidate_vectors()
+        if done:
+            print(f"[NOTES] Embedded {done} notes.")
+        return done
+
+    def _load_vectors(self):
+        """Note names and their normalized vectors as one matrix (cached until notes change)."""
+        with self._vectors_lock:
+            if self._vectors is not None:
+                return self._vectors
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT n.name, v.vector FROM note_vectors v JOIN notes n ON n.id = v.note_id'
+            ).fetchall()
+        sizes = [len(blob) for _, blob in rows]
+        if len(set(sizes)) > 1:
+            # Embedding model changed — use the most common size until re-embedded
+            common = max(set(sizes), key=sizes.count)
+            rows = [(name, blob) for name, blob in rows if len(blob) == common]
+        names = [name for name, _ in rows]
+        if rows:
+            matrix = np.frombuffer(b''.join(blob for _, blob in rows), dtype=np.float32).reshape(len(rows), -1)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        with self._vectors_lock:
+            self._vectors = (names, matrix)
+        return self._vectors
+
+    def has_vectors(self) -> bool:
+        return len(self._load_vectors()[0]) > 0
+
+    def semantic_search(self, query_vec: List[float], limit: int = 10) -> List[Tuple[str, float]]:
+        """(name, cosine similarity) of the closest notes above NOTES_MIN_SIMILARITY."""
+        names, matrix = self._load_vectors()
+        q = np.asarray(query_vec, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if not names or matrix.shape[1] != len(q) or not norm:
+            return []
+        scores = matrix @ (q / norm)
+        k = min(limit, len(names))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(names[i], float(scores[i])) for i in top if scores[i] >= NOTES_MIN_SIMILARITY]
+
+    def hybrid_search(self, query: str, query_vec: List[float], limit: int = 10) -> List[Tuple[str, str]]:
+        """
+        Merge full-text and semantic rankings with reciprocal rank fusion.
+        Full-text requires every word; paraphrases are left to the
+        semantic side. Returns [(name, snippet)] best first.
+        """
+        lexical = {}
+        match = _fts_query(query) if self.fts else ''
+        if match:
+            with self._connect() as conn:
+                rows = conn.execute('''
+                    SELECT n.name, snippet(notes_fts, 1, '', '', '…', 16)
+                    FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid
+                    WHERE notes_fts MATCH ?
+                    ORDER BY bm25(notes_fts, 2.0, 1.0)
+                    LIMIT ?
+                ''', (match, _CANDIDATES)).fetchall()
+            lexical = {name: (rank, snippet) for rank, (name, snippet) in enumerate(rows)}
+        semantic = {name: rank for rank, (name, _) in enumerate(self.semantic_search(query_vec, _CANDIDATES))}
+
+        fused = {}
+        for name, (rank, _) in lexical.items():
+            fused[name] = fused.get(name, 0.0) + 1.0 / (_RRF_K + rank)
+        for name, rank in semantic.items():
+            fused[name] = fused.get(name, 0.0) + 1.0 / (_RRF_K + rank)
+        best = sorted(fused, key=fused.get, reverse=True)[:limit]
+
+        # Semantic-only hits have no FTS snippet; show their most relevant line
+        need_text = [name for name in best if name not in lexical]
+        contents = {}
+        if need_text:
+            with self._connect() as conn:
+                marks = ','.join('?' * len(need_text))
+                contents = dict(conn.execute(
+                    f'SELECT name, content FROM notes WHERE name IN ({marks})', need_text
+                ).fetchall())
+
+        results = []
+        for name in best:
+            snippet = lexical[name][1] if name in lexical else _best_line(contents.get(name, ''), query)
+            results.append((name, snippet.replace('\n', ' ').strip()))
+        return results
+
+    def _embed_loop(self):
+        while self.running:
+            self._embed_wakeup.wait(timeout=max(self.sync_interval, 1))
+            if not self.running:
+                return
+            self._embed_wakeup.clear()
+            time.sleep(NOTES_EMBED_DELAY)  # Let a burst of saves collect into one batch
+            try:
+                self.embed_pending()
+            except Exception as e:
+                print(f"[NOTES] Embedding error: {e}")
+
+    # ─── Polling ─────────────────────────────────────────
+
+    def _loop(self):
+        while self.running:
+            time.sleep(self.sync_interval)
+            try:
+                self.sync()
+                maintain = getattr(self.source, 'maintain', None)
+                if maintain:
+                    maintain()    # e.g. journal compaction, kept off the request thread
+            except Exception as e:
+                print(f"[NOTES] Sync error: {e}")
+
+    def start(self):
+        """Sync now, then keep polling for outside edits and embedding new notes."""
+        self.sync()
+        if self.running:
+            return
+        self.running = True
+        if self.sync_interval > 0:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+        if self.embed_batch:
+            self._embed_thread = threading.Thread(target=self._embed_loop, daemon=True)
+            self._embed_thread.start()
+            self._embed_wakeup.set()  # Catch up on notes without vectors
+
+    def stop(self):
+        self.running = False
+        self._embed_wakeup.set()
@@ -0,0 +1,323 @@
+"""
+JARVIS v1.0 — Notes Journal
+Append-only storage engine for high-volume notes (NOTES_STORAGE=journal).
+Instead of one small markdown file per note, notes are appended as
+records to segment files:
+
+  record = header | name | body
+  header = magic, op (put/delete), name length, body length, CRC32, mtime_ns
+
+  - Saving is a single append; deleting appends a tombstone
+  - An in-memory offset index (name -> segment, offset, length) is rebuilt
+    at startup by scanning the segments through mmap; reads are one slice
+    of a memory-mapped segment
+  - A torn record at the end of the last segment (crash mid-write) is
+    truncated away on open
+  - Compaction rewrites live notes into fresh segments once enough of the
+    journal is dead, then drops the old segments oldest first, so a crash
+    at any point still replays to the same notes. Deletes only mark it as
+    due; it runs from the notes index's background sync (maintain())
+  - export_markdown() writes every note back out as a markdown file
+
+Usage:
+  python notes_journal.py import [DIR]     (markdown files -> journal)
+  python notes_journal.py export DIR       (journal -> markdown files)
+  python notes_journal.py compact
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from config import (
+    NOTES_COMPACT_RATIO,
+    NOTES_DIR,
+    NOTES_JOURNAL_DIR,
+    NOTES_SEGMENT_BYTES,
+)
+
+_MAGIC = b'JNL1'
+_HEADER = struct.Struct('<4sBHIIQ')   # magic, op, name_len, body_len, crc32, mtime_ns
+_PUT, _DELETE = 1, 2
+
+
+class NotesJournal:
+    """Segmented append-only note store with an mmap-backed offset index."""
+
+    def __init__(self, journal_dir: Path = NOTES_JOURNAL_DIR,
+                 segment_bytes: int = NOTES_SEGMENT_BYTES,
+                 compact_ratio: float = NOTES_COMPACT_RATIO):
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        # name -> (segment, body offset, body length, mtime_ns)
+        self._index: Dict[str, Tuple[int, int, int, int]] = {}
+        self._maps: Dict[int, Tuple[object, mmap.mmap]] = {}
+        self._total_bytes = 0
+        self._live_bytes = 0
+        self._active = None   # (segment number, append handle)
+        self._compact_due = False   # Set by delete(), acted on by maintain() off the request thread
+        self._load()
+
+    # ─── Segments ────────────────────────────────────────
+
+    def _segment_path(self, seg: int) -> Path:
+        return self.journal_dir / f'segment_{seg:06d}.log'
+
+    def _segments(self) -> List[int]:
+        return sorted(int(p.stem.split('_')[1]) for p in self.journal_dir.glob('segment_*.log'))
+
+    def _view(self, seg: int, end: int) -> mmap.mmap:
+        """Read-only map of a segment covering at least `end` bytes (remapped as it grows)."""
+        entry = self._maps.get(seg)
+        if entry is None or len(entry[1]) < end:
+            if entry:
+                entry[1].close()
+                entry[0].close()
+            f = open(self._segment_path(seg), 'rb')
+            entry = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            self._maps[seg] = entry
+        return entry[1]
+
+    def _close_maps(self, segments=None):
+        for seg in list(segments if segments is not None else self._maps):
+            entry = self._maps.pop(seg, None)
+            if entry:
+                entry[1].close()
+                entry[0].close()
+
+    def _records(self, seg: int) -> Iterator[Tuple[int, int, str, int, int, int]]:
+        """Yield (record offset, op, name, body offset, body length, mtime_ns); stops at the first bad record."""
+        size = self._segment_path(seg).stat().st_size
+        if size == 0:
+            return
+        view = self._view(seg, size)
+        pos = 0
+        while pos + _HEADER.size <= size:
+            magic, op, name_len, body_len, crc, mtime_ns = _HEADER.unpack_from(view, pos)
+            start = pos + _HEADER.size
+            end = start + name_len + body_len
+            if magic != _MAGIC or end > size or zlib.crc32(view[start:end]) != crc:
+                return
+            name = view[start:start + name_len].decode('utf-8')
+            yield pos, op, name, start + name_len, body_len, mtime_ns
+            pos = end
+
+    def _load(self):
+        """Rebuild the offset index by replaying every segment in order."""
+        started = time.perf_counter()
+        segments = self._segments()
+        for seg in segments:
+            valid_end = 0
+            for pos, op, name, body_off, body_len, mtime_ns in self._records(seg):
+                record_len = body_off + body_len - pos
+                self._total_bytes += record_len
+                old = self._index.pop(name, None)
+                if old:
+                    self._live_bytes -= _HEADER.size + len(name.encode('utf-8')) + old[2]
+                if op == _PUT:
+                    self._index[name] = (seg, body_off, body_len, mtime_ns)
+                    self._live_bytes += record_len
+                valid_end = body_off + body_len
+
+            size = self._segment_path(seg).stat().st_size
+            if valid_end < size:
+                if seg == segments[-1]:
+                    # Torn write at the tail — drop it so appends start clean
+                    self._close_maps([seg])
+                    os.truncate(self._segment_path(seg), valid_end)
+                    print(f"[NOTES] Journal: truncated {size - valid_end} bytes of incomplete record.")
+                else:
+                    print(f"[NOTES] Journal: segment {seg} is damaged after byte {valid_end}; later records skipped.")
+
+        if segments:
+            print(f"[NOTES] Journal loaded: {len(self._index)} notes in {len(segments)} segments "
+                  f"({time.perf_counter() - started:.2f}s)")
+
+    def _append_handle(self, incoming: int):
+        """Append handle for the active segment, rolling to a new one when full."""
+        if self._active is None:
+            segments = self._segments()
+            seg = segments[-1] if segments else 1
+            self._active = (seg, open(self._segment_path(seg), 'ab'))
+        seg, handle = self._active
+        if handle.tell() > 0 and handle.tell() + incoming > self.segment_bytes:
+            handle.close()
+            seg += 1
+            self._active = (seg, open(self._segment_path(seg), 'ab'))
+        return self._active
+
+    def _append(self, op: int, name: str, body: bytes, mtime_ns: int) -> Tuple[int, int]:
+        """Write one record. Returns (segment, body offset)."""
+        name_bytes = name.encode('utf-8')
+        payload = name_bytes + body
+        header = _HEADER.pack(_MAGIC, op, len(name_bytes), len(body), zlib.crc32(payload), mtime_ns)
+        seg, handle = self._append_handle(len(header) + len(payload))
+        offset = handle.tell()
+        handle.write(header + payload)
+        handle.flush()
+        self._total_bytes += len(header) + len(payload)
+        return seg, offset + len(header) + len(name_bytes)
+
+    # ─── Notes ───────────────────────────────────────────
+
+    def put(self, name: str, content: str, mtime_ns: int = None) -> Tuple[int, int]:
+        """Store or replace a note with one append. Returns (mtime_ns, size)."""
+        body = content.encode('utf-8')
+        mtime_ns = mtime_ns or time.time_ns()
+        with self._lock:
+            self._drop_live(name)
+            seg, body_off = self._append(_PUT, name, body, mtime_ns)
+            self._index[name] = (seg, body_off, len(body), mtime_ns)
+            self._live_bytes += _HEADER.size + len(name.encode('utf-8')) + len(body)
+        return mtime_ns, len(body)
+
+    def get(self, name: str) -> str:
+        """Content of a note (KeyError if it doesn't exist)."""
+        with self._lock:
+            seg, body_off, body_len, _ = self._index[name]
+            view = self._view(seg, body_off + body_len)
+            return view[body_off:body_off + body_len].decode('utf-8', errors='replace')
+
+    read = get  # Note source interface used by NotesIndex
+
+    def delete(self, name: str) -> bool:
+        """Append a tombstone. Returns False if the note didn't exist."""
+        with self._lock:
+            if name not in self._index:
+                return False
+            self._drop_live(name)
+            self._append(_DELETE, name, b'', time.time_ns())
+            self._compact_due = self._compact_due or self._should_compact()
+        return True
+
+    def _drop_live(self, name: str):
+        old = self._index.pop(name, None)
+        if old:
+            self._live_bytes -= _HEADER.size + len(name.encode('utf-8')) + old[2]
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """name -> (mtime_ns, size) for every note (note source interface)."""
+        with self._lock:
+            return {name: (mtime_ns, body_len) for name, (_, _, body_len, mtime_ns) in self._index.items()}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    # ─── Maintenance ─────────────────────────────────────
+
+    def dead_ratio(self) -> float:
+        return 1 - self._live_bytes / self._total_bytes if self._total_bytes else 0.0
+
+    def _should_compact(self) -> bool:
+        """At least compact_ratio of the journal is overwritten or deleted notes."""
+        return self._total_bytes >= self.segment_bytes // 4 and self.dead_ratio() >= self.compact_ratio
+
+    def maybe_compact(self) -> bool:
+        """Compact now if enough of the journal is dead."""
+        if self._should_compact():
+            self.compact()
+            return True
+        return False
+
+    def maintain(self) -> bool:
+        """Run a compaction a delete marked as due (called from a background thread)."""
+        if not self._compact_due:
+            return False
+        self._compact_due = False
+        return self.maybe_compact()
+
+    def compact(self):
+        """Rewrite live notes into new segments and remove the old ones."""
+        with self._lock:
+            started = time.perf_counter()
+            old_segments = self._segments()
+            if self._active:
+                self._active[1].close()
+            # Start a fresh segment after the existing ones
+            next_seg = (old_segments[-1] + 1) if old_segments else 1
+            self._active = (next_seg, open(self._segment_path(next_seg), 'ab'))
+
+            before = self._total_bytes
+            live = sorted(self._index.items(), key=lambda item: (item[1][0], item[1][1]))
+            self._total_bytes = 0
+            new_index = {}
+            for name, (seg, body_off, body_len, mtime_ns) in live:
+                body = bytes(self._view(seg, body_off + body_len)[body_off:body_off + body_len])
+                new_seg, new_off = self._append(_PUT, name, body, mtime_ns)
+                new_index[name] = (new_seg, new_off, body_len, mtime_ns)
+            self._active[1].flush()
+            os.fsync(self._active[1].fileno())
+
+            self._index = new_index
+            self._live_bytes = self._total_bytes
+            # Maps must be closed before the files can be removed (Windows)
+            self._close_maps(old_segments)
+            for seg in old_segments:
+                self._segment_path(seg).unlink()
+
+        print(f"[NOTES] Journal compacted: {before:,} -> {self._total_bytes:,} bytes "
+              f"({time.perf_counter() - started:.2f}s)")
+
+    def export_markdown(self, dest_dir: Path) -> int:
+        """Write every note out as its own markdown file. Returns the number written."""
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            entries = list(self.scan().items())
+        for name, (mtime_ns, _) in entries:
+            path = dest_dir / name
+            path.write_text(self.get(name), encoding='utf-8')
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+        return len(entries)
+
+    def import_markdown(self, src_dir: Path) -> int:
+        """Append every markdown file in a directory as a note. Returns the number imported."""
+        count = 0
+        with os.scandir(src_dir) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.name.endswith('.md') and entry.is_file():
+                    content = Path(entry.path).read_text(encoding='utf-8', errors='replace')
+                    self.put(entry.name, content, entry.stat().st_mtime_ns)
+                    count += 1
+        return count
+
+    def close(self):
+        with self._lock:
+            if self._active:
+                self._active[1].close()
+                self._active = None
+            self._close_maps()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS notes journal maintenance')
+    parser.add_argument('command', choices=['import', 'export', 'compact'])
+    parser.add_argument('directory', nargs='?', default=str(NOTES_DIR))
+    args = parser.parse_args()
+
+    journal = NotesJournal()
+    try:
+        if args.command == 'import':
+            print(f"Imported {journal.import_markdown(Path(args.directory))} notes.")
+        elif args.command == 'export':
+            print(f"Exported {journal.export_markdown(Path(args.directory))} notes to {args.directory}")
+        else:
+            journal.compact()
+    finally:
+        journal.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+JARVIS v1.0 — Usage Pattern Model
+Time-decayed weekly histograms (7 days × 24 hours) per task type.
+Answers "what does the user usually do around now?" with a single
+vectorized lookup instead of a SQL scan.
+"""
+
+import math
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+SLOTS = 7 * 24  # weekday × hour, Monday 00:00 first
+
+# Neighbouring hours also count towards a slot. Slot arithmetic is modulo
+# SLOTS, so this wraps around midnight and from Sunday night into Monday.
+_SMOOTHING = ((-1, 0.5), (0, 1.0), (1, 0.5))
+
+
+def slot_of(when: datetime) -> int:
+    return when.weekday() * 24 + when.hour
+
+
+class PatternModel:
+    """
+    Exponentially decayed usage histograms, one row per task type.
+
+    Uses forward decay: each new event is weighted by exp(rate * (t - ref))
+    instead of shrinking every stored count, so an update touches a single
+    cell. Stored weights are rescaled to the current time on read, and the
+    reference point is moved forward before the weights can overflow.
+    """
+
+    def __init__(self, store, half_life_days: float = 14.0):
+        self.store = store  # MemoryBackend holding the rows and the reference time
+        self.rate = math.log(2) / (half_life_days * 86400)
+        self._lock = threading.Lock()
+        self._tasks: List[str] = []
+        self._rows: dict = {}
+        self._hist = np.zeros((0, SLOTS), dtype=np.float64)
+        self._ref = time.time()
+        self._load()
+
+    # ─── Persistence ─────────────────────────────────────
+
+    def _load(self):
+        """Load all histograms once; seed from the raw pattern counts on first run."""
+        ref = self.store.get_state('pattern_ref')
+        rows = self.store.load_pattern_rows()
+        legacy = [] if rows or ref else self.store.pattern_counts()
+
+        if ref:
+            self._ref = float(ref)
+        for task, blob in rows:
+            idx = self._row(task)
+            self._hist[idx] = np.frombuffer(blob, dtype=np.float32)
+
+        if legacy:
+            for task, hour, weekday, count in legacy:
+                if hour is not None and weekday is not None:
+                    idx = self._row(task)
+                    self._hist[idx, weekday * 24 + hour] += count
+            self._save_all()
+            print(f"[PATTERNS] Seeded model from {len(legacy)} recorded patterns.")
+        elif not ref:
+            # Stored weights are only meaningful against the reference they were written with
+            self.store.set_state('pattern_ref', repr(self._ref))
+
+    def _save_all(self):
+        with self._lock:
+            rows = [(task, self._hist[i].astype(np.float32).tobytes()) for i, task in enumerate(self._tasks)]
+            ref = self._ref
+        self.store.save_pattern_rows(rows, state={'pattern_ref': repr(ref)})
+
+    def _row(self, task: str) -> int:
+        """Row index for a task, growing the matrix for unseen tasks."""
+        idx = self._rows.get(task)
+        if idx is None:
+            idx = len(self._tasks)
+            self._tasks.append(task)
+            self._rows[task] = idx
+            self._hist = np.vstack([self._hist, np.zeros((1, SLOTS))])
+        return idx
+
+    # ─── Updates ─────────────────────────────────────────
+
+    def record(self, task: str, when: Optional[datetime] = None):
+        """Add one occurrence of a task. Persists only the changed row."""
+        when = when or datetime.now()
+        now = when.timestamp()
+        with self._lock:
+            rebased = math.exp(self.rate * (now - self._ref)) > 1e12
+            if rebased:
+                self._rebase(now)
+            idx = self._row(task)
+            self._hist[idx, slot_of(when)] += math.exp(self.rate * (now - self._ref))
+            blob = self._hist[idx].astype(np.float32).tobytes()
+            ref = self._ref
+
+        if rebased:
+            self._save_all()  # Every row was rescaled
+            return
+        self.store.save_pattern_rows([(task, blob)], state={'pattern_ref': repr(ref)})
+
+    def _rebase(self, now: float):
+        """Move the reference time forward, scaling stored weights to match."""
+        self._hist *= math.exp(-self.rate * (now - self._ref))
+        self._ref = now
+
+    def clear(self):
+        with self._lock:
+            self._tasks, self._rows = [], {}
+            self._hist = np.zeros((0, SLOTS), dtype=np.float64)
+            self._ref = time.time()
+        self.store.clear_pattern_rows()
+
+    # ─── Queries ─────────────────────────────────────────
+
+    def _scale(self, now: float) -> float:
+        """Factor that turns stored weights into decayed counts as of `now`."""
+        return math.exp(-self.rate * (now - self._ref))
+
+    def top_k(self, when: Optional[datetime] = None, k: int = 5) -> List[Tuple[str, float]]:
+        """Most likely tasks around the given time, as (task, decayed score)."""
+        when = when or datetime.now()
+        with self._lock:
+            if not self._tasks:
+                return []
+            slot = slot_of(when)
+            scores = sum(w * self._hist[:, (slot + offset) % SLOTS] for offset, w in _SMOOTHING)
+            scores = scores * self._scale(when.timestamp())
+            tasks = list(self._tasks)
+
+        order = np.argsort(-scores)[:k]
+        return [(tasks[i], round(float(scores[i]), 2)) for i in order if scores[i] > 0.01]
+
+    def totals(self, k: int = 10) -> List[Tuple[str, float]]:
+        """Overall most frequent tasks, with recency decay applied."""
+        with self._lock:
+            if not self._tasks:
+                return []
+            scores = self._hist.sum(axis=1) * self._scale(time.time())
+            tasks = list(self._tasks)
+
+        order = np.argsort(-scores)[:k]
+        return [(tasks[i], round(float(scores[i]), 2)) for i in order if scores[i] > 0.01]
+
+    def histogram(self, task: str) -> Optional[np.ndarray]:
+        """Decayed 7×24 histogram for one task (rows are weekdays)."""
+        with self._lock:
+            idx = self._rows.get(task)
+            if idx is None:
+                return None
+            return (self._hist[idx] * self._scale(time.time())).reshape(7, 24)
@@ -23,9 +23,8 @@ class ProactiveEngine:
         self._last_check_date = None
 
     def get_daily_patterns(self) -> list:
-        """What does the user usually do at this time of day?"""
-        hour = datetime.now().hour
-        return self.memory.get_patterns(hour)
+        """What does the user usually do at this time of day (and day of week)?"""
+        return self.memory.get_likely_tasks(datetime.now())
 
     def generate_morning_brief(self) -> str:
         """Create a personalized morning briefing."""
@@ -0,0 +1,109 @@
+"""
+JARVIS v1.0 — Profile Registry
+Keeps one Memory per user profile so a shared machine never mixes
+people's facts and conversations. Profiles are opened on demand, at most
+MAX_OPEN_PROFILES stay open, and idle ones are closed in the background.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List
+
+from config import (
+    DEFAULT_PROFILE,
+    MAX_OPEN_PROFILES,
+    PROFILE_IDLE_SECONDS,
+)
+from memory import Memory, known_profiles, normalize_profile_id
+
+
+class ProfileRegistry:
+    """Bounded, least-recently-used set of open per-profile memories."""
+
+    def __init__(self, active_profile: str = DEFAULT_PROFILE,
+                 max_open: int = MAX_OPEN_PROFILES, idle_seconds: int = PROFILE_IDLE_SECONDS):
+        self.max_open = max(1, max_open)
+        self.idle_seconds = idle_seconds
+        self._open: OrderedDict = OrderedDict()   # profile_id -> (Memory, last_used)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[Memory], None]] = []
+        self.active_id = normalize_profile_id(active_profile)
+        self.get(self.active_id)
+
+        self._running = True
+        self._reaper = threading.Thread(target=self._reap_loop, daemon=True)
+        self._reaper.start()
+
+    @property
+    def active(self) -> Memory:
+        return self.get(self.active_id)
+
+    def get(self, profile_id: str) -> Memory:
+        """Return the Memory for a profile, opening it if needed."""
+        profile_id = normalize_profile_id(profile_id)
+        evicted = []
+        with self._lock:
+            entry = self._open.pop(profile_id, None)
+            memory = entry[0] if entry else None
+            if memory is None:
+                memory = Memory(profile_id)
+            self._open[profile_id] = (memory, time.monotonic())
+
+            # Close the least recently used profiles, never the active one
+            for pid in list(self._open):
+                if len(self._open) <= self.max_open:
+                    break
+                if pid not in (self.active_id, profile_id):
+                    evicted.append(self._open.pop(pid)[0])
+
+        for old in evicted:
+            old.close()
+        return memory
+
+    def switch(self, profile_id: str) -> Memory:
+        """Make a profile the active one and notify listeners (executor, proactive engine)."""
+        memory = self.get(profile_id)
+        self.active_id = memory.profile_id
+        for listener in self._listeners:
+            try:
+                listener(memory)
+            except Exception as e:
+                print(f"[PROFILES] Listener error: {e}")
+        print(f"[PROFILES] Active profile: {self.active_id}")
+        return memory
+
+    def on_switch(self, callback: Callable[[Memory], None]):
+        """Register a callback that receives the new active Memory after a switch."""
+        self._listeners.append(callback)
+
+    def list_profiles(self) -> List[str]:
+        """All profiles that have stored memory, open or not."""
+        return known_profiles()
+
+    def open_profiles(self) -> List[str]:
+        with self._lock:
+            return list(self._open)
+
+    def _reap_loop(self):
+        """Close profiles that have been idle for too long."""
+        while self._running:
+            time.sleep(min(60, max(1, self.idle_seconds // 4)))
+            cutoff = time.monotonic() - self.idle_seconds
+            with self._lock:
+                idle = [
+                    pid for pid, (_, last_used) in self._open.items()
+                    if last_used < cutoff and pid != self.active_id
+                ]
+                closed = [self._open.pop(pid)[0] for pid in idle]
+            for memory in closed:
+                memory.close()
+
+    def close_all(self):
+        """Close every open profile (used at shutdown)."""
+        self._running = False
+        with self._lock:
+            memories = [memory for memory, _ in self._open.values()]
+            self._open.clear()
+        for memory in memories:
+            memory.close()
@@ -0,0 +1,312 @@
+"""
+JARVIS v1.0 — Request Governor
+Keeps outbound search requests under what each provider tolerates, so a
+burst of questions slows down instead of getting every request refused.
+
+  - Token bucket per provider: SEARCH_BURST requests back to back, then
+    SEARCH_RATE per second
+  - When a provider throttles (HTTP 429, "rate limit" errors), the
+    whole provider pauses for a jittered, exponentially growing backoff
+    and its rate is halved; each success adds a little back, up to
+    SEARCH_RATE (additive increase, multiplicative decrease), so the
+    rate settles just under what the provider accepts
+  - Identical requests already in flight are coalesced: later callers
+    wait for the first one's result instead of sending their own
+  - Counters for requests, coalesced calls, throttles, retries, failures
+    and time spent waiting are available from metrics()
+
+Usage:
+  python request_governor.py --simulate [--requests 60] [--capacity 2.0]
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Hashable
+
+from config import (
+    SEARCH_BACKOFF_BASE,
+    SEARCH_BACKOFF_MAX,
+    SEARCH_BURST,
+    SEARCH_MAX_RETRIES,
+    SEARCH_QUEUE_TIMEOUT,
+    SEARCH_RATE,
+    SEARCH_RATE_MIN,
+)
+
+
+class RateLimited(Exception):
+    """The provider kept throttling (or no slot came free in time)."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} is rate limiting requests; retry in {retry_after:.0f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+_RATE_LIMIT_TEXT = re.compile(r'rate\s*limit|too many requests', re.IGNORECASE)
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """
+    HTTP 429, or a provider exception that says it is a rate limit (e.g.
+    ddgs' RatelimitException). A bare "429" in a message (a port, an id, a
+    byte count) doesn't count.
+    """
+    response = getattr(exc, 'response', None)
+    if 429 in (getattr(response, 'status_code', None), getattr(exc, 'status_code', None), getattr(exc, 'status', None)):
+        return True
+    return bool(_RATE_LIMIT_TEXT.search(f"{type(exc).__name__} {exc}"))
+
+
+def _retry_after(exc: Exception) -> float:
+    """Seconds from a Retry-After header, if the exception carries a response."""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# ─── Token Bucket ────────────────────────────────────────
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate can be lowered and raised, and paused outright."""
+
+    def __init__(self, rate: float, burst: int, min_rate: float = SEARCH_RATE_MIN):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self, timeout: float = SEARCH_QUEUE_TIMEOUT) -> float:
+        """
+        Take one token, waiting for it if needed. Returns the seconds waited,
+        or -1 if no token would be available within the timeout.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return now - started
+                    wait = (1 - self.tokens) / self.rate
+            if now + wait > deadline:
+                return -1
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hand out nothing for a while and start empty afterwards (the provider just throttled us)."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until = max(self._paused_until, until)
+            self.tokens = 0.0
+            self._updated = self._paused_until     # No refill while paused
+
+    def slow_down(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def speed_up(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def paused_for(self) -> float:
+        return max(0.0, self._paused_until - time.monotonic())
+
+
+# ─── Governor ────────────────────────────────────────────
+
+class RequestGovernor:
+    """Rate limiting, backoff and coalescing for one provider."""
+
+    def __init__(self, provider: str, rate: float = SEARCH_RATE, burst: int = SEARCH_BURST,
+                 max_retries: int = SEARCH_MAX_RETRIES, backoff_base: float = SEARCH_BACKOFF_BASE,
+                 backoff_max: float = SEARCH_BACKOFF_MAX, queue_timeout: float = SEARCH_QUEUE_TIMEOUT):
+        self.provider = provider
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._strikes = 0            # Throttles in a row; sets the backoff exponent
+        self._counters = dict.fromkeys(
+            ('requests', 'sent', 'coalesced', 'throttled', 'retries', 'failures', 'gave_up'), 0)
+        self._waited = 0.0
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self._counters[name] += n
+
+    def _throttled(self, exc: Exception) -> float:
+        """
+        Back off after a refusal: equal-jitter exponential delay (or the
+        provider's Retry-After if longer), and halve the rate. Refusals that
+        arrive while already backing off just wait out the current pause.
+        """
+        with self._lock:
+            self._counters['throttled'] += 1
+            if self.bucket and self.bucket.paused_for() > 0:
+                return self.bucket.paused_for()
+            self._strikes += 1
+            cap = min(self.backoff_max, self.backoff_base * 2 ** (self._strikes - 1))
+            delay = max(cap / 2 + random.uniform(0, cap / 2), min(_retry_after(exc), self.backoff_max))
+            if self.bucket:
+                self.bucket.slow_down()
+                self.bucket.pause(delay)
+        print(f"[SEARCH] {self.provider} is throttling; backing off {delay:.1f}s"
+              + (f" (rate now {self.bucket.rate:.2f}/s)" if self.bucket else ""))
+        return delay
+
+    def _send(self, fn: Callable, args: tuple, kwargs: dict):
+        for attempt in range(self.max_retries + 1):
+            if self.bucket:
+                waited = self.bucket.acquire(self.queue_timeout)
+                if waited < 0:
+                    self._count('gave_up')
+                    raise RateLimited(self.provider, max(self.bucket.paused_for(), 1 / self.bucket.rate))
+                with self._lock:
+                    self._waited += waited
+            self._count('sent')
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    self._count('failures')
+                    raise
+                delay = self._throttled(e)
+                if attempt == self.max_retries:
+                    self._count('gave_up')
+                    raise RateLimited(self.provider, delay) from e
+                self._count('retries')
+                if not self.bucket:
+                    time.sleep(delay)
+                continue
+            with self._lock:
+                self._strikes = 0
+            if self.bucket:
+                self.bucket.speed_up()
+            return result
+
+    def call(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        fn(*args, **kwargs) under the provider's limits. Calls with the same
+        key while one is in flight share its result (or its exception).
+        """
+        self._count('requests')
+        with self._lock:
+            pending = self._in_flight.get(key)
+            if pending is None:
+                future = self._in_flight[key] = Future()
+        if pending is not None:
+            self._count('coalesced')
+            return pending.result()
+
+        try:
+            result = self._send(fn, args, kwargs)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def retry_after(self) -> float:
+        """Seconds until the provider is expected to accept requests again (0 if not backing off)."""
+        return self.bucket.paused_for() if self.bucket else 0.0
+
+    def metrics(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['waited_seconds'] = round(self._waited, 2)
+        stats['rate'] = round(self.bucket.rate, 3) if self.bucket else None
+        stats['paused_for'] = round(self.retry_after(), 2)
+        return stats
+
+
+_governors: Dict[str, RequestGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_governor(provider: str, rate: float = SEARCH_RATE, burst: int = SEARCH_BURST) -> RequestGovernor:
+    """Process-wide governor for a provider (created with rate/burst on first use; rate=None: no bucket)."""
+    with _governors_lock:
+        if provider not in _governors:
+            _governors[provider] = RequestGovernor(provider, rate, burst)
+        return _governors[provider]
+
+
+# ─── Simulation ──────────────────────────────────────────
+
+def _simulate(requests: int, capacity: float, workers: int):
+    """A provider that throttles when sent more than `capacity` requests/second, hit ungoverned and governed."""
+    lock = threading.Lock()
+    sent = []
+
+    def provider(query):
+        with lock:
+            now = time.monotonic()
+            sent.append(now)
+            recent = sum(1 for t in sent if now - t < 1.0)
+        time.sleep(0.05)
+        if recent > capacity:
+            raise RuntimeError('202 Ratelimit')
+        return [query]
+
+    def run(label, call):
+        ok = 0
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(call, f"query {i % (requests // 2)}") for i in range(requests)]:
+                try:
+                    future.result()
+                    ok += 1
+                except Exception:
+                    pass
+        elapsed = time.monotonic() - started
+        print(f"{label:<11} {ok}/{requests} answered in {elapsed:.1f}s ({ok / elapsed:.2f}/s)")
+
+    run('ungoverned', provider)
+    sent.clear()
+    governor = RequestGovernor('simulated', rate=capacity * 2, burst=int(capacity) or 1,
+                               backoff_base=0.5, backoff_max=4.0, queue_timeout=60.0)
+    run('governed', lambda q: governor.call(q, provider, q))
+    print(governor.metrics())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Outbound request governor.')
+    parser.add_argument('--simulate', action='store_true', help='compare governed and ungoverned bursts')
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--capacity', type=float, default=2.0, help='simulated provider limit, requests/second')
+    parser.add_argument('--workers', type=int, default=12)
+    args = parser.parse_args()
+    if args.simulate:
+        _simulate(args.requests, args.capacity, args.workers)
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
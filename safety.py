@@ -2,119 +2,271 @@
 JARVIS v1.0 — Safety & Restrictions Module
 Prevents JARVIS from executing dangerous operations.
 This module is checked BEFORE any system command or file operation.
+
+The policy from config.py is compiled once at import, so the checks are
+cheap enough to run on every file touched by bulk operations:
+  - Blocked commands and the dangerous-command patterns are one regex
+    (the literal commands are folded into a prefix tree first)
+  - Protected and allowed directories are tries of path components
+  - Protected extensions are a frozenset
+  - Decisions are kept in an LRU cache (SAFETY_CACHE_SIZE); paths are
+    still resolved on every call, only each directory's resolution is
+    cached (call clear_cache() after moving or re-linking directories)
+  - Every validate_command / validate_file_operation decision, with the
+    rule that decided it, goes to the audit log (see safety_audit.py)
+
+Usage:
+  python safety.py --bench    (microbenchmark of the checks)
 """
 
+import argparse
 import os
 import re
+import sys
+import tempfile
+import time
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional, Tuple
 from config import (
     PROTECTED_PATHS,
     PROTECTED_EXTENSIONS,
     BLOCKED_COMMANDS,
     MAX_FILE_SIZE_BYTES,
     ALLOWED_WORK_DIRS,
+    SAFETY_CACHE_SIZE,
 )
+from safety_audit import get_audit_log
+
+DANGEROUS_PATTERNS = [
+    r'del\s+/[sfq]',           # del with force/quiet/subdirectory flags
+    r'rmdir\s+/[sq]',          # rmdir with force flags
+    r'format\s+[a-z]:',        # format any drive
+    r'>\s*\\\\',               # redirect to network paths
+    r'net\s+share',            # network share manipulation
+    r'wmic\s+os\s+delete',     # WMI OS deletion
+    r'powershell.*-enc',       # encoded PowerShell commands
+    r'cmd.*\/c.*del\s',        # nested cmd delete
+]
+
+READ_ONLY_COMMANDS = ("dir", "type", "echo", "findstr", "where", "systeminfo")
+
+_SEPARATORS = re.compile(r'[\\/]+')
+
+
+# ─── Policy Compilation ─────────────────────────────────
+
+def _literal_trie_regex(words) -> str:
+    """Regex matching any of the literal words, factored by common prefix (a|ab|ac -> a(?:|b|c))."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        if '' in node and len(node) == 1:
+            return ''
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+
+    return build(trie) if words else '(?!)'
+
+
+def _path_parts(path: str) -> list:
+    return _SEPARATORS.split(path.lower().rstrip('\\/'))
+
+
+class _PathTrie:
+    """
+    Path prefixes split into components. Matches exactly like the old
+    str.startswith() check on lowercased paths: every component must be
+    equal except the last, which only needs to be a prefix. match()
+    returns the configured path that matched.
+    """
+
+    def __init__(self, paths):
+        self.root = {}
+        for path in paths:
+            parts = _path_parts(path)
+            node = self.root
+            for part in parts[:-1]:
+                node = node.setdefault(part, {})
+            node.setdefault(None, {})[parts[-1]] = path     # None: last components, matched by prefix
+
+    def __bool__(self):
+        return bool(self.root)
+
+    def match(self, resolved: str) -> Optional[str]:
+        node = self.root
+        for part in _path_parts(resolved):
+            ends = node.get(None)
+            if ends:
+                for end, path in ends.items():
+                    if part.startswith(end):
+                        return path
+            node = node.get(part)
+            if node is None:
+                return None
+        return None
+
+
+_BLOCKED_LITERALS = frozenset(c.lower() for c in BLOCKED_COMMANDS)
+_COMMAND_RE = re.compile('|'.join([_literal_trie_regex(sorted(_BLOCKED_LITERALS))] + DANGEROUS_PATTERNS))
+_PROTECTED_IN_COMMAND_RE = re.compile(_literal_trie_regex(sorted({p.lower() for p in PROTECTED_PATHS})))
+_PROTECTED_TRIE = _PathTrie(PROTECTED_PATHS)
+_ALLOWED_TRIE = _PathTrie(ALLOWED_WORK_DIRS)
+_PROTECTED_EXTENSIONS = frozenset(e.lower() for e in PROTECTED_EXTENSIONS)
+
+
+@lru_cache(maxsize=SAFETY_CACHE_SIZE)
+def _resolve_dir(directory: str) -> str:
+    return os.path.realpath(directory)
+
+
+def _resolve(filepath: str) -> str:
+    """Same result as Path(filepath).resolve(), reusing the resolution of the parent directory."""
+    path = os.path.abspath(os.path.expanduser(filepath) if filepath.startswith('~') else filepath)
+    if os.path.islink(path):
+        return os.path.realpath(path)
+    directory, name = os.path.split(path)
+    return os.path.join(_resolve_dir(directory), name) if name else _resolve_dir(directory)
+
+
+def clear_cache():
+    """Forget cached directory resolutions and decisions."""
+    _resolve_dir.cache_clear()
+    _path_protected.cache_clear()
+    _path_allowed.cache_clear()
+    is_command_blocked.cache_clear()
+    _check_command.cache_clear()
+
+
+def _caller(depth: int = 2) -> str:
+    """'module.function' of whoever called the validate_* function."""
+    frame = sys._getframe(depth)
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+# ─── Checks ─────────────────────────────────────────────
+
+@lru_cache(maxsize=SAFETY_CACHE_SIZE)
+def _path_protected(resolved: str) -> Optional[str]:
+    return _PROTECTED_TRIE.match(resolved)
+
+
+@lru_cache(maxsize=SAFETY_CACHE_SIZE)
+def _path_allowed(resolved: str) -> bool:
+    return _ALLOWED_TRIE.match(resolved) is not None
 
 
 def is_path_protected(filepath: str) -> bool:
     """Check if a file path is in a protected directory."""
     try:
-        resolved = str(Path(filepath).resolve()).lower()
-        for protected in PROTECTED_PATHS:
-            if resolved.startswith(protected.lower()):
-                return True
-        return False
+        return _path_protected(_resolve(str(filepath))) is not None
     except Exception:
         return True  # If we can't resolve the path, treat it as protected
 
 
 def is_extension_protected(filepath: str) -> bool:
     """Check if a file has a protected extension."""
-    ext = Path(filepath).suffix.lower()
-    return ext in [e.lower() for e in PROTECTED_EXTENSIONS]
+    name = os.path.basename(str(filepath).rstrip('\\/'))
+    return os.path.splitext(name)[1].lower() in _PROTECTED_EXTENSIONS
 
 
 def is_path_in_allowed_dirs(filepath: str) -> bool:
     """Check if a path is within allowed working directories."""
-    if not ALLOWED_WORK_DIRS:
+    if not _ALLOWED_TRIE:
         return not is_path_protected(filepath)
     try:
-        resolved = str(Path(filepath).resolve()).lower()
-        for allowed in ALLOWED_WORK_DIRS:
-            if resolved.startswith(allowed.lower()):
-                return True
-        return False
+        return _path_allowed(_resolve(str(filepath)))
     except Exception:
         return False
 
 
+@lru_cache(maxsize=SAFETY_CACHE_SIZE)
 def is_command_blocked(command: str) -> bool:
     """Check if a command contains any blocked patterns."""
-    cmd_lower = command.lower().strip()
-    for blocked in BLOCKED_COMMANDS:
-        if blocked.lower() in cmd_lower:
-            return True
-    # Additional pattern checks
-    dangerous_patterns = [
-        r'del\s+/[sfq]',           # del with force/quiet/subdirectory flags
-        r'rmdir\s+/[sq]',          # rmdir with force flags
-        r'format\s+[a-z]:',        # format any drive
-        r'>\s*\\\\',               # redirect to network paths
-        r'net\s+share',            # network share manipulation
-        r'wmic\s+os\s+delete',     # WMI OS deletion
-        r'powershell.*-enc',       # encoded PowerShell commands
-        r'cmd.*\/c.*del\s',        # nested cmd delete
-    ]
-    for pattern in dangerous_patterns:
-        if re.search(pattern, cmd_lower):
-            return True
-    return False
-
-
-def validate_file_operation(operation: str, filepath: str) -> tuple[bool, str]:
+    return _COMMAND_RE.search(command.lower().strip()) is not None
+
+
+def validate_file_operation(operation: str, filepath: str, caller: str = None) -> tuple[bool, str]:
     """
     Validate a file operation before executing it.
-    Returns (is_safe, reason).
+    Returns (is_safe, reason). The decision is recorded in the audit log.
     """
-    if is_path_protected(filepath):
-        return False, f"BLOCKED: '{filepath}' is in a protected system directory."
+    is_safe, reason, rule = _check_file_operation(operation, filepath)
+    get_audit_log().record('file', operation, filepath, is_safe, rule, caller or _caller())
+    return is_safe, reason
+
+
+def _check_file_operation(operation: str, filepath: str) -> Tuple[bool, str, str]:
+    """(is_safe, reason, rule that decided it)."""
+    try:
+        resolved = _resolve(str(filepath))     # Resolved once for all the checks below
+        protected = _path_protected(resolved)
+    except Exception:
+        return False, f"BLOCKED: '{filepath}' is in a protected system directory.", 'unresolvable_path'
+    if protected:
+        return False, f"BLOCKED: '{filepath}' is in a protected system directory.", f'protected_path:{protected}'
 
     if operation in ("delete", "modify", "write"):
         if is_extension_protected(filepath):
-            return False, f"BLOCKED: Cannot {operation} files with extension '{Path(filepath).suffix}'."
+            suffix = Path(filepath).suffix
+            return (False, f"BLOCKED: Cannot {operation} files with extension '{suffix}'.",
+                    f'protected_extension:{suffix.lower()}')
+
+    # Not protected at this point, so an empty ALLOWED_WORK_DIRS allows it
+    allowed = _path_allowed(resolved) if _ALLOWED_TRIE else True
 
     if operation in ("write", "create", "modify"):
-        if not is_path_in_allowed_dirs(filepath):
-            return False, f"BLOCKED: '{filepath}' is outside allowed working directories."
+        if not allowed:
+            return False, f"BLOCKED: '{filepath}' is outside allowed working directories.", 'outside_allowed_dirs'
 
     if operation == "delete":
-        if not is_path_in_allowed_dirs(filepath):
-            return False, f"BLOCKED: Cannot delete files outside allowed directories."
+        if not allowed:
+            return False, f"BLOCKED: Cannot delete files outside allowed directories.", 'outside_allowed_dirs'
         # Never allow deleting directories recursively
         if os.path.isdir(filepath):
-            return False, "BLOCKED: Recursive directory deletion is not allowed. Delete files individually."
+            return (False, "BLOCKED: Recursive directory deletion is not allowed. Delete files individually.",
+                    'recursive_delete')
 
-    return True, "OK"
+    return True, "OK", 'ok'
 
 
-def validate_command(command: str) -> tuple[bool, str]:
+def validate_command(command: str, caller: str = None) -> tuple[bool, str]:
     """
     Validate a system command before executing it.
-    Returns (is_safe, reason).
+    Returns (is_safe, reason). The decision is recorded in the audit log.
     """
-    if is_command_blocked(command):
-        return False, f"BLOCKED: Command contains a restricted operation. Command: '{command}'"
+    is_safe, reason, rule = _check_command(command)
+    get_audit_log().record('command', 'run', command, is_safe, rule, caller or _caller())
+    return is_safe, reason
+
+
+@lru_cache(maxsize=SAFETY_CACHE_SIZE)
+def _check_command(command: str) -> Tuple[bool, str, str]:
+    """(is_safe, reason, rule that decided it)."""
+    blocked = _COMMAND_RE.search(command.lower().strip())
+    if blocked:
+        kind = 'blocked_command' if blocked.group(0) in _BLOCKED_LITERALS else 'dangerous_pattern'
+        return (False, f"BLOCKED: Command contains a restricted operation. Command: '{command}'",
+                f'{kind}:{blocked.group(0)}')
 
     # Check if command tries to access protected paths
     cmd_lower = command.lower()
-    for protected in PROTECTED_PATHS:
-        if protected.lower() in cmd_lower:
-            # Allow read-only operations on protected paths
-            read_only_cmds = ["dir", "type", "echo", "findstr", "where", "systeminfo"]
-            if not any(cmd_lower.strip().startswith(c) for c in read_only_cmds):
-                return False, f"BLOCKED: Command accesses protected path '{protected}'."
+    if _PROTECTED_IN_COMMAND_RE.search(cmd_lower):
+        protected = next(p for p in PROTECTED_PATHS if p.lower() in cmd_lower)
+        # Allow read-only operations on protected paths
+        if not cmd_lower.strip().startswith(READ_ONLY_COMMANDS):
+            return False, f"BLOCKED: Command accesses protected path '{protected}'.", f'protected_path:{protected}'
+        return True, "OK", f'read_only:{protected}'
 
-    return True, "OK"
+    return True, "OK", 'ok'
 
 
 def validate_file_size(content: str) -> tuple[bool, str]:
@@ -135,4 +287,49 @@ def get_safety_summary() -> str:
 • Max file size: {MAX_FILE_SIZE_BYTES // (1024*1024)} MB
 • Allowed work dirs: {', '.join(os.path.basename(d) for d in ALLOWED_WORK_DIRS)}
 • Recursive deletion: ALWAYS blocked
-"""
\ No newline at end of file
+"""
+
+
+# ─── Benchmark ──────────────────────────────────────────
+
+def _bench(label: str, func, inputs, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for item in inputs:
+            func(item)
+        best = min(best, time.perf_counter() - started)
+    print(f"  {label:<34} {best / len(inputs) * 1e6:8.2f} µs/call")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS safety policy.')
+    parser.add_argument('--bench', action='store_true', help='time the checks')
+    parser.add_argument('-n', type=int, default=20000, help='inputs per benchmark')
+    args = parser.parse_args()
+
+    if not args.bench:
+        print(get_safety_summary())
+        return
+
+    # Keep benchmark decisions out of the real audit log (but still pay for queueing them)
+    get_audit_log().db_path = Path(tempfile.mkdtemp()) / 'bench_audit.db'
+
+    home = os.path.expanduser('~')
+    paths = [os.path.join(home, 'Documents', f'project{i % 50}', f'file{i}.txt') for i in range(args.n)]
+    commands = [f'python script{i}.py --input data{i}.csv' for i in range(args.n)]
+    print(f"{args.n} distinct inputs each (cold), then the same inputs again (cached):")
+    for label, func, inputs in [
+        ('is_command_blocked', is_command_blocked, commands),
+        ('validate_command', validate_command, commands),
+        ('is_path_protected', is_path_protected, paths),
+        ('is_extension_protected', is_extension_protected, paths),
+        ("validate_file_operation('write')", lambda p: validate_file_operation('write', p), paths),
+    ]:
+        clear_cache()
+        _bench(label, func, inputs, repeat=1)
+        _bench(label + ' (cached)', func, inputs[:SAFETY_CACHE_SIZE])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+"""
+JARVIS v1.0 — Safety Audit Log
+Structured record of every validate_command / validate_file_operation
+decision: when, which caller, what operation on what target, the verdict
+and the rule that decided it.
+
+  - Recording only puts a tuple on an in-process queue; a daemon thread
+    writes batches to SQLite (one transaction per batch), so auditing
+    adds no disk I/O to the caller
+  - If the writer falls behind by SAFETY_AUDIT_QUEUE_MAX entries, new
+    entries are dropped and counted rather than blocking
+  - Entries older than SAFETY_AUDIT_RETENTION_DAYS are pruned by the
+    writer, so the table rotates instead of growing forever
+
+Usage:
+  python safety_audit.py denials [-n 20]
+  python safety_audit.py recent [-n 20]
+  python safety_audit.py stats
+"""
+
+import argparse
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from config import (
+    SAFETY_AUDIT_BATCH,
+    SAFETY_AUDIT_ENABLED,
+    SAFETY_AUDIT_FLUSH,
+    SAFETY_AUDIT_PATH,
+    SAFETY_AUDIT_QUEUE_MAX,
+    SAFETY_AUDIT_RETENTION_DAYS,
+)
+
+_PRUNE_INTERVAL = 3600   # Seconds between retention passes
+
+
+class AuditLog:
+    """Append-only SQLite audit table fed through a non-blocking queue."""
+
+    def __init__(self, db_path: Path = SAFETY_AUDIT_PATH, enabled: bool = SAFETY_AUDIT_ENABLED):
+        self.db_path = Path(db_path)
+        self.enabled = enabled
+        self.dropped = 0
+        self.running = False
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._pending = 0                    # Queued but not yet written
+        self._written = threading.Condition()
+        self._last_prune = 0.0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS audit (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    ts REAL NOT NULL,
+                    caller TEXT,
+                    kind TEXT NOT NULL,
+                    operation TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    allowed INTEGER NOT NULL,
+                    rule TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_audit_ts ON audit(ts);
+                CREATE INDEX IF NOT EXISTS idx_audit_denied ON audit(allowed, ts);
+            ''')
+
+    # ─── Recording ───────────────────────────────────────
+
+    def record(self, kind: str, operation: str, target: str, allowed: bool, rule: str = None,
+               caller: str = None):
+        """Queue one decision. Never blocks and never raises."""
+        if not self.enabled:
+            return
+        if not self.running:
+            self.start()
+        if self._queue.qsize() >= SAFETY_AUDIT_QUEUE_MAX:
+            self.dropped += 1
+            return
+        with self._written:
+            self._pending += 1
+        self._queue.put((time.time(), caller, kind, operation, str(target), int(allowed), rule))
+
+    def _write(self, batch: list):
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT INTO audit (ts, caller, kind, operation, target, allowed, rule) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                batch
+            )
+            if time.time() - self._last_prune > _PRUNE_INTERVAL:
+                conn.execute('DELETE FROM audit WHERE ts < ?', (time.time() - SAFETY_AUDIT_RETENTION_DAYS * 86400,))
+                self._last_prune = time.time()
+
+    def _loop(self):
+        try:
+            self._init_db()
+        except Exception as e:
+            print(f"[SAFETY] Audit log disabled: {e}")
+            self.enabled = False
+            self.running = False
+            return
+        while self.running or not self._queue.empty():
+            try:
+                batch = [self._queue.get(timeout=SAFETY_AUDIT_FLUSH)]
+            except queue.Empty:
+                continue
+            # Let a burst accumulate briefly, then write it in one transaction
+            deadline = time.monotonic() + SAFETY_AUDIT_FLUSH
+            while len(batch) < SAFETY_AUDIT_BATCH and time.monotonic() < deadline:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"[SAFETY] Audit write failed ({len(batch)} entries lost): {e}")
+            with self._written:
+                self._pending -= len(batch)
+                self._written.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been written."""
+        with self._written:
+            return self._written.wait_for(lambda: self._pending <= 0 or not self.running, timeout)
+
+    def start(self):
+        with self._start_lock:
+            if self.running:
+                return
+            self.running = True
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self.running = False
+        if self._thread:
+            self._thread.join(timeout=SAFETY_AUDIT_FLUSH * 3)
+
+    # ─── Queries ─────────────────────────────────────────
+
+    def _query(self, where: str = '', params: tuple = (), limit: int = 20) -> List[dict]:
+        if not self.db_path.exists():
+            return []
+        self.flush()
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT * FROM audit {where} ORDER BY ts DESC LIMIT ?',
+                                params + (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def recent(self, limit: int = 20) -> List[dict]:
+        return self._query(limit=limit)
+
+    def recent_denials(self, limit: int = 20, since: float = None) -> List[dict]:
+        """Most recent blocked decisions, newest first."""
+        if since is not None:
+            return self._query('WHERE allowed = 0 AND ts >= ?', (since,), limit)
+        return self._query('WHERE allowed = 0', (), limit)
+
+    def stats(self, since: float = None) -> dict:
+        if not self.db_path.exists():
+            return {'allowed': 0, 'denied': 0, 'dropped': self.dropped, 'top_rules': []}
+        self.flush()
+        since = since or 0.0
+        with self._connect() as conn:
+            allowed, denied = conn.execute(
+                'SELECT COALESCE(SUM(allowed), 0), COALESCE(SUM(1 - allowed), 0) FROM audit WHERE ts >= ?', (since,)
+            ).fetchone()
+            top = conn.execute(
+                'SELECT rule, COUNT(*) AS n FROM audit WHERE allowed = 0 AND ts >= ? GROUP BY rule ORDER BY n DESC LIMIT 5',
+                (since,)
+            ).fetchall()
+        return {'allowed': allowed, 'denied': denied, 'dropped': self.dropped,
+                'top_rules': [(row['rule'], row['n']) for row in top]}
+
+
+def format_entry(entry: dict) -> str:
+    when = datetime.fromtimestamp(entry['ts']).strftime('%Y-%m-%d %H:%M:%S')
+    verdict = 'ALLOWED' if entry['allowed'] else 'DENIED'
+    target = entry['target'] if len(entry['target']) <= 80 else entry['target'][:77] + '...'
+    return f"{when}  {verdict:<7}  {entry['operation']:<7} {target}  [{entry['rule'] or '-'}]  ({entry['caller'] or '?'})"
+
+
+_audit = None
+_audit_lock = threading.Lock()
+
+
+def get_audit_log() -> AuditLog:
+    """Process-wide audit log used by safety.py."""
+    global _audit
+    with _audit_lock:
+        if _audit is None:
+            _audit = AuditLog()
+            atexit.register(_audit.stop)
+        return _audit
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS safety audit log.')
+    parser.add_argument('command', choices=['denials', 'recent', 'stats'])
+    parser.add_argument('-n', type=int, default=20, help='entries to show')
+    args = parser.parse_args()
+
+    log = AuditLog()
+    if args.command == 'stats':
+        stats = log.stats()
+        print(f"Allowed: {stats['allowed']}  Denied: {stats['denied']}")
+        for rule, count in stats['top_rules']:
+            print(f"  {count:>6}  {rule}")
+        return
+    entries = log.recent_denials(args.n) if args.command == 'denials' else log.recent(args.n)
+    if not entries:
+        print("No entries.")
+    for entry in entries:
+        print(format_entry(entry))
+
+
+if __name__ == '__main__':
+    main()
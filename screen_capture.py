@@ -0,0 +1,219 @@
+"""
+JARVIS v1.0 — Screen Capture Engine
+One in-process capture engine shared by SystemHandler (screenshots) and
+VisionHandler (frames for the vision model).
+
+  - Captures with mss; the grabber is created once per thread and reused
+    (mss handles are thread-bound on Windows)
+  - Grabbing only copies raw BGRA pixels; conversion, resizing and
+    PNG/JPEG/WebP encoding run on a small thread pool
+  - Saving returns the target path immediately and writes the file in
+    the background; failed writes are logged
+  - The last SCREENSHOT_RING_SIZE frames (at most SCREENSHOT_RING_BYTES of
+    pixels) are kept in memory, so a caller can reuse a frame another
+    handler just captured
+"""
+
+import atexit
+import base64
+import io
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from config import (
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_QUALITY,
+    SCREENSHOT_RING_BYTES,
+    SCREENSHOT_RING_SIZE,
+    SCREENSHOT_WORKERS,
+    SCREENSHOTS_DIR,
+)
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_EXTENSIONS = {'PNG': '.png', 'JPEG': '.jpg', 'WEBP': '.webp'}
+
+
+class Frame:
+    """
+    One capture: BGRA pixels plus when and where it was taken. The pixels
+    are converted to RGB on first use and the raw buffer is then dropped,
+    so a frame never holds both.
+    """
+    __slots__ = ('timestamp', 'size', 'bgra', 'monitor', '_image', '_convert_lock')
+
+    def __init__(self, timestamp: float, size: Tuple[int, int], bgra: bytes, monitor: int):
+        self.timestamp = timestamp
+        self.size = size
+        self.bgra = bgra
+        self.monitor = monitor
+        self._image = None
+        self._convert_lock = threading.Lock()
+
+    def image(self) -> 'Image.Image':
+        """RGB PIL image (converted once, on first use)."""
+        with self._convert_lock:
+            if self._image is None:
+                self._image = Image.frombytes('RGB', self.size, self.bgra, 'raw', 'BGRX')
+                self.bgra = None
+            return self._image
+
+    @property
+    def nbytes(self) -> int:
+        """Pixel memory held by this frame."""
+        return len(self.bgra) if self.bgra is not None else self.size[0] * self.size[1] * 3
+
+
+def encode_image(img: 'Image.Image', fmt: str = SCREENSHOT_FORMAT, quality: int = SCREENSHOT_QUALITY) -> bytes:
+    """Encode a PIL image; PNG uses fast compression, JPEG/WebP use `quality`."""
+    fmt = fmt.upper()
+    buf = io.BytesIO()
+    if fmt == 'PNG':
+        img.save(buf, format='PNG', compress_level=1)
+    elif fmt == 'JPEG':
+        img.convert('RGB').save(buf, format='JPEG', quality=quality, optimize=False)
+    elif fmt == 'WEBP':
+        img.save(buf, format='WEBP', quality=quality, method=0)
+    else:
+        raise ValueError(f"Unsupported screenshot format: {fmt}")
+    return buf.getvalue()
+
+
+class ScreenCapture:
+    """Capture, encode and save screenshots without blocking the caller on encoding."""
+
+    def __init__(self, out_dir: Path = SCREENSHOTS_DIR, ring_size: int = SCREENSHOT_RING_SIZE,
+                 workers: int = SCREENSHOT_WORKERS, ring_bytes: int = SCREENSHOT_RING_BYTES):
+        if mss is None or Image is None:
+            raise RuntimeError("Screen capture needs the 'mss' and 'pillow' packages.")
+        self.out_dir = Path(out_dir)
+        self._local = threading.local()
+        self._grabbers = []             # Every thread's mss handle, closed by close()
+        self._frames = deque(maxlen=max(1, ring_size))
+        self._ring_bytes = ring_bytes
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='screenshot')
+
+    # ─── Capture ─────────────────────────────────────────
+
+    def _grabber(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            sct = self._local.sct = mss.mss()
+            with self._lock:
+                self._grabbers.append(sct)
+        return sct
+
+    def capture(self, monitor: int = 0) -> Frame:
+        """Grab the screen (0 = all monitors, 1 = primary, ...) and keep it in the ring buffer."""
+        sct = self._grabber()
+        shot = sct.grab(sct.monitors[monitor])
+        frame = Frame(time.time(), shot.size, bytes(shot.bgra), monitor)
+        with self._lock:
+            self._frames.append(frame)
+            # Full-resolution frames are large (about 33 MB at 4K); keep within the byte budget
+            while len(self._frames) > 1 and sum(f.nbytes for f in self._frames) > self._ring_bytes:
+                self._frames.popleft()
+        return frame
+
+    def latest(self, max_age: float = None) -> Optional[Frame]:
+        """Most recent frame, if any (and no older than max_age seconds)."""
+        with self._lock:
+            frame = self._frames[-1] if self._frames else None
+        if frame and max_age is not None and time.time() - frame.timestamp > max_age:
+            return None
+        return frame
+
+    def recent(self, n: int = None) -> List[Frame]:
+        """Frames in the ring buffer, newest first."""
+        with self._lock:
+            frames = list(self._frames)[::-1]
+        return frames[:n] if n else frames
+
+    # ─── Encoding ────────────────────────────────────────
+
+    def _encode(self, frame: Frame, fmt: str, quality: int, max_size: Tuple[int, int] = None) -> bytes:
+        img = frame.image()
+        if max_size:
+            img = img.copy()
+            img.thumbnail(max_size)
+        return encode_image(img, fmt, quality)
+
+    def encode(self, frame: Frame, fmt: str = SCREENSHOT_FORMAT, quality: int = SCREENSHOT_QUALITY,
+               max_size: Tuple[int, int] = None) -> Future:
+        """Encode a frame on the pool. Returns a Future with the bytes."""
+        return self._pool.submit(self._encode, frame, fmt, quality, max_size)
+
+    def save(self, frame: Frame = None, path: Path = None, fmt: str = SCREENSHOT_FORMAT,
+             quality: int = SCREENSHOT_QUALITY) -> Tuple[Path, Future]:
+        """
+        Write a frame (a fresh capture by default) to disk in the background.
+        Returns (path, Future) right away; the Future resolves to the path once written.
+        """
+        frame = frame or self.capture()
+        if path is None:
+            stamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(frame.timestamp))
+            millis = int(frame.timestamp * 1000) % 1000
+            path = self.out_dir / f"screenshot_{stamp}_{millis:03d}{_EXTENSIONS[fmt.upper()]}"
+        path = Path(path)
+
+        def write():
+            data = self._encode(frame, fmt, quality)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(path.suffix + '.tmp')
+            tmp.write_bytes(data)
+            tmp.replace(path)
+            return path
+
+        def report(future: Future):
+            if future.exception() is not None:
+                print(f"[SCREEN] Could not save {path}: {future.exception()}")
+
+        written = self._pool.submit(write)
+        written.add_done_callback(report)
+        return path, written
+
+    def b64(self, max_size: Tuple[int, int] = None, fmt: str = 'JPEG', quality: int = SCREENSHOT_QUALITY,
+            max_age: float = 0.0) -> str:
+        """Base64 image of the screen, reusing a frame no older than max_age seconds."""
+        frame = (self.latest(max_age) if max_age else None) or self.capture()
+        return base64.b64encode(self.encode(frame, fmt, quality, max_size).result()).decode()
+
+    def close(self):
+        """Finish pending writes and release every thread's mss handle."""
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            grabbers, self._grabbers = self._grabbers, []
+            self._local = threading.local()
+            self._frames.clear()
+        for sct in grabbers:
+            try:
+                sct.close()
+            except Exception:
+                pass            # Handles bound to an exited thread may refuse; the process is ending
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_capture_engine() -> ScreenCapture:
+    """Process-wide engine, so every handler shares one pool and one frame ring."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ScreenCapture()
+            atexit.register(_engine.close)
+        return _engine
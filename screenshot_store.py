@@ -0,0 +1,369 @@
+"""
+JARVIS v1.0 — Screenshot Store
+Managed storage for data/screenshots so it stops growing without bound.
+
+  - Every screenshot gets a 64-bit difference hash (dHash). An automatic
+    capture within SCREENSHOT_DEDUP_DISTANCE bits of a recent one, whose
+    pixels also match it, is treated as the same screen and not written
+    again; screenshots the user asks for are always saved
+  - A SQLite index (time, hash, source, size, format, tier) answers
+    "show my last screenshot" without listing the directory
+  - Maintenance recompresses screenshots as they age (lossless PNG ->
+    high-quality WebP -> smaller downscaled JPEG, see SCREENSHOT_TIERS)
+    and enforces the age and total-size limits, oldest first
+  - Screenshots already in the folder that aren't indexed yet (older
+    JARVIS versions) are adopted on the first maintenance pass
+
+Usage:
+  python screenshot_store.py maintain    (recompress + enforce retention now)
+  python screenshot_store.py list
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from config import (
+    SCREENSHOT_DEDUP_DISTANCE,
+    SCREENSHOT_DEDUP_PIXELS,
+    SCREENSHOT_DEDUP_WINDOW,
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_INDEX_PATH,
+    SCREENSHOT_MAINTENANCE_INTERVAL,
+    SCREENSHOT_MAX_AGE_DAYS,
+    SCREENSHOT_MAX_BYTES,
+    SCREENSHOT_TIERS,
+    SCREENSHOTS_DIR,
+)
+from screen_capture import encode_image, get_capture_engine
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+_IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.webp'}
+_SUFFIX_FORMATS = {'.png': 'PNG', '.jpg': 'JPEG', '.jpeg': 'JPEG', '.webp': 'WEBP'}
+
+
+def dhash(img: 'Image.Image') -> int:
+    """64-bit difference hash: is each pixel brighter than its right neighbour (9x8 grayscale)?"""
+    small = np.asarray(img.resize((9, 8), Image.BILINEAR).convert('L'), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def same_pixels(a: 'Image.Image', b: 'Image.Image') -> bool:
+    """Full-resolution check behind a dHash match: at most SCREENSHOT_DEDUP_PIXELS visibly differ."""
+    if a.size != b.size:
+        return False
+    diff = np.abs(np.asarray(a.convert('L'), dtype=np.int16) - np.asarray(b.convert('L'), dtype=np.int16))
+    return int(np.count_nonzero(diff > 24)) <= SCREENSHOT_DEDUP_PIXELS
+
+
+def _to_db(h: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def _from_db(h: int) -> int:
+    return h + (1 << 64) if h < 0 else h
+
+
+class ScreenshotStore:
+    """Deduplicated, indexed, size-bounded screenshot folder."""
+
+    def __init__(self, shots_dir: Path = SCREENSHOTS_DIR, db_path: Path = SCREENSHOT_INDEX_PATH):
+        self.shots_dir = Path(shots_dir)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.running = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pending = {}      # path -> (dHash, taken_at, source, image) of screenshots still being written
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS screenshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path TEXT UNIQUE NOT NULL,
+                    taken_at REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    dhash INTEGER NOT NULL,
+                    source TEXT NOT NULL DEFAULT 'user',
+                    width INTEGER,
+                    height INTEGER,
+                    bytes INTEGER NOT NULL DEFAULT 0,
+                    format TEXT NOT NULL,
+                    tier INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS idx_screenshots_taken ON screenshots(taken_at);
+            ''')
+
+    # ─── Capture ─────────────────────────────────────────
+
+    def add(self, frame=None, source: str = 'user', path: Path = None, wait: bool = False,
+            dedup: bool = False) -> dict:
+        """
+        Store a frame (a fresh capture by default).
+        dedup=True is for automatic captures: a frame that matches a recent
+        screenshot is not written again, and that screenshot's record is
+        returned with 'duplicate' set. Screenshots the user asks for always
+        get their own file.
+        The file is written in the background and indexed once it is on disk;
+        wait=True blocks until then and raises if the write failed.
+        """
+        engine = get_capture_engine()
+        frame = frame or engine.capture()
+        img = frame.image()
+        h = dhash(img)
+
+        with self._lock:
+            if dedup:
+                shot = self._find_duplicate(img, h, frame.timestamp)
+                if shot:
+                    return shot
+            target, written = engine.save(frame, path)
+            self._pending[str(target)] = (h, frame.timestamp, source, img)
+        indexed = Future()
+        written.add_done_callback(lambda fut: self._index_written(fut, str(target), frame, h, source, indexed))
+        if wait:
+            indexed.result()
+        return {'path': str(target), 'taken_at': frame.timestamp, 'source': source, 'duplicate': False}
+
+    def _find_duplicate(self, img: 'Image.Image', h: int, now: float) -> Optional[dict]:
+        """A recent screenshot with a close dHash and (confirmed pixel by pixel) the same content."""
+        for pending, (other, taken_at, source, other_img) in self._pending.items():
+            if hamming(h, other) <= SCREENSHOT_DEDUP_DISTANCE and same_pixels(img, other_img):
+                return {'path': pending, 'taken_at': taken_at, 'source': source, 'duplicate': True}
+        with self._connect() as conn:
+            recent = conn.execute(
+                'SELECT * FROM screenshots WHERE last_seen >= ? ORDER BY taken_at DESC',
+                (now - SCREENSHOT_DEDUP_WINDOW,)
+            ).fetchall()
+            for row in recent:
+                if hamming(h, _from_db(row['dhash'])) > SCREENSHOT_DEDUP_DISTANCE:
+                    continue
+                try:
+                    with Image.open(row['path']) as stored:
+                        if not same_pixels(img, stored):
+                            continue
+                except OSError:
+                    continue    # Gone or unreadable: not something to hand back
+                conn.execute('UPDATE screenshots SET last_seen = ? WHERE id = ?', (now, row['id']))
+                return dict(row, duplicate=True)
+        return None
+
+    def _index_written(self, fut, target: str, frame, h: int, source: str, indexed: Future):
+        """Index a screenshot once its file is written (a failed write leaves no row behind)."""
+        try:
+            if fut.exception() is not None:
+                indexed.set_exception(fut.exception())
+            else:
+                path = fut.result()
+                with self._connect() as conn:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO screenshots '
+                        '(path, taken_at, last_seen, dhash, source, width, height, bytes, format) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        (str(path), frame.timestamp, frame.timestamp, _to_db(h), source,
+                         frame.size[0], frame.size[1], path.stat().st_size, SCREENSHOT_FORMAT.upper())
+                    )
+                indexed.set_result(path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[SCREENSHOTS] Could not index {target}: {e}")
+            indexed.set_exception(e)
+        finally:
+            with self._lock:
+                self._pending.pop(target, None)
+
+    # ─── Queries ─────────────────────────────────────────
+
+    def latest(self, source: str = None) -> Optional[dict]:
+        """Most recent screenshot still on disk."""
+        for row in self.recent(5, source):
+            if Path(row['path']).exists():
+                return row
+        return None
+
+    def recent(self, limit: int = 10, source: str = None) -> List[dict]:
+        query = 'SELECT * FROM screenshots'
+        params = []
+        if source:
+            query += ' WHERE source = ?'
+            params.append(source)
+        query += ' ORDER BY taken_at DESC LIMIT ?'
+        params.append(limit)
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def between(self, start: float, end: float) -> List[dict]:
+        with self._connect() as conn:
+            rows = conn.execute('SELECT * FROM screenshots WHERE taken_at BETWEEN ? AND ? ORDER BY taken_at',
+                                (start, end)).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM screenshots').fetchone()
+        return {'count': count, 'bytes': total}
+
+    # ─── Maintenance ─────────────────────────────────────
+
+    def adopt_untracked(self) -> int:
+        """Index screenshots in the folder that the store doesn't know about yet."""
+        if not self.shots_dir.is_dir():
+            return 0
+        with self._connect() as conn:
+            known = {row[0] for row in conn.execute('SELECT path FROM screenshots')}
+        adopted = 0
+        for path in self.shots_dir.iterdir():
+            if path.suffix.lower() not in _IMAGE_SUFFIXES or str(path) in known:
+                continue
+            try:
+                with Image.open(path) as img:
+                    h, size = dhash(img), img.size
+                stat = path.stat()
+            except Exception:
+                continue
+            with self._connect() as conn:
+                conn.execute(
+                    'INSERT OR IGNORE INTO screenshots (path, taken_at, last_seen, dhash, source, width, height, bytes, format) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (str(path), stat.st_mtime, stat.st_mtime, _to_db(h), 'import', size[0], size[1],
+                     stat.st_size, _SUFFIX_FORMATS[path.suffix.lower()])
+                )
+            adopted += 1
+        return adopted
+
+    def recompress(self, now: float = None) -> int:
+        """Move screenshots into the compression tier their age calls for."""
+        now = now or time.time()
+        changed = 0
+        with self._connect() as conn:
+            rows = conn.execute('SELECT * FROM screenshots WHERE tier < ? AND taken_at <= ?',
+                                (len(SCREENSHOT_TIERS), now - SCREENSHOT_TIERS[0][0] * 86400)).fetchall()
+        for row in rows:
+            # Jump straight to the highest tier the screenshot's age qualifies for
+            age_days = (now - row['taken_at']) / 86400
+            tier = max(i for i, t in enumerate(SCREENSHOT_TIERS, start=1) if age_days >= t[0])
+            if tier <= row['tier']:
+                continue
+            _, fmt, quality, scale = SCREENSHOT_TIERS[tier - 1]
+            old = Path(row['path'])
+            new = old.with_suffix('.jpg' if fmt == 'JPEG' else f'.{fmt.lower()}')
+            try:
+                with Image.open(old) as img:
+                    img.load()
+                    if scale < 1:
+                        img = img.resize((max(1, int(img.width * scale)), max(1, int(img.height * scale))),
+                                         Image.BILINEAR)
+                    data = encode_image(img, fmt, quality)
+            except FileNotFoundError:
+                with self._connect() as conn:
+                    conn.execute('DELETE FROM screenshots WHERE id = ?', (row['id'],))
+                continue
+            except Exception as e:
+                print(f"[SCREENSHOTS] Could not recompress {old.name}: {e}")
+                continue
+            tmp = new.with_suffix(new.suffix + '.tmp')
+            tmp.write_bytes(data)
+            tmp.replace(new)
+            with self._connect() as conn:
+                conn.execute('UPDATE screenshots SET path = ?, bytes = ?, format = ?, tier = ? WHERE id = ?',
+                             (str(new), len(data), fmt, tier, row['id']))
+            if new != old:
+                old.unlink(missing_ok=True)
+            changed += 1
+        return changed
+
+    def enforce_retention(self, now: float = None) -> int:
+        """Delete screenshots past SCREENSHOT_MAX_AGE_DAYS, then oldest first until under SCREENSHOT_MAX_BYTES."""
+        now = now or time.time()
+        with self._connect() as conn:
+            rows = conn.execute('SELECT id, path, taken_at, bytes FROM screenshots ORDER BY taken_at').fetchall()
+        total = sum(row['bytes'] for row in rows)
+        doomed = []
+        for row in rows:
+            if row['taken_at'] < now - SCREENSHOT_MAX_AGE_DAYS * 86400 or total > SCREENSHOT_MAX_BYTES:
+                doomed.append(row)
+                total -= row['bytes']
+        for row in doomed:
+            Path(row['path']).unlink(missing_ok=True)
+        if doomed:
+            with self._connect() as conn:
+                conn.executemany('DELETE FROM screenshots WHERE id = ?', [(row['id'],) for row in doomed])
+        return len(doomed)
+
+    def maintain(self) -> dict:
+        started = time.perf_counter()
+        result = {
+            'adopted': self.adopt_untracked(),
+            'recompressed': self.recompress(),
+            'deleted': self.enforce_retention(),
+        }
+        if any(result.values()):
+            stats = self.stats()
+            print(f"[SCREENSHOTS] Maintenance: {result} -> {stats['count']} screenshots, "
+                  f"{stats['bytes'] / 1024**2:.1f} MB ({time.perf_counter() - started:.1f}s)")
+        return result
+
+    # ─── Background Thread ───────────────────────────────
+
+    def _loop(self):
+        while self.running:
+            try:
+                self.maintain()
+            except Exception as e:
+                print(f"[SCREENSHOTS] Maintenance error: {e}")
+            for _ in range(int(SCREENSHOT_MAINTENANCE_INTERVAL)):
+                if not self.running:
+                    return
+                time.sleep(1)
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS screenshot store maintenance')
+    parser.add_argument('command', choices=['maintain', 'list'])
+    args = parser.parse_args()
+
+    store = ScreenshotStore()
+    if args.command == 'maintain':
+        print(store.maintain())
+    else:
+        for row in store.recent(50):
+            taken = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row['taken_at']))
+            print(f"  {taken}  tier {row['tier']}  {row['bytes'] / 1024:8.0f} KB  {row['source']:7s}  {row['path']}")
+        stats = store.stats()
+        print(f"{stats['count']} screenshots, {stats['bytes'] / 1024**2:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
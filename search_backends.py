@@ -0,0 +1,147 @@
+"""
+JARVIS v1.0 — Search Backends
+Where SearchHandler gets raw web/news results from, selectable with
+SEARCH_BACKEND:
+  - "duckduckgo": DuckDuckGo via the ddgs (or legacy duckduckgo_search)
+                  package — free, no API key (default)
+  - "local":      canned results from a JSON file (SEARCH_FIXTURES), for
+                  tests and offline use; nothing leaves the machine
+  - "docs":       the offline index of documents on disk (see doc_index.py);
+                  SearchHandler also runs it next to the web backend
+
+Results are lists of dicts with 'title', 'body' and 'href' (news results
+may also carry 'date' and 'source'), as returned by ddgs.
+
+Fixture file format:
+  {"python release date": {"text": [{"title": ..., "body": ..., "href": ...}],
+                           "news": [...]}}
+Keys are normalized queries (see search_cache.normalize_query); a query
+with no exact entry gets every canned result sharing a word with it.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+
+from config import SEARCH_BACKEND, SEARCH_FIXTURES
+
+
+# ─── Interface ───────────────────────────────────────────
+
+class SearchBackend:
+    """Raw search provider. Methods may raise; SearchHandler logs and carries on."""
+
+    name = 'base'
+    available = True
+    rate_limited = True      # Outbound calls go through the provider's token bucket
+
+    def text(self, query: str, max_results: int = 5) -> List[dict]:
+        raise NotImplementedError
+
+    def news(self, query: str, max_results: int = 5) -> List[dict]:
+        raise NotImplementedError
+
+
+# ─── DuckDuckGo ──────────────────────────────────────────
+
+class DuckDuckGoBackend(SearchBackend):
+    name = 'duckduckgo'
+
+    def __init__(self):
+        self.available = False
+        try:
+            from ddgs import DDGS
+            self.ddgs = DDGS
+            self.available = True
+            print("[SEARCH] DuckDuckGo search ready.")
+        except ImportError:
+            try:
+                from duckduckgo_search import DDGS
+                self.ddgs = DDGS
+                self.available = True
+                print("[SEARCH] DuckDuckGo search ready (legacy package).")
+            except ImportError:
+                self.ddgs = None
+                print("[SEARCH] WARNING: No search package found. Run: pip install ddgs")
+
+    def text(self, query: str, max_results: int = 5) -> List[dict]:
+        with self.ddgs() as ddgs:
+            return list(ddgs.text(query, max_results=max_results))
+
+    def news(self, query: str, max_results: int = 5) -> List[dict]:
+        with self.ddgs() as ddgs:
+            return list(ddgs.news(query, max_results=max_results))
+
+
+# ─── Local Stand-in ──────────────────────────────────────
+
+class LocalSearchBackend(SearchBackend):
+    """Canned results from a dict or JSON file. Counts calls so tests can check caching."""
+
+    name = 'local'
+    rate_limited = False
+
+    def __init__(self, fixtures: Union[Dict, str, Path] = SEARCH_FIXTURES):
+        if isinstance(fixtures, dict):
+            self.fixtures = fixtures
+        else:
+            path = Path(fixtures)
+            self.fixtures = json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+        self.calls = 0
+
+    def _lookup(self, query: str, kind: str, max_results: int) -> List[dict]:
+        from search_cache import normalize_query
+        self.calls += 1
+        key = normalize_query(query)
+        if key in self.fixtures:
+            return list(self.fixtures[key].get(kind, []))[:max_results]
+        words = set(key.split())
+        matches = []
+        for entry in self.fixtures.values():
+            for result in entry.get(kind, []):
+                text = f"{result.get('title', '')} {result.get('body', '')}".lower()
+                if words & set(text.split()):
+                    matches.append(result)
+        return matches[:max_results]
+
+    def text(self, query: str, max_results: int = 5) -> List[dict]:
+        return self._lookup(query, 'text', max_results)
+
+    def news(self, query: str, max_results: int = 5) -> List[dict]:
+        return self._lookup(query, 'news', max_results)
+
+
+# ─── Documents on Disk ───────────────────────────────────
+
+class DocumentSearchBackend(SearchBackend):
+    """Results from the local document index; 'href' is the file path."""
+
+    name = 'docs'
+    rate_limited = False
+
+    def __init__(self, index=None):
+        from doc_index import DocumentIndex
+        self.index = index or DocumentIndex()
+        self.available = self.index.available
+        self.index.start()
+
+    def text(self, query: str, max_results: int = 5) -> List[dict]:
+        return self.index.search(query, limit=max_results)
+
+    def news(self, query: str, max_results: int = 5) -> List[dict]:
+        return []
+
+
+BACKENDS = {
+    'duckduckgo': DuckDuckGoBackend,
+    'local': LocalSearchBackend,
+    'docs': DocumentSearchBackend,
+}
+
+
+def create_search_backend(kind: str = None) -> SearchBackend:
+    """Build the configured search backend."""
+    kind = (kind or SEARCH_BACKEND).lower()
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown search backend '{kind}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[kind]()
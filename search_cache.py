@@ -0,0 +1,238 @@
+"""
+JARVIS v1.0 — Search Cache
+Two-level SQLite cache in front of web search, so a question asked again
+minutes later is answered instantly and without another request to the
+search provider.
+
+  - Raw results are keyed by (normalized query, kind) and expire after
+    SEARCH_CACHE_TTL (SEARCH_NEWS_TTL for news, which goes stale faster)
+  - Final summaries are keyed by (normalized query, hash of the results
+    they were written from): when expired results are fetched again and
+    come back unchanged, the old summary is still reused
+  - The cache is bounded by SEARCH_CACHE_MAX_BYTES; least recently used
+    entries are evicted first
+
+Usage:
+  python search_cache.py stats
+  python search_cache.py clear
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import List, Optional
+
+from config import SEARCH_CACHE_MAX_BYTES, SEARCH_CACHE_PATH, SEARCH_CACHE_TTL, SEARCH_NEWS_TTL
+
+# Phrasing that doesn't change what is being searched for
+# Only the request around a query is dropped; "google stock price" and
+# "tell me about rust" keep every word, since the provider gets the key verbatim
+_FILLER = re.compile(
+    r'^(?:(?:hey|ok|okay)\s+)?(?:jarvis|buddy)?\s*,?\s*(?:please\s+)?'
+    r'(?:(?:can|could)\s+you\s+)?(?:(?:search(?:\s+the\s+web)?|google)\s+for\b|look\s+up\b|'
+    r'find\s+information\s+(?:on|about)\b)?\s*'
+)
+# '+', '#' and '.' stay inside words: "c++", "c#", "3.13" and ".net" are different searches;
+# '-', ':' and '"' too, so exclusions, site: filters and phrases survive
+_PUNCTUATION = re.compile(r'[^\w\s+#.:"-]+')
+
+
+def normalize_query(query: str) -> str:
+    """
+    'Search for: Python 3.13 release date?' -> 'python 3.13 release date'.
+    This is both the cache key and the query sent to the provider.
+    """
+    text = unicodedata.normalize('NFKC', query).lower().strip()
+    text = _FILLER.sub('', text, count=1)
+    text = _PUNCTUATION.sub(' ', text)
+    text = re.sub(r'\bplease\b', ' ', text)
+    words = (word.rstrip('.:') for word in text.split())    # Sentence-ending periods, "topic: ..."
+    return ' '.join(word for word in words if re.search(r'\w', word))
+
+
+def results_hash(results: List[dict]) -> str:
+    """Stable hash of what a summary was written from (titles, snippets, links)."""
+    digest = hashlib.sha1()
+    for r in results:
+        for field in (r.get('title', ''), r.get('body', r.get('description', '')), r.get('href', r.get('url', ''))):
+            digest.update(str(field).encode('utf-8', 'replace'))
+            digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class SearchCache:
+    """Result and summary cache with TTLs and LRU eviction by size."""
+
+    def __init__(self, db_path: Path = SEARCH_CACHE_PATH, max_bytes: int = SEARCH_CACHE_MAX_BYTES):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._init_db()
+        self._total_bytes = self._stored_bytes()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS results (
+                    query TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    results TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    PRIMARY KEY (query, kind)
+                );
+                CREATE TABLE IF NOT EXISTS summaries (
+                    query TEXT NOT NULL,
+                    results_hash TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    PRIMARY KEY (query, results_hash)
+                );
+                CREATE INDEX IF NOT EXISTS idx_results_used ON results(last_used);
+                CREATE INDEX IF NOT EXISTS idx_summaries_used ON summaries(last_used);
+            ''')
+
+    def _stored_bytes(self) -> int:
+        with self._connect() as conn:
+            return sum(conn.execute(f'SELECT COALESCE(SUM(bytes), 0) FROM {table}').fetchone()[0]
+                       for table in ('results', 'summaries'))
+
+    @staticmethod
+    def ttl(kind: str) -> float:
+        return SEARCH_NEWS_TTL if kind == 'news' else SEARCH_CACHE_TTL
+
+    # ─── Results ─────────────────────────────────────────
+
+    def get_results(self, query: str, kind: str = 'text', stale_ok: bool = False) -> Optional[List[dict]]:
+        """Cached results for a query, or None if missing or expired (stale_ok: expired is fine too)."""
+        key = normalize_query(query)
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute('SELECT results, fetched_at FROM results WHERE query = ? AND kind = ?',
+                               (key, kind)).fetchone()
+            if row is None or (not stale_ok and now - row['fetched_at'] > self.ttl(kind)):
+                self.misses += 1
+                return None
+            conn.execute('UPDATE results SET last_used = ? WHERE query = ? AND kind = ?', (now, key, kind))
+        self.hits += 1
+        return json.loads(row['results'])
+
+    def put_results(self, query: str, kind: str, results: List[dict]):
+        key = normalize_query(query)
+        payload = json.dumps(results, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            old = conn.execute('SELECT bytes FROM results WHERE query = ? AND kind = ?', (key, kind)).fetchone()
+            conn.execute(
+                'INSERT OR REPLACE INTO results (query, kind, results, fetched_at, last_used, bytes) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, kind, payload, now, now, len(payload))
+            )
+            self._total_bytes += len(payload) - (old['bytes'] if old else 0)
+        self._evict_if_needed()
+
+    # ─── Summaries ───────────────────────────────────────
+
+    def get_summary(self, query: str, rhash: str) -> Optional[str]:
+        key = normalize_query(query)
+        with self._connect() as conn:
+            row = conn.execute('SELECT summary FROM summaries WHERE query = ? AND results_hash = ?',
+                               (key, rhash)).fetchone()
+            if row is None:
+                return None
+            conn.execute('UPDATE summaries SET last_used = ? WHERE query = ? AND results_hash = ?',
+                         (time.time(), key, rhash))
+        return row['summary']
+
+    def put_summary(self, query: str, rhash: str, summary: str):
+        key = normalize_query(query)
+        size = len(summary.encode('utf-8'))
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            old = conn.execute('SELECT bytes FROM summaries WHERE query = ? AND results_hash = ?',
+                               (key, rhash)).fetchone()
+            conn.execute(
+                'INSERT OR REPLACE INTO summaries (query, results_hash, summary, created_at, last_used, bytes) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, rhash, summary, now, now, size)
+            )
+            self._total_bytes += size - (old['bytes'] if old else 0)
+        self._evict_if_needed()
+
+    # ─── Eviction ────────────────────────────────────────
+
+    def _evict_if_needed(self):
+        """Drop expired results, then least recently used entries, until under 90% of max_bytes."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM results WHERE (kind = ? AND fetched_at < ?) OR (kind != ? AND fetched_at < ?)',
+                         ('news', now - SEARCH_NEWS_TTL, 'news', now - SEARCH_CACHE_TTL))
+            excess = sum(conn.execute(f'SELECT COALESCE(SUM(bytes), 0) FROM {table}').fetchone()[0]
+                         for table in ('results', 'summaries')) - target
+            if excess > 0:
+                rows = conn.execute('''
+                    SELECT 'results' AS tbl, rowid, bytes, last_used FROM results
+                    UNION ALL
+                    SELECT 'summaries', rowid, bytes, last_used FROM summaries
+                    ORDER BY last_used
+                ''').fetchall()
+                doomed = {'results': [], 'summaries': []}
+                for row in rows:
+                    if excess <= 0:
+                        break
+                    doomed[row['tbl']].append((row['rowid'],))
+                    excess -= row['bytes']
+                for table, ids in doomed.items():
+                    conn.executemany(f'DELETE FROM {table} WHERE rowid = ?', ids)
+        self._total_bytes = self._stored_bytes()
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM results')
+            conn.execute('DELETE FROM summaries')
+        self._total_bytes = 0
+
+    def stats(self) -> dict:
+        with self._connect() as conn:
+            results = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+            summaries = conn.execute('SELECT COUNT(*) FROM summaries').fetchone()[0]
+        return {'results': results, 'summaries': summaries, 'bytes': self._total_bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS search cache.')
+    parser.add_argument('command', choices=['stats', 'clear'])
+    args = parser.parse_args()
+    cache = SearchCache()
+    if args.command == 'clear':
+        cache.clear()
+        print("Search cache cleared.")
+        return
+    stats = cache.stats()
+    print(f"{stats['results']} cached searches, {stats['summaries']} summaries, "
+          f"{stats['bytes'] / 1024:.0f} KB of {cache.max_bytes / 1024 / 1024:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+JARVIS v1.0 — Summarizer
+Map-reduce summarization for inputs too long for one good prompt: search
+results with page excerpts, large files, a pile of notes.
+
+  - Short inputs get a single smart-model call (no reflection pass)
+  - Long inputs are cut into chunks of about SUMMARY_CHUNK_TOKENS on
+    paragraph/sentence boundaries; the fast model writes notes on each
+    chunk, SUMMARY_CONCURRENCY calls at a time, and one smart-model call
+    turns the notes into the answer
+  - If the notes are themselves too long they are condensed again first
+  - Every call carries an output budget (Ollama num_predict), so map
+    notes stay short and the final answer has a known ceiling
+
+With the chunks summarized side by side, wall-clock time grows with
+chunks / SUMMARY_CONCURRENCY rather than with the input length.
+
+Usage:
+  python summarizer.py FILE ["what to focus on"]
+"""
+
+import argparse
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from config import (
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_CONCURRENCY,
+    SUMMARY_DIRECT_TOKENS,
+    SUMMARY_MAP_TOKENS,
+    SUMMARY_MAX_INPUT_CHARS,
+    SUMMARY_REDUCE_TOKENS,
+    SYSTEM_PROMPT,
+)
+
+_CHARS_PER_TOKEN = 4
+_MAX_ROUNDS = 3          # Condensing passes before the notes go to the final call anyway
+_NOTHING = 'nothing relevant'
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+_MAP_SYSTEM = "You take short, faithful notes. Never invent facts that are not in the text."
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)."""
+    return (len(text) + _CHARS_PER_TOKEN - 1) // _CHARS_PER_TOKEN
+
+
+def chunk_text(text: str, chunk_tokens: int = SUMMARY_CHUNK_TOKENS) -> List[str]:
+    """
+    Split text into chunks of at most about chunk_tokens, breaking between
+    paragraphs where possible, then between sentences, then anywhere.
+    """
+    limit = max(1, chunk_tokens) * _CHARS_PER_TOKEN
+    pieces = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= limit:
+            if paragraph:
+                pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            while len(sentence) > limit:
+                pieces.append(sentence[:limit])
+                sentence = sentence[limit:]
+            if sentence:
+                pieces.append(sentence)
+
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        if current and size + len(piece) + 2 > limit:
+            chunks.append('\n\n'.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += len(piece) + 2
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+
+class Summarizer:
+    """Chunked, parallel summarization over a Brain's models."""
+
+    def __init__(self, brain, chunk_tokens: int = SUMMARY_CHUNK_TOKENS, concurrency: int = SUMMARY_CONCURRENCY,
+                 map_tokens: int = SUMMARY_MAP_TOKENS, reduce_tokens: int = SUMMARY_REDUCE_TOKENS,
+                 direct_tokens: int = SUMMARY_DIRECT_TOKENS):
+        self.brain = brain
+        self.chunk_tokens = chunk_tokens
+        self.map_tokens = map_tokens
+        self.reduce_tokens = reduce_tokens
+        self.direct_tokens = direct_tokens
+        self._pool = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='summarize')
+
+    def _call(self, model: str, prompt: str, system: str, max_tokens: int) -> str:
+        return self.brain._call_ollama(model, prompt, system, options={'num_predict': max_tokens})
+
+    # ─── Map ─────────────────────────────────────────────
+
+    def _notes(self, chunk: str, index: int, total: int, task: str) -> str:
+        prompt = f"""This is part {index} of {total} of a longer text.
+The full text will be used for this task: {task}
+
+Write brief notes on this part that help with that task. Keep names, numbers, dates
+and source numbers such as [2]. Use at most {self.map_tokens * 3 // 4} words.
+If nothing in this part is relevant, reply only with "{_NOTHING}".
+
+Part {index}:
+{chunk}"""
+        return self._call(self.brain.fast_model, prompt, _MAP_SYSTEM, self.map_tokens)
+
+    def _map(self, text: str, task: str) -> List[str]:
+        """
+        Notes on every chunk, in order; chunks that had nothing relevant are
+        left out. If every call failed, the list holds just the first error.
+        """
+        chunks = chunk_text(text, self.chunk_tokens)
+        futures = [self._pool.submit(self._notes, chunk, i, len(chunks), task)
+                   for i, chunk in enumerate(chunks, 1)]
+        notes, errors = [], []
+        for future in futures:
+            note = future.result()
+            if self.brain.is_error(note):
+                errors.append(note)
+            elif note.strip().strip('."').lower() != _NOTHING:
+                notes.append(note.strip())
+        print(f"[SUMMARY] {len(chunks)} chunks -> {len(notes)} notes"
+              + (f", {len(errors)} failed" if errors else ""))
+        if errors and len(errors) == len(chunks):
+            return errors[:1]
+        return notes
+
+    # ─── Reduce ──────────────────────────────────────────
+
+    def summarize(self, text: str, task: str = "Summarize this text.", context: str = '') -> str:
+        """
+        Carry out `task` (an instruction such as "Summarize this file" or
+        "Answer the question ...") over `text`, however long it is.
+        Returns the model's answer, or Brain's error message if the final call fails.
+        """
+        started = time.monotonic()
+        if len(text) > SUMMARY_MAX_INPUT_CHARS:
+            print(f"[SUMMARY] Input cut from {len(text)} to {SUMMARY_MAX_INPUT_CHARS} characters")
+            text = text[:SUMMARY_MAX_INPUT_CHARS]
+
+        label = "Text"
+        rounds = 0
+        while estimate_tokens(text) > self.direct_tokens and rounds < _MAX_ROUNDS:
+            notes = self._map(text, task)
+            if not notes:
+                return "I couldn't find anything relevant to summarize in that."
+            if self.brain.is_error(notes[0]):
+                return notes[0]
+            text = '\n\n'.join(notes)
+            label = "Notes taken from the text, in order"
+            rounds += 1
+
+        system = SYSTEM_PROMPT
+        if context:
+            system += f"\n\nRelevant context from memory:\n{context}"
+        prompt = f"{task}\n\n{label}:\n{text}"
+        summary = self._call(self.brain.smart_model, prompt, system, self.reduce_tokens)
+        print(f"[SUMMARY] Done in {time.monotonic() - started:.1f}s ({rounds} map rounds)")
+        return summary
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+
+
+def main():
+    from pathlib import Path
+    from brain import Brain
+
+    parser = argparse.ArgumentParser(description='Summarize a text file with the configured Ollama models.')
+    parser.add_argument('file')
+    parser.add_argument('focus', nargs='?', default='')
+    args = parser.parse_args()
+
+    text = Path(args.file).read_text(encoding='utf-8', errors='replace')
+    task = f"Summarize this text, focusing on: {args.focus}" if args.focus else "Summarize this text."
+    summarizer = Summarizer(Brain())
+    print(summarizer.summarize(text, task))
+    summarizer.close()
+
+
+if __name__ == '__main__':
+    main()
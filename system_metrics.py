@@ -0,0 +1,201 @@
+"""
+JARVIS v1.0 — System Metrics Sampler
+Background thread that samples CPU, RAM, disk, battery and per-process
+CPU/RSS at a fixed interval, so "system info" and "top processes" are
+answered instantly from the latest sample instead of blocking on
+psutil.cpu_percent(interval=1).
+
+  - System metrics live in fixed-size numpy ring buffers covering
+    METRICS_WINDOW_MINUTES, which gives 1/5/15-minute averages
+  - psutil.Process objects are kept between samples, so each process's
+    cpu_percent() measures the time since the previous sample (a fresh
+    Process always reports 0%)
+  - Per-process history is a short deque per pid; exited processes are
+    dropped on the next sample
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import METRICS_DISK_PATH, METRICS_INTERVAL, METRICS_WINDOW_MINUTES
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+METRICS = ('cpu', 'ram', 'disk', 'battery')
+
+
+class MetricsSampler:
+    """Rolling system and per-process metrics sampled on a daemon thread."""
+
+    def __init__(self, interval: float = METRICS_INTERVAL, window_minutes: float = METRICS_WINDOW_MINUTES,
+                 disk_path: str = METRICS_DISK_PATH):
+        self.interval = interval
+        self.disk_path = disk_path
+        self.capacity = max(2, int(window_minutes * 60 / interval) + 1)
+        self.running = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._times = np.zeros(self.capacity)
+        self._values = {name: np.full(self.capacity, np.nan) for name in METRICS}
+        self._pos = 0
+        self._count = 0
+        self._latest: dict = {}
+        self._procs: Dict[int, 'psutil.Process'] = {}
+        self._proc_history: Dict[int, deque] = {}
+        self._proc_names: Dict[int, str] = {}
+        self._cpu_count = (psutil.cpu_count() or 1) if psutil else 1
+        if psutil:
+            psutil.cpu_percent(interval=None)   # Prime: the first call always returns 0.0
+
+    # ─── Sampling ────────────────────────────────────────
+
+    def _sample_processes(self):
+        """CPU (share of the whole machine) and RSS of every process since the last sample."""
+        seen = set()
+        for proc in psutil.process_iter(['name']):
+            pid = proc.pid
+            seen.add(pid)
+            cached = self._procs.get(pid)
+            try:
+                if cached is None or self._proc_names[pid] != (proc.info['name'] or str(pid)):
+                    # New process (or a reused pid): the first reading only primes it
+                    self._procs[pid] = proc
+                    self._proc_names[pid] = proc.info['name'] or str(pid)
+                    self._proc_history[pid] = deque(maxlen=self.capacity)
+                    proc.cpu_percent(None)
+                    continue
+                with cached.oneshot():
+                    cpu = cached.cpu_percent(None) / self._cpu_count
+                    rss = cached.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            self._proc_history[pid].append((time.time(), cpu, rss))
+        for pid in set(self._procs) - seen:
+            self._procs.pop(pid, None)
+            self._proc_history.pop(pid, None)
+            self._proc_names.pop(pid, None)
+
+    def sample(self):
+        """Take one sample of every metric."""
+        if psutil is None:
+            return
+        now = time.time()
+        mem = psutil.virtual_memory()
+        latest = {
+            'time': now,
+            'cpu': psutil.cpu_percent(interval=None),
+            'ram': mem.percent,
+            'ram_used': mem.used,
+            'ram_total': mem.total,
+            'disk': float('nan'),
+            'battery': float('nan'),
+        }
+        try:
+            disk = psutil.disk_usage(self.disk_path)
+            latest.update(disk=disk.percent, disk_used=disk.used, disk_total=disk.total)
+        except OSError:
+            pass
+        try:
+            battery = psutil.sensors_battery()
+        except Exception:
+            battery = None
+        if battery:
+            latest.update(battery=battery.percent, plugged=battery.power_plugged)
+
+        with self._lock:
+            self._times[self._pos] = now
+            for name in METRICS:
+                self._values[name][self._pos] = latest[name]
+            self._pos = (self._pos + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._sample_processes()
+            self._latest = latest
+
+    # ─── Queries ─────────────────────────────────────────
+
+    def latest(self) -> dict:
+        """Most recent sample (sampled on the spot if the thread hasn't produced one yet)."""
+        if not self._latest:
+            time.sleep(0.2)   # CPU readings need some time since the priming call
+            self.sample()
+        return dict(self._latest)
+
+    def average(self, metric: str, minutes: float) -> Optional[float]:
+        """Mean of a metric over the last `minutes` (None without samples in that window)."""
+        with self._lock:
+            if not self._count:
+                return None
+            recent = self._times > time.time() - minutes * 60
+            values = self._values[metric][recent]
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if len(values) else None
+
+    def trend(self, metric: str) -> List[Optional[float]]:
+        """1/5/15-minute averages of a metric."""
+        return [self.average(metric, minutes) for minutes in (1, 5, 15)]
+
+    def change(self, metric: str, minutes: float) -> Optional[float]:
+        """Latest value minus the oldest value within the window (e.g. battery drain)."""
+        with self._lock:
+            recent = (self._times > time.time() - minutes * 60) & ~np.isnan(self._values[metric])
+            if recent.sum() < 2:
+                return None
+            times, values = self._times[recent], self._values[metric][recent]
+        order = np.argsort(times)
+        return float(values[order[-1]] - values[order[0]])
+
+    def top_processes(self, n: int = 5, minutes: float = 1) -> List[dict]:
+        """Processes by average CPU over the last `minutes`, with their current RSS."""
+        if self._count < 2:
+            # Right after startup: per-process CPU needs two readings to mean anything
+            self.sample()
+            time.sleep(0.5)
+            self.sample()
+        cutoff = time.time() - minutes * 60
+        rows = []
+        with self._lock:
+            for pid, history in self._proc_history.items():
+                if not history:
+                    continue
+                recent = [cpu for t, cpu, _ in history if t > cutoff] or [history[-1][1]]
+                rows.append({
+                    'pid': pid,
+                    'name': self._proc_names.get(pid, str(pid)),
+                    'cpu': sum(recent) / len(recent),
+                    'rss': history[-1][2],
+                })
+        rows.sort(key=lambda row: row['cpu'], reverse=True)
+        return rows[:n]
+
+    @property
+    def samples(self) -> int:
+        return self._count
+
+    # ─── Background Thread ───────────────────────────────
+
+    def _loop(self):
+        time.sleep(min(self.interval, 1.0))   # Let the primed CPU counters accumulate first
+        while self.running:
+            started = time.monotonic()
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"[SYSTEM] Metrics sample failed: {e}")
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        if self.running or psutil is None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
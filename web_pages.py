@@ -0,0 +1,270 @@
+"""
+JARVIS v1.0 — Web Pages
+Fetches the pages behind search results and picks the passages most
+relevant to the question, so the summarizer sees real content instead of
+two-line snippets.
+
+  - One pooled requests.Session (keep-alive, SEARCH_FETCH_WORKERS
+    connections) and a thread pool fetch pages concurrently
+  - Every fetch has a connect/read timeout, a byte cap and a shared
+    deadline; pages that miss the deadline are simply left out
+  - HTML is reduced to paragraphs with the stdlib HTMLParser (scripts,
+    styles, navigation, headers/footers and forms are skipped)
+  - Paragraphs are cut into passages and ranked against the question
+    with BM25; the best ones are returned within a character budget
+
+Any URL works, including a local http.server with canned pages.
+
+Usage:
+  python web_pages.py "question" URL [URL ...]
+"""
+
+import argparse
+import html
+import math
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from typing import Dict, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import (
+    SEARCH_CONTEXT_CHARS,
+    SEARCH_FETCH_DEADLINE,
+    SEARCH_FETCH_MAX_BYTES,
+    SEARCH_FETCH_TIMEOUT,
+    SEARCH_FETCH_WORKERS,
+    SEARCH_PASSAGE_WORDS,
+)
+
+_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) JARVIS/1.0'
+_SKIP_TAGS = {'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg', 'iframe', 'template'}
+_BLOCK_TAGS = {'p', 'div', 'li', 'br', 'tr', 'td', 'section', 'article', 'main', 'blockquote', 'pre',
+               'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'dd', 'dt', 'figcaption', 'table', 'ul', 'ol'}
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+_STOPWORDS = frozenset('''
+    a an and are as at be by for from has have how i in is it its of on or that the this to was
+    what when where which who why will with you your me my do does did can about
+'''.split())
+
+
+# ─── Text Extraction ─────────────────────────────────────
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.paragraphs: List[str] = []
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def _break(self):
+        text = ' '.join(''.join(self._current).split())
+        if text:
+            self.paragraphs.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title':
+            self._in_title = True
+        elif tag in _BLOCK_TAGS:
+            self._break()
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == 'title':
+            self._in_title = False
+        elif tag in _BLOCK_TAGS:
+            self._break()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._break()
+
+
+def extract_text(markup: str) -> Tuple[str, List[str]]:
+    """(title, paragraphs) of an HTML page."""
+    parser = _TextExtractor()
+    try:
+        parser.feed(markup)
+        parser.close()
+    except Exception:
+        parser._break()     # Malformed markup: keep whatever was parsed
+    return ' '.join(parser.title.split()), parser.paragraphs
+
+
+# ─── Passage Ranking ─────────────────────────────────────
+
+def _terms(text: str) -> List[str]:
+    return [w for w in re.findall(r'\w+', text.lower()) if w not in _STOPWORDS]
+
+
+def split_passages(paragraphs: List[str], words: int = SEARCH_PASSAGE_WORDS) -> List[str]:
+    """Group paragraphs into passages of about `words` words (long paragraphs are split)."""
+    passages, current, count = [], [], 0
+    for paragraph in paragraphs:
+        tokens = paragraph.split()
+        if len(tokens) < 4:
+            continue    # Menus, buttons, bylines
+        while len(tokens) > words:
+            passages.append(' '.join(tokens[:words]))
+            tokens = tokens[words:]
+        if count + len(tokens) > words and current:
+            passages.append(' '.join(current))
+            current, count = [], 0
+        current.extend(tokens)
+        count += len(tokens)
+    if current:
+        passages.append(' '.join(current))
+    return passages
+
+
+def rank_passages(query: str, passages: List[Tuple[int, str]], budget: int = SEARCH_CONTEXT_CHARS,
+                  k1: float = 1.2, b: float = 0.75) -> List[Tuple[int, str]]:
+    """
+    BM25-rank (source, passage) pairs against the query and keep the best
+    ones that fit in `budget` characters, skipping near-duplicates.
+    """
+    query_terms = set(_terms(query))
+    if not passages or not query_terms:
+        return []
+    docs = [Counter(_terms(text)) for _, text in passages]
+    lengths = [sum(doc.values()) for doc in docs]
+    avg_len = (sum(lengths) / len(lengths)) or 1.0
+    df = {term: sum(1 for doc in docs if term in doc) for term in query_terms}
+    n = len(docs)
+
+    scores = []
+    for i, doc in enumerate(docs):
+        score = 0.0
+        for term in query_terms:
+            tf = doc.get(term)
+            if tf:
+                idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[i] / avg_len))
+        scores.append(score)
+
+    chosen, used, seen = [], 0, []
+    for i in sorted(range(n), key=lambda i: scores[i], reverse=True):
+        if scores[i] <= 0:
+            break
+        source, text = passages[i]
+        if used + len(text) > budget:
+            continue
+        words = set(docs[i])
+        if any(len(words & other) > 0.8 * min(len(words), len(other)) for other in seen):
+            continue
+        chosen.append((source, text))
+        seen.append(words)
+        used += len(text)
+    return chosen
+
+
+# ─── Fetching ────────────────────────────────────────────
+
+class PageFetcher:
+    """Concurrent page fetching over one pooled HTTP session."""
+
+    def __init__(self, workers: int = SEARCH_FETCH_WORKERS, timeout: float = SEARCH_FETCH_TIMEOUT,
+                 max_bytes: int = SEARCH_FETCH_MAX_BYTES):
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': _USER_AGENT, 'Accept': 'text/html,text/plain;q=0.9'})
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch')
+
+    def fetch(self, url: str, deadline: float = None) -> str:
+        """Text of one page ('' if it isn't HTML/text, fails, or runs past the deadline)."""
+        deadline = deadline or time.monotonic() + self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return ''
+        try:
+            with self.session.get(url, timeout=(min(remaining, self.timeout), min(remaining, self.timeout)),
+                                  stream=True) as resp:
+                if resp.status_code != 200:
+                    return ''
+                content_type = resp.headers.get('Content-Type', 'text/html').lower()
+                if 'html' not in content_type and 'text/plain' not in content_type:
+                    return ''
+                chunks, size = [], 0
+                for chunk in resp.iter_content(chunk_size=16384):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes or time.monotonic() > deadline:
+                        break
+                raw = b''.join(chunks)[:self.max_bytes]
+                # Without a charset header requests assumes ISO-8859-1; prefer the page's own <meta charset>
+                meta = None if 'charset=' in content_type else _META_CHARSET.search(raw[:4096])
+                encoding = meta.group(1).decode('ascii') if meta else (
+                    resp.encoding if 'charset=' in content_type else 'utf-8')
+                text = raw.decode(encoding, errors='replace')
+        except (requests.RequestException, LookupError) as e:
+            print(f"[SEARCH] Fetch failed for {url}: {e.__class__.__name__}")
+            return ''
+        if 'html' in content_type:
+            return text
+        return '\n'.join(f'<p>{html.escape(line)}</p>' for line in text.splitlines())
+
+    def fetch_many(self, urls: List[str], deadline_seconds: float = SEARCH_FETCH_DEADLINE) -> Dict[str, str]:
+        """Fetch pages concurrently; returns {url: html} for those that arrived before the deadline."""
+        deadline = time.monotonic() + deadline_seconds
+        futures = {self._pool.submit(self.fetch, url, deadline): url for url in dict.fromkeys(urls) if url}
+        done, pending = wait(futures, timeout=deadline_seconds)
+        for future in pending:
+            future.cancel()
+        return {futures[f]: f.result() for f in done if not f.cancelled() and f.result()}
+
+    def passages(self, query: str, urls: List[str], deadline_seconds: float = SEARCH_FETCH_DEADLINE,
+                 budget: int = SEARCH_CONTEXT_CHARS) -> List[Tuple[int, str]]:
+        """
+        Best passages for the query from the pages, as (index into urls, text).
+        """
+        pages = self.fetch_many(urls, deadline_seconds)
+        candidates = []
+        for i, url in enumerate(urls):
+            page = pages.get(url)
+            if page:
+                _, paragraphs = extract_text(page)
+                candidates.extend((i, passage) for passage in split_passages(paragraphs))
+        return rank_passages(query, candidates, budget)
+
+    def close(self):
+        self._pool.shutdown(wait=False)
+        self.session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch pages and show the passages most relevant to a question.')
+    parser.add_argument('question')
+    parser.add_argument('urls', nargs='+')
+    args = parser.parse_args()
+
+    fetcher = PageFetcher()
+    started = time.monotonic()
+    passages = fetcher.passages(args.question, args.urls)
+    print(f"{len(passages)} passages in {time.monotonic() - started:.2f}s")
+    for source, text in passages:
+        print(f"\n[{source + 1}] {args.urls[source]}\n{text}")
+    fetcher.close()
+
+
+if __name__ == '__main__':
+    main()